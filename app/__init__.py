@@ -17,18 +17,20 @@ from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity
 from flask_cors import CORS
 from config import config
+from app.utils.database import RoutingSession
 import os
 import logging
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 jwt = JWTManager()
 
-def create_app(config_name='default'):
+def create_app(config_name='default', db_profile=None):
     """
     Application Factory Pattern
-    Creates and configures the Flask application with all HR modules
+    Creates and configures the Flask application with all HR modules.
+    db_profile selects a database deployment profile (see DATABASE_PROFILES)
     """
     
     # Set template and static directories
@@ -43,11 +45,23 @@ def create_app(config_name='default'):
     # Load configuration
     app.config.from_object(config[config_name])
     
+    # orjson-backed JSON encoding when available
+    from app.utils.serializers import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    
+    # Engine and pool tuning for the selected database profile
+    from app.utils.database import configure_database, register_engine_events, init_replicas
+    configure_database(app, db_profile)
+    
     # Initialize extensions with app
     db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            register_engine_events(app, engine)
+    init_replicas(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
-    CORS(app)
+    CORS(app, expose_headers=['X-Next-Cursor', 'Link'])
     
     # Configure logging
     if not app.debug:
@@ -78,7 +92,7 @@ def create_app(config_name='default'):
         exit_management, employee_relations, succession_planning,
         
         # Workforce Analytics & Planning
-        workforce_planning, analytics,
+        workforce_planning, analytics, exports,
         
         # Employee Services
         self_service, announcements, documents,
@@ -128,6 +142,7 @@ def create_app(config_name='default'):
         # Strategic Planning
         (workforce_planning.workforce_planning_bp, 'Workforce Planning'),
         (analytics.analytics, 'HR Analytics'),
+        (exports.bp, 'Data Exports'),
         
         # Employee Services
         (self_service.self_service, 'Employee Self-Service'),
@@ -153,6 +168,36 @@ def create_app(config_name='default'):
         except Exception as e:
             app.logger.error(f"❌ Failed to register {description}: {str(e)}")
     
+    # Start every app instance with fresh in-process caches
+    from app.utils.permissions import configure_permission_cache
+    from app.utils.departments import configure_department_cache
+    from app.utils.analytics import configure_analytics_cache
+    configure_permission_cache(app)
+    configure_department_cache(app)
+    configure_analytics_cache(app)
+    
+    # Background writer for audit events
+    from app.utils.audit import audit_writer, audit_cli
+    audit_writer.init_app(app)
+    app.cli.add_command(audit_cli)
+    
+    # Nightly recount of the materialized dashboard counters
+    from app.utils.counters import counters_cli
+    app.cli.add_command(counters_cli)
+    
+    # Daily analytics fact tables
+    from app.utils.rollups import rollups_cli
+    app.cli.add_command(rollups_cli)
+    
+    # Write-behind journal for clock-in/out events (CLOCK_JOURNAL_ENABLED)
+    from app.utils.clock_journal import clock_journal, clock_journal_cli
+    clock_journal.init_app(app)
+    app.cli.add_command(clock_journal_cli)
+    
+    # Month-end payroll close across organizations
+    from app.utils.payroll_runs import payroll_cli
+    app.cli.add_command(payroll_cli)
+    
     # ================================================================
     # UNIFIED FRONTEND ROUTES
     # ================================================================
@@ -401,6 +446,7 @@ def create_app(config_name='default'):
                 'workforce_planning': '/api/workforce-planning',
                 'succession_planning': '/api/succession-planning',
                 'analytics': '/api/analytics',
+                'exports': '/api/exports',
                 'self_service': '/api/self-service',
                 'compliance': '/api/compliance',
                 'ai_assistant': '/api/ai',
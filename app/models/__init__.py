@@ -2,11 +2,12 @@ from .employee import Employee
 from .department import Department
 from .attendance import Attendance
 from .leave import Leave
-from .payroll import Payroll
+from .payroll import Payroll, PayrollRun
 from .recruitment import JobPosting, Applicant
 from .performance import PerformanceReview
 from .training import TrainingProgram, TrainingEnrollment, EmployeeDocument, EmployeeBenefit
-from .organization import Organization, SubscriptionPlan, Subscription, Invoice, UsageLog
+from .organization import Organization, SubscriptionPlan, Subscription, Invoice, UsageLog, OrganizationCounter
+from .rollup import DailyWorkforceFact, DailyLeaveFact, RollupWatermark, RollupDirtyRange
 
 __all__ = [
     'Employee',
@@ -14,6 +15,7 @@ __all__ = [
     'Attendance',
     'Leave',
     'Payroll',
+    'PayrollRun',
     'JobPosting',
     'Applicant',
     'PerformanceReview',
@@ -25,5 +27,10 @@ __all__ = [
     'SubscriptionPlan',
     'Subscription',
     'Invoice',
-    'UsageLog'
+    'UsageLog',
+    'OrganizationCounter',
+    'DailyWorkforceFact',
+    'DailyLeaveFact',
+    'RollupWatermark',
+    'RollupDirtyRange'
 ]
@@ -11,8 +11,18 @@ class Attendance(db.Model):
     check_out = db.Column(db.DateTime)
     status = db.Column(db.String(20), default='present')  # present, absent, late, half-day
     notes = db.Column(db.Text)
+    # Idempotency-Key of the clock request that set check_in / check_out
+    check_in_key = db.Column(db.String(64))
+    check_out_key = db.Column(db.String(64))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # One record per employee per day; the unique index also serves
+    # per-employee date range lookups
+    __table_args__ = (
+        db.UniqueConstraint('employee_id', 'date', name='uq_attendance_employee_date'),
+        db.Index('ix_attendances_date', 'date'),
+    )
+    
     # Relationships
     employee = db.relationship('Employee', back_populates='attendances')
     
@@ -19,6 +19,7 @@ class Employee(db.Model):
     department_id = db.Column(db.Integer, db.ForeignKey('departments.id'))
     salary = db.Column(db.Float)
     status = db.Column(db.String(20), default='active')  # active, inactive, terminated
+    terminated_at = db.Column(db.DateTime)  # When status last became inactive or terminated
     address = db.Column(db.Text)
     emergency_contact = db.Column(db.String(200))
     role = db.Column(db.String(20), default='employee')  # admin, manager, employee
@@ -31,7 +32,9 @@ class Employee(db.Model):
     
     # Add unique constraint for employee_id within organization
     __table_args__ = (db.UniqueConstraint('organization_id', 'employee_id', name='uq_org_employee_id'),
-                      db.UniqueConstraint('organization_id', 'email', name='uq_org_email'))
+                      db.UniqueConstraint('organization_id', 'email', name='uq_org_email'),
+                      db.Index('ix_employees_org_status', 'organization_id', 'status'),
+                      db.Index('ix_employees_department_status', 'department_id', 'status'))
     
     # Relationships
     organization = db.relationship('Organization', back_populates='employees')
@@ -17,6 +17,12 @@ class Leave(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Leave lists filter by employee or status and order by created_at
+    __table_args__ = (
+        db.Index('ix_leaves_employee_created', 'employee_id', 'created_at'),
+        db.Index('ix_leaves_status_created', 'status', 'created_at'),
+    )
+    
     # Relationships
     employee = db.relationship('Employee', back_populates='leaves')
     
@@ -48,6 +48,7 @@ class Organization(db.Model):
     
     # Feature control settings (managed by super admin)
     feature_settings = db.Column(db.JSON)  # Store enabled/disabled features
+    permission_version = db.Column(db.Integer, default=0, nullable=False, server_default='0')  # Bumped on role/permission changes
     suspension_reason = db.Column(db.Text)
     suspended_at = db.Column(db.DateTime)
     
@@ -66,6 +67,8 @@ class Organization(db.Model):
     # RBAC and Settings relationships
     roles = db.relationship('Role', back_populates='organization', cascade='all, delete-orphan')
     settings = db.relationship('OrganizationSetting', back_populates='organization', cascade='all, delete-orphan')
+    counters = db.relationship('OrganizationCounter', back_populates='organization', uselist=False,
+                               cascade='all, delete-orphan')
     
     def to_dict(self):
         return {
@@ -264,6 +267,9 @@ class Invoice(db.Model):
     # Relationships
     subscription = db.relationship('Subscription', back_populates='invoices')
     
+    # Revenue reports filter paid invoices by paid_at range
+    __table_args__ = (db.Index('ix_invoices_status_paid_at', 'status', 'paid_at'),)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -298,6 +304,10 @@ class UsageLog(db.Model):
     recorded_date = db.Column(db.Date, default=date.today)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Usage reports scan one organization by date
+    __table_args__ = (db.Index('ix_usage_logs_org_recorded', 'organization_id', 'recorded_date'),
+                      db.Index('ix_usage_logs_org_created', 'organization_id', 'created_at'))
+    
     # Relationships
     organization = db.relationship('Organization', back_populates='usage_logs')
     
@@ -310,4 +320,33 @@ class UsageLog(db.Model):
             'unit': self.unit,
             'recorded_date': self.recorded_date.isoformat() if self.recorded_date else None,
             'created_at': self.created_at.isoformat() if self.created_at else None
-        }
\ No newline at end of file
+        }
+
+
+class OrganizationCounter(db.Model):
+    """Dashboard counters maintained incrementally by the write paths.
+
+    present_today only counts for present_date; a new day starts from zero.
+    The reconcile command recomputes every row from the source tables.
+    """
+    __tablename__ = 'organization_counters'
+    
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id', ondelete='CASCADE'), primary_key=True)
+    active_employees = db.Column(db.Integer, default=0, nullable=False)
+    departments = db.Column(db.Integer, default=0, nullable=False)
+    pending_leaves = db.Column(db.Integer, default=0, nullable=False)
+    present_today = db.Column(db.Integer, default=0, nullable=False)
+    present_date = db.Column(db.Date)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    reconciled_at = db.Column(db.DateTime)
+    
+    # Relationships
+    organization = db.relationship('Organization', back_populates='counters')
+    
+    def to_dict(self):
+        return {
+            'employee_count': self.active_employees,
+            'department_count': self.departments,
+            'attendance_today': self.present_today if self.present_date == date.today() else 0,
+            'pending_leaves': self.pending_leaves
+        }
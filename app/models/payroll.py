@@ -20,6 +20,13 @@ class Payroll(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # One payroll per employee and period; the unique index also serves
+    # employee/period filters. Lists order by (year, month)
+    __table_args__ = (
+        db.UniqueConstraint('employee_id', 'year', 'month', name='uq_payrolls_employee_period'),
+        db.Index('ix_payrolls_period', 'year', 'month'),
+    )
+    
     # Relationships
     employee = db.relationship('Employee', back_populates='payrolls')
     
@@ -40,3 +47,66 @@ class Payroll(db.Model):
             'notes': self.notes,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+class PayrollRun(db.Model):
+    """Progress of a chunked payroll run for one organization and month.
+    
+    organization_id is NULL for a close across every organization;
+    scope_key repeats it, with 0 for that case, so the all-organization
+    run is unique per period too. Employees are processed in id order;
+    every active employee with an id up to last_employee_id has been
+    committed, so an interrupted run resumes after it. A running run holds
+    a lease that every committed chunk renews.
+    """
+    __tablename__ = 'payroll_runs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id', ondelete='CASCADE'))
+    scope_key = db.Column(db.Integer, nullable=False,
+                          default=lambda context: context.get_current_parameters().get('organization_id') or 0)
+    month = db.Column(db.Integer, nullable=False)
+    year = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), default='running', nullable=False)  # running, completed, failed
+    chunk_size = db.Column(db.Integer, nullable=False)
+    last_employee_id = db.Column(db.Integer)
+    chunks_completed = db.Column(db.Integer, default=0, nullable=False)
+    employees = db.Column(db.Integer, default=0, nullable=False)
+    created = db.Column(db.Integer, default=0, nullable=False)
+    skipped = db.Column(db.Integer, default=0, nullable=False)
+    total_basic = db.Column(db.Float, default=0.0, nullable=False)
+    total_allowances = db.Column(db.Float, default=0.0, nullable=False)
+    total_deductions = db.Column(db.Float, default=0.0, nullable=False)
+    total_net = db.Column(db.Float, default=0.0, nullable=False)
+    attempts = db.Column(db.Integer, default=1, nullable=False)
+    error = db.Column(db.Text)
+    lease_expires_at = db.Column(db.DateTime)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.UniqueConstraint('scope_key', 'year', 'month', name='uq_payroll_runs_scope_period'),
+    )
+    
+    def to_dict(self):
+        return {
+            'run_id': self.id,
+            'organization_id': self.organization_id,
+            'month': self.month,
+            'year': self.year,
+            'status': self.status,
+            'chunk_size': self.chunk_size,
+            'last_employee_id': self.last_employee_id,
+            'chunks_completed': self.chunks_completed,
+            'attempts': self.attempts,
+            'employees': self.employees,
+            'created': self.created,
+            'skipped': self.skipped,
+            'total_basic': round(self.total_basic, 2),
+            'total_allowances': round(self.total_allowances, 2),
+            'total_deductions': round(self.total_deductions, 2),
+            'total_net': round(self.total_net, 2),
+            'error': self.error,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
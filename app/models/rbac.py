@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 from app import db
 
@@ -70,6 +71,20 @@ class RolePermission(db.Model):
     # Ensure unique role-permission combinations
     __table_args__ = (db.UniqueConstraint('role_id', 'permission_id', name='uq_role_permission'),)
 
+class CacheVersion(db.Model):
+    """Persisted version counter for process-local caches.
+    
+    Writers bump the counter in their transaction; every process compares
+    it with the version its cached copy was built at (e.g. an organization's
+    role -> permission matrix as 'permission_matrix:<id>', or its analytics
+    as 'analytics:<id>').
+    """
+    __tablename__ = 'cache_versions'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class EmployeeRole(db.Model):
     __tablename__ = 'employee_roles'
     
@@ -85,8 +100,10 @@ class EmployeeRole(db.Model):
     role = db.relationship('Role', back_populates='employee_roles')
     assigner = db.relationship('Employee', foreign_keys=[assigned_by])
     
-    # Ensure unique employee-role combinations
-    __table_args__ = (db.UniqueConstraint('employee_id', 'role_id', name='uq_employee_role'),)
+    # Ensure unique employee-role combinations (its index also covers
+    # lookups by employee_id); role_id gets its own index for reverse lookups
+    __table_args__ = (db.UniqueConstraint('employee_id', 'role_id', name='uq_employee_role'),
+                      db.Index('ix_employee_roles_role', 'role_id'))
     
     def to_dict(self):
         return {
@@ -118,17 +135,21 @@ class OrganizationSetting(db.Model):
     # Relationships
     organization = db.relationship('Organization', back_populates='settings')
     
+    @staticmethod
+    def decode_value(value, data_type):
+        """Convert a stored string value to its declared data type."""
+        if data_type == 'boolean':
+            return (value or '').lower() == 'true'
+        elif data_type == 'integer':
+            return int(value) if value else 0
+        elif data_type == 'json':
+            return json.loads(value) if value else {}
+        else:
+            return value
+    
     def get_value(self):
         """Return the value in the appropriate data type."""
-        if self.data_type == 'boolean':
-            return self.value.lower() == 'true'
-        elif self.data_type == 'integer':
-            return int(self.value) if self.value else 0
-        elif self.data_type == 'json':
-            import json
-            return json.loads(self.value) if self.value else {}
-        else:
-            return self.value
+        return self.decode_value(self.value, self.data_type)
     
     def set_value(self, value):
         """Set the value with appropriate conversion."""
@@ -137,7 +158,6 @@ class OrganizationSetting(db.Model):
         elif self.data_type == 'integer':
             self.value = str(int(value))
         elif self.data_type == 'json':
-            import json
             self.value = json.dumps(value)
         else:
             self.value = str(value)
@@ -170,6 +190,13 @@ class AuditLog(db.Model):
     user_agent = db.Column(db.Text)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
+    # Composite indexes backing the per-tenant keyset queries
+    __table_args__ = (
+        db.Index('ix_audit_logs_org_timestamp', 'organization_id', 'timestamp', 'id'),
+        db.Index('ix_audit_logs_org_resource', 'organization_id', 'resource_type', 'resource_id'),
+        db.Index('ix_audit_logs_org_user_timestamp', 'organization_id', 'user_id', 'timestamp'),
+    )
+    
     # Relationships
     organization = db.relationship('Organization')
     user = db.relationship('Employee')
@@ -191,4 +218,31 @@ class AuditLog(db.Model):
                 'name': f"{self.user.first_name} {self.user.last_name}",
                 'email': self.user.email
             } if self.user else None
-        }
\ No newline at end of file
+        }
+
+class AuditLogArchive(db.Model):
+    """Cold storage for audit rows rolled over out of audit_logs"""
+    __tablename__ = 'audit_logs_archive'
+    
+    id = db.Column(db.Integer, primary_key=True)  # Same id as the original audit_logs row
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('employees.id'), nullable=True)
+    action = db.Column(db.String(100), nullable=False)
+    resource_type = db.Column(db.String(50), nullable=False)
+    resource_id = db.Column(db.Integer)
+    old_values = db.Column(db.Text)
+    new_values = db.Column(db.Text)
+    ip_address = db.Column(db.String(45))
+    user_agent = db.Column(db.Text)
+    timestamp = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_audit_logs_archive_org_timestamp', 'organization_id', 'timestamp', 'id'),
+        db.Index('ix_audit_logs_archive_org_resource', 'organization_id', 'resource_type', 'resource_id'),
+    )
+    
+    # Relationships
+    user = db.relationship('Employee')
+    
+    to_dict = AuditLog.to_dict
@@ -0,0 +1,87 @@
+from datetime import datetime
+from app import db
+
+class DailyWorkforceFact(db.Model):
+    """Per-(organization, department, day) head count, attendance and payroll totals.
+    
+    Written by the rollup job (app.utils.rollups) for closed days only;
+    department_id is NULL for employees without a department.
+    """
+    __tablename__ = 'daily_workforce_facts'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id', ondelete='CASCADE'), nullable=False)
+    department_id = db.Column(db.Integer, db.ForeignKey('departments.id', ondelete='SET NULL'))
+    day = db.Column(db.Date, nullable=False)
+    headcount = db.Column(db.Integer, default=0, nullable=False)
+    attendance_records = db.Column(db.Integer, default=0, nullable=False)
+    present = db.Column(db.Integer, default=0, nullable=False)
+    late = db.Column(db.Integer, default=0, nullable=False)
+    half_day = db.Column(db.Integer, default=0, nullable=False)
+    absent = db.Column(db.Integer, default=0, nullable=False)
+    payroll_total = db.Column(db.Float, default=0.0, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_daily_workforce_facts_org_day', 'organization_id', 'day'),
+        db.Index('ix_daily_workforce_facts_day', 'day'),
+    )
+    
+    def to_dict(self):
+        return {
+            'organization_id': self.organization_id,
+            'department_id': self.department_id,
+            'day': self.day.isoformat() if self.day else None,
+            'headcount': self.headcount,
+            'attendance_records': self.attendance_records,
+            'present': self.present,
+            'late': self.late,
+            'half_day': self.half_day,
+            'absent': self.absent,
+            'payroll_total': self.payroll_total
+        }
+
+class DailyLeaveFact(db.Model):
+    """Approved leave days per (organization, department, start day, leave type)"""
+    __tablename__ = 'daily_leave_facts'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id', ondelete='CASCADE'), nullable=False)
+    department_id = db.Column(db.Integer, db.ForeignKey('departments.id', ondelete='SET NULL'))
+    day = db.Column(db.Date, nullable=False)
+    leave_type = db.Column(db.String(50), nullable=False)
+    leave_days = db.Column(db.Integer, default=0, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_daily_leave_facts_org_day', 'organization_id', 'day'),
+        db.Index('ix_daily_leave_facts_day', 'day'),
+    )
+    
+    def to_dict(self):
+        return {
+            'organization_id': self.organization_id,
+            'department_id': self.department_id,
+            'day': self.day.isoformat() if self.day else None,
+            'leave_type': self.leave_type,
+            'leave_days': self.leave_days
+        }
+
+class RollupWatermark(db.Model):
+    """Last day a rollup has been built through"""
+    __tablename__ = 'rollup_watermarks'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    watermark = db.Column(db.Date, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class RollupDirtyRange(db.Model):
+    """Organization whose rolled-up facts from since through the watermark are stale.
+    
+    Backdated writes mark only their own organization here instead of
+    rewinding the shared watermark; the next rollup run rebuilds the range
+    and deletes the row.
+    """
+    __tablename__ = 'rollup_dirty_ranges'
+    
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id', ondelete='CASCADE'), primary_key=True)
+    since = db.Column(db.Date, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -3,6 +3,15 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.attendance import Attendance
 from datetime import datetime, date
+from sqlalchemy.exc import IntegrityError
+from app.utils.pagination import paginated_list
+from app.utils.serializers import ATTENDANCE_SERIALIZER
+from app.utils.counters import adjust_counters, organization_id_for_employee
+from app.utils.analytics import invalidate_analytics
+from app.utils.rollups import rewind_rollups
+from app.utils.clock import clock_in, clock_out, ClockError, IDEMPOTENCY_KEY_MAX_LENGTH
+from app.utils.clock_journal import clock_journal
+from app.utils.permissions import current_principal
 
 bp = Blueprint('attendance', __name__, url_prefix='/api/attendance')
 
@@ -23,8 +32,7 @@ def get_attendances():
     if end_date:
         query = query.filter(Attendance.date <= datetime.strptime(end_date, '%Y-%m-%d').date())
     
-    attendances = query.order_by(Attendance.date.desc()).all()
-    return jsonify([att.to_dict() for att in attendances]), 200
+    return paginated_list(query, [Attendance.date, Attendance.id], row_serializer=ATTENDANCE_SERIALIZER)
 
 @bp.route('/<int:attendance_id>', methods=['GET'])
 @jwt_required()
@@ -33,47 +41,62 @@ def get_attendance(attendance_id):
     attendance = Attendance.query.get_or_404(attendance_id)
     return jsonify(attendance.to_dict()), 200
 
+def _idempotency_key():
+    """Idempotency-Key header of a clock request; mobile clients resend it on retry"""
+    key = request.headers.get('Idempotency-Key')
+    if key is not None and not 0 < len(key) <= IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise ClockError(f'Idempotency-Key must be 1-{IDEMPOTENCY_KEY_MAX_LENGTH} characters')
+    return key
+
+def _clock_response(result, status_code):
+    attendance, replayed = result
+    response = jsonify(attendance)
+    if replayed:
+        response.headers['Idempotent-Replayed'] = 'true'
+    return response, status_code
+
+def _journal_clock(action):
+    """Acknowledge a clock event once it is fsynced to the journal; it reaches attendances on the next group commit.
+    
+    202 means the event is durable, not that it was valid: a check-out with
+    no check-in or a repeated check-in/out is logged and dead-lettered to the
+    journal's .rejected file when applied, where the synchronous path would
+    have answered 400.
+    """
+    principal = current_principal()
+    if not principal:
+        return jsonify({'error': 'Unauthorized'}), 401
+    event = clock_journal.append(action, principal.id, principal.organization_id, _idempotency_key())
+    return jsonify({
+        'status': 'accepted',
+        'event_id': event['event_id'],
+        'employee_id': event['employee_id'],
+        'action': action,
+        'date': event['date'],
+        'timestamp': event['at']
+    }), 202
+
 @bp.route('/check-in', methods=['POST'])
 @jwt_required()
 def check_in():
     """Check in for the day"""
-    employee_id = get_jwt_identity()
-    today = date.today()
-    
-    existing = Attendance.query.filter_by(employee_id=employee_id, date=today).first()
-    if existing:
-        return jsonify({'error': 'Already checked in for today'}), 400
-    
-    attendance = Attendance(
-        employee_id=employee_id,
-        date=today,
-        check_in=datetime.utcnow(),
-        status='present'
-    )
-    
-    db.session.add(attendance)
-    db.session.commit()
-    
-    return jsonify(attendance.to_dict()), 201
+    try:
+        if clock_journal.enabled:
+            return _journal_clock('in')
+        return _clock_response(clock_in(int(get_jwt_identity()), _idempotency_key()), 201)
+    except ClockError as e:
+        return jsonify({'error': str(e)}), 400
 
 @bp.route('/check-out', methods=['POST'])
 @jwt_required()
 def check_out():
     """Check out for the day"""
-    employee_id = get_jwt_identity()
-    today = date.today()
-    
-    attendance = Attendance.query.filter_by(employee_id=employee_id, date=today).first()
-    if not attendance:
-        return jsonify({'error': 'No check-in record found for today'}), 400
-    
-    if attendance.check_out:
-        return jsonify({'error': 'Already checked out for today'}), 400
-    
-    attendance.check_out = datetime.utcnow()
-    db.session.commit()
-    
-    return jsonify(attendance.to_dict()), 200
+    try:
+        if clock_journal.enabled:
+            return _journal_clock('out')
+        return _clock_response(clock_out(int(get_jwt_identity()), _idempotency_key()), 200)
+    except ClockError as e:
+        return jsonify({'error': str(e)}), 400
 
 @bp.route('', methods=['POST'])
 @jwt_required()
@@ -94,7 +117,17 @@ def create_attendance():
     )
     
     db.session.add(attendance)
-    db.session.commit()
+    try:
+        db.session.flush()
+        if attendance.status == 'present':
+            adjust_counters(organization_id_for_employee(attendance.employee_id),
+                            present_today=1, on_date=attendance.date)
+        rewind_rollups(attendance.date, organization_id_for_employee(attendance.employee_id))
+        invalidate_analytics(organization_id_for_employee(attendance.employee_id), attendance.date)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Attendance already recorded for this date'}), 400
     
     return jsonify(attendance.to_dict()), 201
 
@@ -110,10 +143,16 @@ def update_attendance(attendance_id):
     if 'check_out' in data:
         attendance.check_out = datetime.strptime(data['check_out'], '%Y-%m-%d %H:%M:%S')
     if 'status' in data:
+        if (attendance.status == 'present') != (data['status'] == 'present'):
+            adjust_counters(organization_id_for_employee(attendance.employee_id),
+                            present_today=1 if data['status'] == 'present' else -1,
+                            on_date=attendance.date)
         attendance.status = data['status']
     if 'notes' in data:
         attendance.notes = data['notes']
     
+    rewind_rollups(attendance.date, organization_id_for_employee(attendance.employee_id))
+    invalidate_analytics(organization_id_for_employee(attendance.employee_id), attendance.date)
     db.session.commit()
     return jsonify(attendance.to_dict()), 200
 
@@ -122,6 +161,12 @@ def update_attendance(attendance_id):
 def delete_attendance(attendance_id):
     """Delete attendance record"""
     attendance = Attendance.query.get_or_404(attendance_id)
+    organization_id = organization_id_for_employee(attendance.employee_id)
+    attendance_date = attendance.date
+    if attendance.status == 'present':
+        adjust_counters(organization_id, present_today=-1, on_date=attendance_date)
     db.session.delete(attendance)
+    rewind_rollups(attendance_date, organization_id)
+    invalidate_analytics(organization_id, attendance_date)
     db.session.commit()
     return jsonify({'message': 'Attendance record deleted successfully'}), 200
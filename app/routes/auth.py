@@ -1,8 +1,11 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 from app import db
 from app.models.employee import Employee
 from app.models.organization import Organization, SubscriptionPlan
+from app.utils.permissions import (
+    build_principal_claims, initialize_default_roles
+)
 from datetime import datetime, timedelta
 import secrets
 import string
@@ -10,6 +13,21 @@ import re
 
 bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
+def _unique_organization_slug(name):
+    """Derive a free slug from an organization name with a single lookup"""
+    base_slug = name.lower().replace(' ', '').replace('-', '').replace('_', '')[:30]
+    pattern = base_slug.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    taken = {row[0] for row in db.session.query(Organization.slug).filter(
+        Organization.slug.like(pattern, escape='\\')
+    )}
+    
+    org_slug = base_slug
+    counter = 1
+    while org_slug in taken:
+        org_slug = f"{base_slug}{counter}"
+        counter += 1
+    return org_slug
+
 @bp.route('/login', methods=['POST'])
 def login():
     """Authenticate employee and return JWT tokens"""
@@ -61,7 +79,10 @@ def login():
         if not limits_status['subscription_active']:
             return jsonify({'error': 'Organization subscription is inactive'}), 403
     
-    access_token = create_access_token(identity=str(employee.id))
+    access_token = create_access_token(
+        identity=str(employee.id),
+        additional_claims=build_principal_claims(employee)
+    )
     refresh_token = create_refresh_token(identity=str(employee.id))
     
     return jsonify({
@@ -76,7 +97,13 @@ def login():
 def refresh():
     """Refresh access token"""
     identity = get_jwt_identity()
-    access_token = create_access_token(identity=str(identity))
+    additional_claims = {}
+    if current_app.config.get('JWT_EMBED_CLAIMS'):
+        employee = Employee.query.get(int(identity))
+        if not employee:
+            return jsonify({'error': 'User not found'}), 404
+        additional_claims = build_principal_claims(employee)
+    access_token = create_access_token(identity=str(identity), additional_claims=additional_claims)
     return jsonify({'access_token': access_token}), 200
 
 @bp.route('/me', methods=['GET'])
@@ -141,13 +168,8 @@ def register_organization():
     if Employee.query.filter_by(email=data['admin_email'].strip().lower()).first():
         return jsonify({'error': 'Email already exists'}), 400
     
-    # Check if organization name exists
-    org_slug = data['organization_name'].lower().replace(' ', '').replace('-', '').replace('_', '')[:30]
-    base_slug = org_slug
-    counter = 1
-    while Organization.query.filter_by(slug=org_slug).first():
-        org_slug = f"{base_slug}{counter}"
-        counter += 1
+    # Pick a slug that is not taken yet
+    org_slug = _unique_organization_slug(data['organization_name'])
     
     # Get plan (default to Free plan)
     plan_slug = data.get('plan_slug', 'free')
@@ -201,6 +223,10 @@ def register_organization():
         )
         db.session.add(default_dept)
         
+        # Provision the default roles in the same transaction
+        if not initialize_default_roles(organization.id, commit=False):
+            raise RuntimeError('Could not create default roles')
+        
         # Update organization current employee count
         organization.current_employee_count = 1
         
@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.employee import Employee
 from app.models.training import EmployeeBenefit
+from app.utils.pagination import paginated_list
 from datetime import datetime
 
 bp = Blueprint('benefits', __name__, url_prefix='/api/benefits')
@@ -12,8 +13,7 @@ bp = Blueprint('benefits', __name__, url_prefix='/api/benefits')
 def get_benefits():
     """Get all benefit packages"""
     try:
-        benefits = EmployeeBenefit.query.all()
-        return jsonify([benefit.to_dict() for benefit in benefits]), 200
+        return paginated_list(EmployeeBenefit.query, [EmployeeBenefit.id], descending=False)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
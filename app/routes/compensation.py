@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, timedelta
+from app.utils.permissions import current_principal
+from app.utils.analytics import compensation_overview, pay_equity_report
 import json
 
 compensation = Blueprint('compensation', __name__)
@@ -49,53 +51,8 @@ mock_benchmarks = [
 def get_compensation_overview():
     """Get compensation overview dashboard"""
     try:
-        # Calculate metrics
-        total_employees = 156
-        total_compensation = 10720000  # $10.72M
-        avg_salary = total_compensation / total_employees
-        
-        # Department breakdown
-        departments = {
-            'Engineering': {'count': 45, 'avg_salary': 85000, 'min': 65000, 'max': 125000},
-            'Sales': {'count': 28, 'avg_salary': 65000, 'min': 45000, 'max': 95000},
-            'Marketing': {'count': 18, 'avg_salary': 62000, 'min': 48000, 'max': 85000},
-            'Operations': {'count': 22, 'avg_salary': 55000, 'min': 42000, 'max': 75000},
-            'HR': {'count': 12, 'avg_salary': 58000, 'min': 45000, 'max': 80000},
-            'Finance': {'count': 15, 'avg_salary': 72000, 'min': 55000, 'max': 95000},
-            'Customer Support': {'count': 16, 'avg_salary': 48000, 'min': 38000, 'max': 65000}
-        }
-        
-        # Pay distribution
-        distribution = [
-            {'range': '$40-60k', 'count': 45, 'percentage': 28.8, 'avg_salary': 52000},
-            {'range': '$60-80k', 'count': 67, 'percentage': 42.9, 'avg_salary': 71500},
-            {'range': '$80-120k', 'count': 32, 'percentage': 20.5, 'avg_salary': 95800},
-            {'range': '$120k+', 'count': 12, 'percentage': 7.7, 'avg_salary': 145000}
-        ]
-        
-        return jsonify({
-            'summary': {
-                'total_employees': total_employees,
-                'avg_salary': avg_salary,
-                'total_compensation': total_compensation,
-                'pay_equity_score': 94,
-                'market_reviews_due': 8
-            },
-            'departments': departments,
-            'distribution': distribution,
-            'alerts': [
-                {
-                    'type': 'warning',
-                    'message': '3 positions show potential pay gaps requiring review',
-                    'priority': 'high'
-                },
-                {
-                    'type': 'info',
-                    'message': 'Annual market rate refresh due in 30 days',
-                    'priority': 'medium'
-                }
-            ]
-        })
+        principal = current_principal()
+        return jsonify(compensation_overview(principal.organization_id if principal else None))
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -173,34 +130,31 @@ def create_salary_band():
 def get_pay_equity_analysis():
     """Get pay equity analysis"""
     try:
-        # Mock pay equity data
-        gender_analysis = {
-            'overall_ratio': 0.96,
-            'status': 'within_range',
-            'departments': [
-                {'name': 'Engineering', 'male_avg': 86500, 'female_avg': 83200, 'ratio': 0.96, 'status': 'good'},
-                {'name': 'Sales', 'male_avg': 67800, 'female_avg': 66100, 'ratio': 0.97, 'status': 'good'},
-                {'name': 'Marketing', 'male_avg': 64200, 'female_avg': 59800, 'ratio': 0.93, 'status': 'review'},
-                {'name': 'Operations', 'male_avg': 56200, 'female_avg': 53800, 'ratio': 0.96, 'status': 'good'}
-            ]
-        }
+        principal = current_principal()
+        equity = pay_equity_report(principal.organization_id if principal else None)
         
-        position_analysis = [
-            {'position': 'Software Engineer', 'ratio': 0.98, 'male_count': 15, 'female_count': 8, 'status': 'good'},
-            {'position': 'Sales Representative', 'ratio': 0.92, 'male_count': 12, 'female_count': 9, 'status': 'review'},
-            {'position': 'Marketing Specialist', 'ratio': 0.89, 'male_count': 6, 'female_count': 12, 'status': 'action_needed'},
-            {'position': 'Project Manager', 'ratio': 1.02, 'male_count': 8, 'female_count': 7, 'status': 'good'}
+        recommendations = [
+            f"Review {position['position']} compensation across departments"
+            for position in equity['positions'] if position['status'] == 'action_needed'
+        ] + [
+            f"Analyze {position['position']} pay disparities"
+            for position in equity['positions'] if position['status'] == 'review'
+        ] + [
+            f"Review {department['name']} pay relative to position medians"
+            for department in equity['departments'] if department['status'] != 'good'
         ]
         
         return jsonify({
-            'gender_analysis': gender_analysis,
-            'position_analysis': position_analysis,
-            'recommendations': [
-                'Review Marketing Specialist compensation structure',
-                'Analyze Sales Representative pay disparities',
-                'Implement regular pay equity audits',
-                'Update compensation guidelines'
-            ]
+            # Employee records carry no gender, so equity is measured across
+            # departments for the same position
+            'gender_analysis': None,
+            'department_analysis': {
+                'overall_ratio': equity['overall_ratio'],
+                'status': equity['status'],
+                'departments': equity['departments']
+            },
+            'position_analysis': equity['positions'],
+            'recommendations': recommendations or ['Implement regular pay equity audits']
         })
     
     except Exception as e:
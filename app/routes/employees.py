@@ -1,57 +1,42 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.employee import Employee
 from app.models.department import Department
 from app.models.attendance import Attendance
 from app.models.leave import Leave
+from app.utils.permissions import (
+    current_principal, invalidate_employee_permissions, invalidate_organization_permissions
+)
+from app.utils.audit import query_audit_logs
+from app.utils.pagination import parse_limit, paginated_list, InvalidCursor
+from app.utils.serializers import EMPLOYEE_SERIALIZER, InvalidFields
+from app.utils.departments import get_department_summaries, invalidate_department_summaries
+from app.utils.counters import adjust_counters, get_dashboard_counters
+from app.utils.analytics import invalidate_analytics
+from app.utils.rollups import rewind_rollups
+from app.utils.workforce import LEFT_STATUSES
+from app.utils.database import use_primary
 from datetime import datetime, date
 
 bp = Blueprint('employees', __name__, url_prefix='/api/employees')
 
 @bp.route('/dashboard-stats', methods=['GET'])
 @jwt_required()
+@use_primary
 def dashboard_stats():
     """Get dashboard statistics for the current organization"""
-    current_employee_id = get_jwt_identity()
-    employee = Employee.query.get(current_employee_id)
+    employee = current_principal()
     
     if not employee:
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        # Get counts for the current organization
-        employee_count = Employee.query.filter_by(
-            organization_id=employee.organization_id,
-            status='active'
-        ).count()
-        
-        department_count = Department.query.filter_by(
-            organization_id=employee.organization_id
-        ).count()
-        
-        # Get today's attendance count
-        today = date.today()
-        attendance_today = Attendance.query.join(Employee).filter(
-            Employee.organization_id == employee.organization_id,
-            Attendance.date == today,
-            Attendance.status == 'present'
-        ).count()
-        
-        # Get pending leaves count
-        pending_leaves = Leave.query.join(Employee).filter(
-            Employee.organization_id == employee.organization_id,
-            Leave.status == 'pending'
-        ).count()
-        
-        return jsonify({
-            'employee_count': employee_count,
-            'department_count': department_count,
-            'attendance_today': attendance_today,
-            'pending_leaves': pending_leaves
-        })
+        # Maintained incrementally by the write paths; a single PK lookup
+        return jsonify(get_dashboard_counters(employee.organization_id))
         
     except Exception as e:
+        current_app.logger.error(f"Dashboard counters error: {str(e)}")
         return jsonify({
             'employee_count': 0,
             'department_count': 0,
@@ -63,8 +48,7 @@ def dashboard_stats():
 @jwt_required()
 def get_employees():
     """Get all employees with advanced filtering"""
-    current_employee_id = get_jwt_identity()
-    employee = Employee.query.get(current_employee_id)
+    employee = current_principal()
     
     if not employee:
         return jsonify({'error': 'Unauthorized'}), 401
@@ -100,12 +84,18 @@ def get_employees():
         )
     
     if simple == 'true':
-        employees = query.all()
-        return jsonify([emp.to_dict() for emp in employees]), 200
+        return paginated_list(query, [Employee.id], descending=False, row_serializer=EMPLOYEE_SERIALIZER)
     else:
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        per_page = parse_limit(per_page, default=100, maximum=current_app.config.get('PAGINATION_MAX_LIMIT', 1000))
+        try:
+            serializer = EMPLOYEE_SERIALIZER.project(request.args.get('fields'))
+        except InvalidFields as e:
+            return jsonify({'error': str(e)}), 400
+        pagination = serializer.select(query.order_by(Employee.id)).paginate(
+            page=page, per_page=per_page, error_out=False
+        )
         return jsonify({
-            'employees': [emp.to_dict() for emp in pagination.items],
+            'employees': serializer.dump(pagination.items),
             'total': pagination.total,
             'pages': pagination.pages,
             'current_page': page
@@ -252,7 +242,13 @@ def create_employee():
             organization_id=current_employee.organization_id
         ).count() + 1
     
+    if employee.status == 'active':
+        adjust_counters(employee.organization_id, active_employees=1)
+    if employee.hire_date:
+        rewind_rollups(employee.hire_date, employee.organization_id)
+    invalidate_analytics(employee.organization_id, employee.hire_date)
     db.session.commit()
+    invalidate_department_summaries(employee.organization_id)
     
     return jsonify(employee.to_dict()), 201
 
@@ -363,6 +359,7 @@ def update_employee(employee_id):
                 return jsonify({'error': 'Selected manager does not have management role'}), 400
     
     # Update allowed fields
+    previous_status = employee.status
     updated_fields = []
     for field in editable_fields:
         if field in data:
@@ -381,7 +378,18 @@ def update_employee(employee_id):
             return jsonify({'error': 'Password must be at least 6 characters long'}), 400
     
     employee.updated_at = datetime.utcnow()
+    if (previous_status == 'active') != (employee.status == 'active'):
+        adjust_counters(employee.organization_id, active_employees=1 if employee.status == 'active' else -1)
+    if (previous_status in LEFT_STATUSES) != (employee.status in LEFT_STATUSES):
+        # Turnover counts exits by terminated_at, so later edits do not move them
+        left_on = employee.terminated_at or employee.updated_at
+        employee.terminated_at = employee.updated_at if employee.status in LEFT_STATUSES else None
+        invalidate_analytics(employee.organization_id, left_on.date())
+    # Tokens carrying the old legacy role must be re-validated
+    if 'role' in updated_fields:
+        invalidate_employee_permissions(employee.id)
     db.session.commit()
+    invalidate_department_summaries(employee.organization_id)
     
     return jsonify({
         'message': 'Employee updated successfully',
@@ -471,8 +479,25 @@ def delete_employee(employee_id):
                 organization_id=employee.organization_id
             ).count() - 1
         
+        organization_id = employee.organization_id
+        hire_date = employee.hire_date
+        # Leaves and attendance cascade with the employee
+        adjust_counters(
+            organization_id,
+            active_employees=-1 if employee.status == 'active' else 0,
+            pending_leaves=-Leave.query.filter_by(employee_id=employee_id, status='pending').count(),
+            present_today=-Attendance.query.filter_by(
+                employee_id=employee_id, date=date.today(), status='present'
+            ).count()
+        )
         db.session.delete(employee)
+        invalidate_organization_permissions(organization_id)
+        # Head counts and attendance history change from the hire date on
+        if hire_date:
+            rewind_rollups(hire_date, organization_id)
+        invalidate_analytics(organization_id)
         db.session.commit()
+        invalidate_department_summaries(organization_id)
         
         return jsonify({
             'message': 'Employee deleted successfully',
@@ -487,27 +512,35 @@ def delete_employee(employee_id):
 @bp.route('/security/audit-log', methods=['GET'])
 @jwt_required()
 def get_audit_log():
-    """Get security audit log for employees"""
-    current_employee_id = get_jwt_identity()
-    current_employee = Employee.query.get(current_employee_id)
+    """Browse the organization's audit history with keyset pagination"""
+    current_employee = current_principal()
     
     if not current_employee or current_employee.role not in ['admin', 'super_admin']:
         return jsonify({'error': 'Insufficient permissions'}), 403
     
-    # For now, return a placeholder - in a real system, you'd have an audit table
-    audit_events = [
-        {
-            'timestamp': datetime.utcnow().isoformat(),
-            'event_type': 'login',
-            'employee_id': current_employee_id,
-            'ip_address': request.remote_addr,
-            'user_agent': request.headers.get('User-Agent', 'Unknown')
-        }
-    ]
+    organization_id = current_employee.organization_id
+    if current_employee.role == 'super_admin' and request.args.get('organization_id'):
+        organization_id = request.args.get('organization_id', type=int)
+    
+    limit = parse_limit(request.args.get('limit'), default=50, maximum=500)
+    try:
+        logs, next_cursor = query_audit_logs(
+            organization_id,
+            cursor=request.args.get('cursor'),
+            limit=limit,
+            user_id=request.args.get('user_id', type=int),
+            action=request.args.get('action'),
+            resource_type=request.args.get('resource_type'),
+            resource_id=request.args.get('resource_id', type=int),
+            archived=request.args.get('archived') == 'true'
+        )
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     
     return jsonify({
-        'audit_log': audit_events,
-        'total_events': len(audit_events)
+        'audit_log': [log.to_dict() for log in logs],
+        'next_cursor': next_cursor,
+        'limit': limit
     })
 
 @bp.route('/security/active-sessions', methods=['GET'])
@@ -635,10 +668,13 @@ def lock_account(employee_id):
         if current_employee.organization_id != employee.organization_id:
             return jsonify({'error': 'Cannot lock account from different organization'}), 403
     
+    if employee.status == 'active':
+        adjust_counters(employee.organization_id, active_employees=-1)
     employee.status = 'locked'
     employee.updated_at = datetime.utcnow()
     
     db.session.commit()
+    invalidate_department_summaries(employee.organization_id)
     
     return jsonify({
         'message': f'Account locked for {employee.first_name} {employee.last_name}',
@@ -666,10 +702,13 @@ def unlock_account(employee_id):
         if current_employee.organization_id != employee.organization_id:
             return jsonify({'error': 'Cannot unlock account from different organization'}), 403
     
+    if employee.status != 'active':
+        adjust_counters(employee.organization_id, active_employees=1)
     employee.status = 'active'
     employee.updated_at = datetime.utcnow()
     
     db.session.commit()
+    invalidate_department_summaries(employee.organization_id)
     
     return jsonify({
         'message': f'Account unlocked for {employee.first_name} {employee.last_name}',
@@ -680,50 +719,14 @@ def unlock_account(employee_id):
 @jwt_required()
 def get_departments():
     """Get all departments with enhanced details"""
-    current_employee_id = get_jwt_identity()
-    employee = Employee.query.get(current_employee_id)
+    employee = current_principal()
     
     if not employee:
         return jsonify({'error': 'Unauthorized'}), 401
     
-    # Get departments for the current organization
-    query = Department.query
-    if hasattr(employee, 'organization_id') and employee.organization_id:
-        query = query.filter_by(organization_id=employee.organization_id)
-    
-    departments = query.all()
-    
-    # Enhanced department data with employee counts and manager info
-    dept_data = []
-    for dept in departments:
-        dept_dict = dept.to_dict()
-        
-        # Add manager information
-        if dept.manager_id:
-            manager = Employee.query.get(dept.manager_id)
-            if manager:
-                dept_dict['manager_name'] = f"{manager.first_name} {manager.last_name}"
-                dept_dict['manager_email'] = manager.email
-        
-        # Add department statistics
-        active_employees = Employee.query.filter_by(
-            department_id=dept.id, 
-            status='active'
-        ).count()
-        dept_dict['active_employee_count'] = active_employees
-        
-        # Add recent hires (last 30 days)
-        from datetime import date, timedelta
-        thirty_days_ago = date.today() - timedelta(days=30)
-        recent_hires = Employee.query.filter(
-            Employee.department_id == dept.id,
-            Employee.hire_date >= thirty_days_ago
-        ).count()
-        dept_dict['recent_hires'] = recent_hires
-        
-        dept_data.append(dept_dict)
-    
-    return jsonify(dept_data), 200
+    # One grouped query per organization, served from cache until a write
+    organization_id = getattr(employee, 'organization_id', None) or None
+    return jsonify(get_department_summaries(organization_id)), 200
 
 @bp.route('/departments', methods=['POST'])
 @jwt_required()
@@ -768,7 +771,9 @@ def create_department():
         department.organization_id = employee.organization_id
     
     db.session.add(department)
+    adjust_counters(department.organization_id, departments=1)
     db.session.commit()
+    invalidate_department_summaries(department.organization_id)
     
     return jsonify(department.to_dict()), 201
 
@@ -815,6 +820,7 @@ def update_department(dept_id):
     
     department.updated_at = datetime.utcnow()
     db.session.commit()
+    invalidate_department_summaries(department.organization_id)
     
     return jsonify(department.to_dict()), 200
 
@@ -840,8 +846,11 @@ def delete_department(dept_id):
     if employee_count > 0:
         return jsonify({'error': f'Cannot delete department with {employee_count} employees. Please reassign employees first.'}), 400
     
+    organization_id = department.organization_id
+    adjust_counters(organization_id, departments=-1)
     db.session.delete(department)
     db.session.commit()
+    invalidate_department_summaries(organization_id)
     
     return jsonify({'message': 'Department deleted successfully'}), 200
 
@@ -849,8 +858,7 @@ def delete_department(dept_id):
 @jwt_required()
 def get_department_employees(dept_id):
     """Get all employees in a specific department"""
-    current_employee_id = get_jwt_identity()
-    employee = Employee.query.get(current_employee_id)
+    employee = current_principal()
     
     if not employee:
         return jsonify({'error': 'Unauthorized'}), 401
@@ -862,9 +870,14 @@ def get_department_employees(dept_id):
         if employee.organization_id != department.organization_id:
             return jsonify({'error': 'Access denied'}), 403
     
-    employees = Employee.query.filter_by(department_id=dept_id).all()
+    try:
+        serializer = EMPLOYEE_SERIALIZER.project(request.args.get('fields'))
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
+    
+    rows = serializer.select(Employee.query.filter_by(department_id=dept_id).order_by(Employee.id)).all()
     
     return jsonify({
         'department': department.to_dict(),
-        'employees': [emp.to_dict() for emp in employees]
+        'employees': serializer.dump(rows)
     }), 200
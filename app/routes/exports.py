@@ -0,0 +1,154 @@
+from flask import Blueprint, request, jsonify, Response, current_app, stream_with_context
+from flask_jwt_extended import jwt_required
+from sqlalchemy import select
+from app import db
+from app.models.employee import Employee
+from app.models.department import Department
+from app.models.attendance import Attendance
+from app.models.leave import Leave
+from app.models.payroll import Payroll
+from app.utils.permissions import current_principal, principal_has_permission
+from datetime import date, datetime
+import csv
+import io
+import json
+
+bp = Blueprint('exports', __name__, url_prefix='/api/exports')
+
+# Dataset name -> permissions that allow exporting it (any one suffices). The
+# employee role reads its own attendance and leaves, so organization-wide
+# exports of those need the managing grants.
+EXPORT_PERMISSIONS = {
+    'employees': ('view_employees',),
+    'attendance': ('attendance.manage',),
+    'leaves': ('leaves.manage', 'leaves.approve'),
+    'payroll': ('payroll.read', 'payroll.manage'),
+}
+
+# Employee exports only carry salaries for principals who may read payroll
+SALARY_PERMISSIONS = EXPORT_PERMISSIONS['payroll']
+
+# Dataset name -> (columns, date column used for start_date/end_date filters)
+EXPORT_DATASETS = {
+    'employees': ([
+        Employee.id, Employee.employee_id, Employee.first_name, Employee.last_name,
+        Employee.email, Employee.phone, Employee.position, Employee.department_id,
+        Department.name.label('department_name'), Employee.hire_date, Employee.status,
+        Employee.role, Employee.salary
+    ], Employee.hire_date),
+    'attendance': ([
+        Attendance.id, Attendance.employee_id, Employee.employee_id.label('employee_code'),
+        Attendance.date, Attendance.check_in, Attendance.check_out, Attendance.status,
+        Attendance.notes
+    ], Attendance.date),
+    'leaves': ([
+        Leave.id, Leave.employee_id, Employee.employee_id.label('employee_code'),
+        Leave.leave_type, Leave.start_date, Leave.end_date, Leave.days, Leave.status,
+        Leave.approved_by, Leave.approved_at, Leave.created_at
+    ], Leave.start_date),
+    'payroll': ([
+        Payroll.id, Payroll.employee_id, Employee.employee_id.label('employee_code'),
+        Payroll.year, Payroll.month, Payroll.basic_salary, Payroll.allowances,
+        Payroll.deductions, Payroll.bonus, Payroll.net_salary, Payroll.payment_date,
+        Payroll.payment_method, Payroll.status
+    ], Payroll.payment_date),
+}
+
+def _can_export(principal, permission_names):
+    return any(principal_has_permission(principal, name) for name in permission_names)
+
+def _build_statement(dataset, organization_id, args, include_salary=True):
+    """Build the tenant-scoped SELECT for a dataset from the request filters"""
+    columns, date_column = EXPORT_DATASETS[dataset]
+    stmt = select(*[column for column in columns if include_salary or column is not Employee.salary])
+    
+    if dataset == 'employees':
+        stmt = stmt.outerjoin(Department, Employee.department_id == Department.id)
+        order = [Employee.id]
+    else:
+        model = date_column.class_
+        stmt = stmt.join(Employee, model.employee_id == Employee.id)
+        order = [model.id]
+        if args.get('employee_id'):
+            stmt = stmt.where(model.employee_id == int(args['employee_id']))
+    
+    stmt = stmt.where(Employee.organization_id == organization_id)
+    
+    if args.get('start_date'):
+        stmt = stmt.where(date_column >= datetime.strptime(args['start_date'], '%Y-%m-%d').date())
+    if args.get('end_date'):
+        stmt = stmt.where(date_column <= datetime.strptime(args['end_date'], '%Y-%m-%d').date())
+    if args.get('status'):
+        stmt = stmt.where(columns[0].class_.status == args['status'])
+    if dataset == 'payroll':
+        if args.get('year'):
+            stmt = stmt.where(Payroll.year == int(args['year']))
+        if args.get('month'):
+            stmt = stmt.where(Payroll.month == int(args['month']))
+    
+    return stmt.order_by(*order)
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def _stream_rows(stmt, fmt, batch_size):
+    """Yield the export body in chunks, holding at most one batch of rows"""
+    result = db.session.execute(stmt.execution_options(yield_per=batch_size))
+    keys = list(result.keys())
+    
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(keys)
+        for partition in result.partitions():
+            for row in partition:
+                writer.writerow(['' if value is None else _plain(value) for value in row])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    else:
+        for partition in result.partitions():
+            yield ''.join(
+                json.dumps(dict(zip(keys, map(_plain, row))), separators=(',', ':')) + '\n'
+                for row in partition
+            )
+
+@bp.route('/<dataset>', methods=['GET'])
+@jwt_required()
+def export_dataset(dataset):
+    """Stream a dataset as NDJSON (default) or CSV"""
+    current_employee = current_principal()
+    
+    if not current_employee:
+        return jsonify({'error': 'Insufficient permissions'}), 403
+    if dataset not in EXPORT_DATASETS:
+        return jsonify({'error': f'Unknown dataset: {dataset}'}), 404
+    if not _can_export(current_employee, EXPORT_PERMISSIONS[dataset]):
+        return jsonify({'error': 'Insufficient permissions'}), 403
+    
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in ('ndjson', 'csv'):
+        return jsonify({'error': 'format must be ndjson or csv'}), 400
+    
+    try:
+        stmt = _build_statement(dataset, current_employee.organization_id, request.args,
+                                include_salary=_can_export(current_employee, SALARY_PERMISSIONS))
+    except ValueError:
+        return jsonify({'error': 'Invalid filter value'}), 400
+    
+    batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    filename = f"{dataset}-{date.today().isoformat()}.{'csv' if fmt == 'csv' else 'ndjson'}"
+    
+    return Response(
+        stream_with_context(_stream_rows(stmt, fmt, batch_size)),
+        mimetype='text/csv' if fmt == 'csv' else 'application/x-ndjson',
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'no-store',
+            'X-Accel-Buffering': 'no'
+        }
+    )
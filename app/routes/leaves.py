@@ -1,7 +1,15 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import update
 from app import db
 from app.models.leave import Leave
+from app.models.employee import Employee
+from app.utils.permissions import get_employees_with_permission
+from app.utils.pagination import paginated_list
+from app.utils.serializers import LEAVE_SERIALIZER
+from app.utils.counters import adjust_counters, organization_id_for_employee
+from app.utils.analytics import invalidate_analytics
+from app.utils.rollups import rewind_rollups
 from datetime import datetime
 
 bp = Blueprint('leaves', __name__, url_prefix='/api/leaves')
@@ -20,8 +28,28 @@ def get_leaves():
     if status:
         query = query.filter_by(status=status)
     
-    leaves = query.order_by(Leave.created_at.desc()).all()
-    return jsonify([leave.to_dict() for leave in leaves]), 200
+    return paginated_list(query, [Leave.created_at, Leave.id], row_serializer=LEAVE_SERIALIZER)
+
+@bp.route('/approvers', methods=['GET'])
+@jwt_required()
+def get_leave_approvers():
+    """Get employees in the organization who can approve leave requests"""
+    current_employee = Employee.query.get(get_jwt_identity())
+    if not current_employee or not current_employee.organization_id:
+        return jsonify({'error': 'Organization not found'}), 404
+    
+    approver_ids = get_employees_with_permission(
+        'leaves.approve',
+        organization_id=current_employee.organization_id
+    )
+    approvers = Employee.query.filter(Employee.id.in_(approver_ids)).all() if approver_ids else []
+    
+    return jsonify([{
+        'id': approver.id,
+        'name': f"{approver.first_name} {approver.last_name}",
+        'email': approver.email,
+        'position': approver.position
+    } for approver in approvers]), 200
 
 @bp.route('/<int:leave_id>', methods=['GET'])
 @jwt_required()
@@ -53,24 +81,37 @@ def create_leave():
     )
     
     db.session.add(leave)
+    adjust_counters(organization_id_for_employee(employee_id), pending_leaves=1)
     db.session.commit()
     
     return jsonify(leave.to_dict()), 201
 
+def _decide_leave(leave_id, status):
+    """Move a pending leave to status in one conditional UPDATE; False if it was already decided.
+    
+    Concurrent approve/reject calls race on the same row, so only the one
+    whose UPDATE matched may adjust the pending counter.
+    """
+    result = db.session.execute(update(Leave).where(
+        Leave.id == leave_id, Leave.status == 'pending'
+    ).values(
+        status=status, approved_by=get_jwt_identity(), approved_at=datetime.utcnow()
+    ), execution_options={'synchronize_session': False})
+    return result.rowcount == 1
+
 @bp.route('/<int:leave_id>/approve', methods=['POST'])
 @jwt_required()
 def approve_leave(leave_id):
     """Approve leave request"""
     leave = Leave.query.get_or_404(leave_id)
-    approver_id = get_jwt_identity()
     
-    if leave.status != 'pending':
+    if not _decide_leave(leave_id, 'approved'):
         return jsonify({'error': 'Leave request is not pending'}), 400
     
-    leave.status = 'approved'
-    leave.approved_by = approver_id
-    leave.approved_at = datetime.utcnow()
-    
+    organization_id = organization_id_for_employee(leave.employee_id)
+    adjust_counters(organization_id, pending_leaves=-1)
+    rewind_rollups(leave.start_date, organization_id)
+    invalidate_analytics(organization_id, leave.start_date)
     db.session.commit()
     return jsonify(leave.to_dict()), 200
 
@@ -79,15 +120,11 @@ def approve_leave(leave_id):
 def reject_leave(leave_id):
     """Reject leave request"""
     leave = Leave.query.get_or_404(leave_id)
-    approver_id = get_jwt_identity()
     
-    if leave.status != 'pending':
+    if not _decide_leave(leave_id, 'rejected'):
         return jsonify({'error': 'Leave request is not pending'}), 400
     
-    leave.status = 'rejected'
-    leave.approved_by = approver_id
-    leave.approved_at = datetime.utcnow()
-    
+    adjust_counters(organization_id_for_employee(leave.employee_id), pending_leaves=-1)
     db.session.commit()
     return jsonify(leave.to_dict()), 200
 
@@ -126,6 +163,7 @@ def delete_leave(leave_id):
     if leave.status != 'pending':
         return jsonify({'error': 'Cannot delete approved or rejected leave'}), 400
     
+    adjust_counters(organization_id_for_employee(leave.employee_id), pending_leaves=-1)
     db.session.delete(leave)
     db.session.commit()
     return jsonify({'message': 'Leave request deleted successfully'}), 200
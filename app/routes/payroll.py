@@ -1,11 +1,32 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import IntegrityError
 from app import db
-from app.models.payroll import Payroll
-from datetime import datetime
+from app.models.payroll import Payroll, PayrollRun
+from app.utils.pagination import paginated_list
+from app.utils.serializers import PAYROLL_SERIALIZER
+from app.utils.analytics import invalidate_analytics
+from app.utils.rollups import rewind_rollups
+from app.utils.counters import organization_id_for_employee
+from app.utils.payroll_runs import run_payroll, PayrollRunConflict
+from app.utils.permissions import current_principal, has_permission
+from datetime import datetime, date
 
 bp = Blueprint('payroll', __name__, url_prefix='/api/payroll')
 
+def _parse_period(data):
+    """(month, year) from a request body, raising ValueError unless they name a real month"""
+    month, year = int(data['month']), int(data['year'])
+    if not 1 <= month <= 12:
+        raise ValueError('month must be between 1 and 12')
+    if not 1 <= year <= 9999:
+        raise ValueError('year must be between 1 and 9999')
+    return month, year
+
+def _payroll_period(payroll):
+    """(organization_id, month start) used to drop the payroll's cached analytics and rollups"""
+    return organization_id_for_employee(payroll.employee_id), date(payroll.year, payroll.month, 1)
+
 @bp.route('', methods=['GET'])
 @jwt_required()
 def get_payrolls():
@@ -26,8 +47,7 @@ def get_payrolls():
     if status:
         query = query.filter_by(status=status)
     
-    payrolls = query.order_by(Payroll.year.desc(), Payroll.month.desc()).all()
-    return jsonify([payroll.to_dict() for payroll in payrolls]), 200
+    return paginated_list(query, [Payroll.year, Payroll.month, Payroll.id], row_serializer=PAYROLL_SERIALIZER)
 
 @bp.route('/<int:payroll_id>', methods=['GET'])
 @jwt_required()
@@ -47,36 +67,91 @@ def create_payroll():
         if field not in data:
             return jsonify({'error': f'{field} is required'}), 400
     
-    # Check if payroll already exists for employee in that month/year
-    existing = Payroll.query.filter_by(
-        employee_id=data['employee_id'],
-        month=data['month'],
-        year=data['year']
-    ).first()
-    
-    if existing:
-        return jsonify({'error': 'Payroll already exists for this employee in this month/year'}), 400
+    try:
+        month, year = _parse_period(data)
+        payment_date = datetime.strptime(data['payment_date'], '%Y-%m-%d').date() if data.get('payment_date') else None
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid payroll: {str(e)}'}), 400
     
     payroll = Payroll(
         employee_id=data['employee_id'],
-        month=data['month'],
-        year=data['year'],
+        month=month,
+        year=year,
         basic_salary=data['basic_salary'],
         allowances=data.get('allowances', 0.0),
         deductions=data.get('deductions', 0.0),
         bonus=data.get('bonus', 0.0),
         net_salary=data['net_salary'],
-        payment_date=datetime.strptime(data['payment_date'], '%Y-%m-%d').date() if data.get('payment_date') else None,
+        payment_date=payment_date,
         payment_method=data.get('payment_method'),
         status=data.get('status', 'pending'),
         notes=data.get('notes')
     )
     
+    organization_id, period_start = _payroll_period(payroll)
     db.session.add(payroll)
-    db.session.commit()
+    try:
+        rewind_rollups(period_start, organization_id)
+        invalidate_analytics(organization_id, period_start)
+        db.session.commit()
+    except IntegrityError:
+        # uq_payrolls_employee_period: one payroll per employee and month
+        db.session.rollback()
+        return jsonify({'error': 'Payroll already exists for this employee in this month/year'}), 400
     
     return jsonify(payroll.to_dict()), 201
 
+@bp.route('/runs', methods=['POST'])
+@jwt_required()
+@has_permission('payroll.manage')
+def create_payroll_run():
+    """Generate payroll for every active employee of the organization for a month.
+    
+    Posting the same month again resumes an interrupted run from its last
+    committed chunk. Pay is computed in this process; process pools
+    (PAYROLL_WORKERS) are left to `flask payroll close`.
+    """
+    principal = current_principal()
+    if not principal.organization_id:
+        return jsonify({'error': 'No organization associated with this account'}), 400
+    
+    data = request.get_json() or {}
+    for field in ['month', 'year']:
+        if field not in data:
+            return jsonify({'error': f'{field} is required'}), 400
+    
+    try:
+        month, year = _parse_period(data)
+        allowance_rate = float(data['allowance_rate']) if data.get('allowance_rate') is not None else None
+        chunk_size = int(data['chunk_size']) if data.get('chunk_size') is not None else None
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError('chunk_size must be positive')
+        payment_date = datetime.strptime(data['payment_date'], '%Y-%m-%d').date() if data.get('payment_date') else None
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid payroll run: {str(e)}'}), 400
+    
+    try:
+        result = run_payroll(principal.organization_id, year, month, allowance_rate=allowance_rate,
+                             payment_date=payment_date, payment_method=data.get('payment_method'),
+                             workers=1, chunk_size=chunk_size)
+    except PayrollRunConflict as e:
+        return jsonify({'error': str(e)}), 409
+    except Exception as e:
+        return jsonify({'error': f'Payroll run failed: {str(e)}'}), 500
+    
+    return jsonify(result), 201
+
+@bp.route('/runs/<int:run_id>', methods=['GET'])
+@jwt_required()
+@has_permission('payroll.read', 'payroll.manage')
+def get_payroll_run(run_id):
+    """Get a payroll run's progress"""
+    principal = current_principal()
+    run = PayrollRun.query.get_or_404(run_id)
+    if run.organization_id != principal.organization_id:
+        return jsonify({'error': 'Payroll run not found'}), 404
+    return jsonify(run.to_dict()), 200
+
 @bp.route('/<int:payroll_id>', methods=['PUT'])
 @jwt_required()
 def update_payroll(payroll_id):
@@ -104,6 +179,9 @@ def update_payroll(payroll_id):
         payroll.notes = data['notes']
     
     payroll.updated_at = datetime.utcnow()
+    organization_id, period_start = _payroll_period(payroll)
+    rewind_rollups(period_start, organization_id)
+    invalidate_analytics(organization_id, period_start)
     db.session.commit()
     
     return jsonify(payroll.to_dict()), 200
@@ -113,6 +191,9 @@ def update_payroll(payroll_id):
 def delete_payroll(payroll_id):
     """Delete payroll record"""
     payroll = Payroll.query.get_or_404(payroll_id)
+    organization_id, period_start = _payroll_period(payroll)
     db.session.delete(payroll)
+    rewind_rollups(period_start, organization_id)
+    invalidate_analytics(organization_id, period_start)
     db.session.commit()
     return jsonify({'message': 'Payroll record deleted successfully'}), 200
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.performance import PerformanceReview
+from app.utils.pagination import paginated_list
 from datetime import datetime
 
 bp = Blueprint('performance', __name__, url_prefix='/api/performance')
@@ -20,8 +21,7 @@ def get_performance_reviews():
     if status:
         query = query.filter_by(status=status)
     
-    reviews = query.order_by(PerformanceReview.created_at.desc()).all()
-    return jsonify([review.to_dict() for review in reviews]), 200
+    return paginated_list(query, [PerformanceReview.created_at, PerformanceReview.id])
 
 @bp.route('/<int:review_id>', methods=['GET'])
 @jwt_required()
@@ -1,12 +1,16 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.employee import Employee
-from app.models.rbac import Role, Permission, RolePermission, EmployeeRole, OrganizationSetting, AuditLog
+from app.models.rbac import Role, Permission, RolePermission, EmployeeRole, OrganizationSetting
 from app.utils.permissions import (
-    has_permission, assign_role_to_employee, remove_role_from_employee,
+    has_permission, assign_role_to_employee, assign_roles_to_employees, remove_role_from_employee,
     get_organization_setting, set_organization_setting, log_audit_action,
-    get_user_permissions
+    get_user_permissions, invalidate_organization_permissions,
+    invalidate_permission_matrix, get_employees_with_permission, current_principal
 )
+from app.utils.audit import query_audit_logs
+from app.utils.pagination import parse_limit, InvalidCursor
+from app.utils.database import read_only
 from app import db
 import json
 
@@ -19,7 +23,7 @@ def get_roles():
     """Get all roles for the organization"""
     try:
         current_user_id = get_jwt_identity()
-        employee = Employee.query.get(current_user_id)
+        employee = current_principal()
         
         if not employee or not employee.organization_id:
             return jsonify({'error': 'Organization not found'}), 404
@@ -40,7 +44,7 @@ def create_role():
     """Create a new role"""
     try:
         current_user_id = get_jwt_identity()
-        employee = Employee.query.get(current_user_id)
+        employee = current_principal()
         
         if not employee or not employee.organization_id:
             return jsonify({'error': 'Organization not found'}), 404
@@ -81,6 +85,7 @@ def create_role():
                 )
                 db.session.add(role_permission)
         
+        invalidate_permission_matrix(role.organization_id)
         db.session.commit()
         
         # Log the action
@@ -107,7 +112,7 @@ def update_role(role_id):
     """Update a role"""
     try:
         current_user_id = get_jwt_identity()
-        employee = Employee.query.get(current_user_id)
+        employee = current_principal()
         
         role = Role.query.filter_by(
             id=role_id,
@@ -146,6 +151,8 @@ def update_role(role_id):
                     )
                     db.session.add(role_permission)
         
+        invalidate_permission_matrix(role.organization_id)
+        invalidate_organization_permissions(employee.organization_id)
         db.session.commit()
         
         # Log the action
@@ -173,7 +180,7 @@ def delete_role(role_id):
     """Delete a role"""
     try:
         current_user_id = get_jwt_identity()
-        employee = Employee.query.get(current_user_id)
+        employee = current_principal()
         
         role = Role.query.filter_by(
             id=role_id,
@@ -205,6 +212,8 @@ def delete_role(role_id):
         
         # Delete the role
         db.session.delete(role)
+        invalidate_permission_matrix(role.organization_id)
+        invalidate_organization_permissions(employee.organization_id)
         db.session.commit()
         
         return jsonify({'message': 'Role deleted successfully'}), 200
@@ -235,6 +244,44 @@ def get_permissions():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@rbac_bp.route('/permissions/check', methods=['POST'])
+@jwt_required()
+@has_permission('view_roles_permissions')
+@read_only
+def check_permission_batch():
+    """Check which employees of the organization hold a permission"""
+    try:
+        current_user_id = get_jwt_identity()
+        employee = current_principal()
+        
+        if not employee or not employee.organization_id:
+            return jsonify({'error': 'Organization not found'}), 404
+        
+        data = request.get_json()
+        if not data or not data.get('permission'):
+            return jsonify({'error': 'Permission name is required'}), 400
+        
+        employee_ids = data.get('employee_ids')
+        if employee_ids is not None and not isinstance(employee_ids, list):
+            return jsonify({'error': 'employee_ids must be a list'}), 400
+        
+        granted = get_employees_with_permission(
+            data['permission'],
+            employee_ids=employee_ids,
+            organization_id=employee.organization_id
+        )
+        
+        response = {
+            'permission': data['permission'],
+            'granted': sorted(granted)
+        }
+        if employee_ids is not None:
+            response['denied'] = sorted(set(employee_ids) - granted)
+        
+        return jsonify(response), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @rbac_bp.route('/employees/<int:employee_id>/roles', methods=['GET'])
 @jwt_required()
 @has_permission('view_employees')
@@ -242,7 +289,7 @@ def get_employee_roles(employee_id):
     """Get roles assigned to an employee"""
     try:
         current_user_id = get_jwt_identity()
-        current_employee = Employee.query.get(current_user_id)
+        current_employee = current_principal()
         
         employee = Employee.query.filter_by(
             id=employee_id,
@@ -268,7 +315,7 @@ def assign_employee_role(employee_id):
     """Assign a role to an employee"""
     try:
         current_user_id = get_jwt_identity()
-        current_employee = Employee.query.get(current_user_id)
+        current_employee = current_principal()
         
         employee = Employee.query.filter_by(
             id=employee_id,
@@ -308,6 +355,70 @@ def assign_employee_role(employee_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@rbac_bp.route('/employees/roles/bulk', methods=['POST'])
+@jwt_required()
+@has_permission('manage_employee_roles')
+def bulk_assign_employee_roles():
+    """Assign a set of roles to a set of employees in one batch"""
+    try:
+        current_user_id = get_jwt_identity()
+        current_employee = current_principal()
+        
+        data = request.get_json() or {}
+        employee_ids = data.get('employee_ids') or []
+        role_ids = data.get('role_ids') or []
+        primary_role_id = data.get('primary_role_id')
+        
+        if not isinstance(employee_ids, list) or not isinstance(role_ids, list):
+            return jsonify({'error': 'employee_ids and role_ids must be arrays'}), 400
+        if not employee_ids or not (role_ids or primary_role_id):
+            return jsonify({'error': 'employee_ids and role_ids are required'}), 400
+        
+        try:
+            employee_ids = {int(e) for e in employee_ids}
+            role_ids = {int(r) for r in role_ids}
+            if primary_role_id is not None:
+                primary_role_id = int(primary_role_id)
+                role_ids.add(primary_role_id)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'IDs must be integers'}), 400
+        
+        # Verify every employee and role belongs to the organization
+        found_roles = {row[0] for row in db.session.query(Role.id).filter(
+            Role.id.in_(role_ids),
+            Role.organization_id == current_employee.organization_id
+        )}
+        if found_roles != role_ids:
+            return jsonify({'error': 'Role not found', 'role_ids': sorted(role_ids - found_roles)}), 404
+        
+        found_employees = set()
+        id_list = sorted(employee_ids)
+        for start in range(0, len(id_list), 500):
+            found_employees.update(row[0] for row in db.session.query(Employee.id).filter(
+                Employee.id.in_(id_list[start:start + 500]),
+                Employee.organization_id == current_employee.organization_id
+            ))
+        if found_employees != employee_ids:
+            return jsonify({
+                'error': 'Employee not found',
+                'employee_ids': sorted(employee_ids - found_employees)
+            }), 404
+        
+        success, message, stats = assign_roles_to_employees(
+            employee_ids=employee_ids,
+            role_ids=role_ids,
+            organization_id=current_employee.organization_id,
+            assigned_by_id=current_user_id,
+            primary_role_id=primary_role_id
+        )
+        
+        if success:
+            return jsonify({'message': message, **stats}), 200
+        else:
+            return jsonify({'error': message}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @rbac_bp.route('/employees/<int:employee_id>/roles/<int:role_id>', methods=['DELETE'])
 @jwt_required()
 @has_permission('manage_employee_roles')
@@ -315,7 +426,7 @@ def remove_employee_role(employee_id, role_id):
     """Remove a role from an employee"""
     try:
         current_user_id = get_jwt_identity()
-        current_employee = Employee.query.get(current_user_id)
+        current_employee = current_principal()
         
         employee = Employee.query.filter_by(
             id=employee_id,
@@ -345,7 +456,7 @@ def get_organization_settings():
     """Get organization settings"""
     try:
         current_user_id = get_jwt_identity()
-        employee = Employee.query.get(current_user_id)
+        employee = current_principal()
         
         if not employee or not employee.organization_id:
             return jsonify({'error': 'Organization not found'}), 404
@@ -380,7 +491,7 @@ def update_organization_settings():
     """Update organization settings"""
     try:
         current_user_id = get_jwt_identity()
-        employee = Employee.query.get(current_user_id)
+        employee = current_principal()
         
         if not employee or not employee.organization_id:
             return jsonify({'error': 'Organization not found'}), 404
@@ -426,44 +537,34 @@ def update_organization_settings():
 @jwt_required()
 @has_permission('view_audit_logs')
 def get_audit_logs():
-    """Get audit logs for the organization"""
+    """Get one keyset page of the organization's audit logs, newest first"""
     try:
-        current_user_id = get_jwt_identity()
-        employee = Employee.query.get(current_user_id)
+        employee = current_principal()
         
         if not employee or not employee.organization_id:
             return jsonify({'error': 'Organization not found'}), 404
         
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 50, type=int)
-        action = request.args.get('action')
-        resource_type = request.args.get('resource_type')
-        user_id = request.args.get('user_id', type=int)
-        
-        query = AuditLog.query.filter_by(organization_id=employee.organization_id)
-        
-        if action:
-            query = query.filter(AuditLog.action.ilike(f'%{action}%'))
-        if resource_type:
-            query = query.filter_by(resource_type=resource_type)
-        if user_id:
-            query = query.filter_by(user_id=user_id)
-        
-        query = query.order_by(AuditLog.timestamp.desc())
-        
-        paginated = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
-        
-        return jsonify({
-            'audit_logs': [log.to_dict() for log in paginated.items],
-            'total': paginated.total,
-            'page': page,
-            'per_page': per_page,
-            'total_pages': paginated.pages
-        }), 200
+        limit = parse_limit(request.args.get('limit') or request.args.get('per_page'), default=50, maximum=500)
+        try:
+            logs, next_cursor = query_audit_logs(
+                employee.organization_id,
+                cursor=request.args.get('cursor'),
+                limit=limit,
+                user_id=request.args.get('user_id', type=int),
+                action=request.args.get('action'),
+                resource_type=request.args.get('resource_type')
+            )
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        response = jsonify({
+            'audit_logs': [log.to_dict() for log in logs],
+            'next_cursor': next_cursor,
+            'limit': limit
+        })
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response, 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -473,7 +574,7 @@ def get_my_permissions():
     """Get current user's permissions"""
     try:
         current_user_id = get_jwt_identity()
-        employee = Employee.query.get(current_user_id)
+        employee = current_principal()
         
         if not employee:
             return jsonify({'error': 'Employee not found'}), 404
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from app import db
 from app.models.recruitment import JobPosting, Applicant
+from app.utils.pagination import paginated_list
 from datetime import datetime
 
 bp = Blueprint('recruitment', __name__, url_prefix='/api/recruitment')
@@ -105,8 +106,7 @@ def get_applicants():
     if status:
         query = query.filter_by(status=status)
     
-    applicants = query.order_by(Applicant.applied_date.desc()).all()
-    return jsonify([applicant.to_dict() for applicant in applicants]), 200
+    return paginated_list(query, [Applicant.applied_date, Applicant.id])
 
 @bp.route('/applicants/<int:applicant_id>', methods=['GET'])
 @jwt_required()
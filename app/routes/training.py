@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.training import TrainingProgram, TrainingEnrollment, EmployeeDocument, EmployeeBenefit
 from app.models.employee import Employee
+from app.utils.pagination import paginated_list
 from app import db
 from datetime import datetime
 import os
@@ -108,8 +109,7 @@ def delete_training_program(program_id):
 def get_training_enrollments():
     """Get all training enrollments"""
     try:
-        enrollments = TrainingEnrollment.query.all()
-        return jsonify([enrollment.to_dict() for enrollment in enrollments]), 200
+        return paginated_list(TrainingEnrollment.query, [TrainingEnrollment.id], descending=False)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -0,0 +1,510 @@
+import calendar
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from sqlalchemy import and_, case, distinct, extract, func, select
+from app.models.attendance import Attendance
+from app.models.department import Department
+from app.models.employee import Employee
+from app.models.leave import Leave
+from app.models.payroll import Payroll
+from app.models.performance import PerformanceReview
+from app.models.training import TrainingEnrollment, EmployeeBenefit
+from app.utils.cache import TTLCache
+from app.utils.cache_versions import bump_cache_version, read_cache_version
+from app.utils.rollups import daily_attendance, leave_days_by_type
+from app.utils.workforce import (
+    load_workforce, salary_bands, percentiles, tenure_summary, department_summary, pay_equity
+)
+from app import db
+
+# Computed metrics keyed by (organization_id, metric, 'YYYY-MM'). Entries for
+# the current month expire after ANALYTICS_CACHE_TTL; closed months change
+# rarely and are kept for ANALYTICS_HISTORY_TTL. Entries are stamped with the
+# organization's persisted analytics version, which backdated writes bump
+# through invalidate_analytics(org_id, on_date). Attendance and leave series
+# read the daily fact tables maintained by app.utils.rollups.
+analytics_cache = TTLCache(maxsize=4096, ttl=300)
+_history_ttl = 86400
+
+# Persisted analytics versions by organization, re-read at most once per
+# ANALYTICS_VERSION_TTL seconds
+analytics_versions = TTLCache(maxsize=4096, ttl=30)
+
+ATTENDED_STATUSES = ('present', 'late', 'half-day')
+LEFT_STATUSES = ('inactive', 'terminated')
+HIGH_PERFORMER_RATING = 4.5
+LOW_PERFORMER_RATING = 2.5
+STANDARD_DAY_HOURS = 8
+TREND_PERIODS = {'3m': 3, '6m': 6, '12m': 12}
+
+class InvalidPeriod(ValueError):
+    """Raised when a period parameter is not a YYYY-MM month"""
+
+def configure_analytics_cache(app):
+    global _history_ttl
+    analytics_cache.configure(maxsize=app.config.get('ANALYTICS_CACHE_SIZE', 4096),
+                              ttl=app.config.get('ANALYTICS_CACHE_TTL', 300))
+    _history_ttl = app.config.get('ANALYTICS_HISTORY_TTL', 86400)
+    analytics_versions.configure(maxsize=app.config.get('ANALYTICS_CACHE_SIZE', 4096),
+                                 ttl=app.config.get('ANALYTICS_VERSION_TTL', 30))
+    analytics_versions.clear()
+
+def _version_name(organization_id):
+    return f'analytics:{organization_id}'
+
+def get_analytics_version(organization_id):
+    """Current persisted analytics version for an organization"""
+    version = analytics_versions.get(organization_id)
+    if version is None:
+        version = read_cache_version(_version_name(organization_id))
+        analytics_versions.set(organization_id, version)
+    return version
+
+def invalidate_analytics(organization_id, on_date=None):
+    """Drop cached analytics affected by a write dated on_date (None: any date).
+
+    Call it before committing, next to rewind_rollups(on_date, organization_id).
+    A write inside the current month only drops this process's current-month
+    entries, which expire everywhere within ANALYTICS_CACHE_TTL. Any other
+    date bumps the organization's persisted version in the write's
+    transaction so every process drops its months: trend head counts and
+    twelve-month windows carry an earlier month forward into later ones.
+    """
+    current = date.today().strftime('%Y-%m')
+    if on_date is not None and on_date.strftime('%Y-%m') == current:
+        analytics_cache.delete_where(lambda key: key[0] == organization_id and key[2] == current)
+        return
+    bump_cache_version(_version_name(organization_id))
+    analytics_versions.delete(organization_id)
+
+def parse_period(value=None):
+    """Return (label, first day, last day) for a YYYY-MM month, defaulting to the current one"""
+    if not value:
+        value = date.today().strftime('%Y-%m')
+    try:
+        start = datetime.strptime(value, '%Y-%m').date()
+    except (TypeError, ValueError) as e:
+        raise InvalidPeriod('period must be YYYY-MM') from e
+    end = start.replace(day=calendar.monthrange(start.year, start.month)[1])
+    return value, start, end
+
+def _shift_month(day, months):
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def _percent(part, whole):
+    return round(part * 100.0 / whole, 1) if whole else 0.0
+
+def _rounded(value, digits=2):
+    return round(float(value), digits) if value is not None else None
+
+def _month_key(column):
+    return extract('year', column) * 12 + extract('month', column)
+
+def _worked_hours():
+    """Hours between check-in and check-out, NULL while still checked in"""
+    if db.engine.dialect.name == 'sqlite':
+        hours = (func.julianday(Attendance.check_out) - func.julianday(Attendance.check_in)) * 24
+    else:
+        hours = extract('epoch', Attendance.check_out - Attendance.check_in) / 3600
+    return case((and_(Attendance.check_in.isnot(None), Attendance.check_out.isnot(None)), hours))
+
+def _cached(organization_id, metric, label, compute):
+    key = (organization_id, metric, label)
+    version = get_analytics_version(organization_id)
+    value = analytics_cache.get(key, version=version)
+    if value is None:
+        value = compute()
+        current = label == date.today().strftime('%Y-%m')
+        analytics_cache.set(key, value, version=version, ttl=None if current else _history_ttl)
+    return value
+
+def employee_metrics(organization_id, period=None):
+    """Headcount, hires, turnover and tenure for one month"""
+    label, start, end = parse_period(period)
+    
+    def compute():
+        left_from = datetime.combine(start, datetime.min.time())
+        left_to = datetime.combine(end + timedelta(days=1), datetime.min.time())
+        row = db.session.execute(select(
+            func.count(Employee.id),
+            func.count(case((Employee.status == 'active', 1))),
+            func.count(case((Employee.hire_date.between(start, end), 1))),
+            func.count(case((and_(Employee.status.in_(LEFT_STATUSES),
+                                  Employee.terminated_at >= left_from, Employee.terminated_at < left_to), 1))),
+            func.avg(case((Employee.status == 'active', _month_key(Employee.hire_date))))
+        ).where(Employee.organization_id == organization_id)).one()
+        total, active, hires, leavers, avg_hire_month = row
+        return {
+            'total_employees': total,
+            'active_employees': active,
+            'new_hires_this_month': hires,
+            'turnover_rate': _percent(leavers, active + leavers),
+            'avg_tenure_months': _rounded(end.year * 12 + end.month - avg_hire_month, 1)
+            if avg_hire_month is not None else 0.0,
+            'employee_satisfaction': None
+        }
+    
+    return _cached(organization_id, 'employees', label, compute)
+
+def attendance_metrics(organization_id, period=None):
+    """Attendance, punctuality, hours and sick leave for one month"""
+    label, start, end = parse_period(period)
+    
+    def compute():
+        hours = _worked_hours()
+        row = db.session.execute(select(
+            func.count(Attendance.id),
+            func.count(case((Attendance.status.in_(ATTENDED_STATUSES), 1))),
+            func.count(case((Attendance.status == 'present', 1))),
+            func.count(case((Attendance.status == 'late', 1))),
+            func.sum(hours),
+            func.sum(case((hours > STANDARD_DAY_HOURS, hours - STANDARD_DAY_HOURS))),
+            func.count(distinct(Attendance.employee_id))
+        ).join(Employee, Attendance.employee_id == Employee.id).where(
+            Employee.organization_id == organization_id,
+            Attendance.date.between(start, end)
+        )).one()
+        records, attended, on_time, late, total_hours, overtime, employees = row
+    
+        sick_days = db.session.execute(select(func.coalesce(func.sum(Leave.days), 0)).join(
+            Employee, Leave.employee_id == Employee.id
+        ).where(
+            Employee.organization_id == organization_id,
+            Leave.leave_type == 'sick',
+            Leave.status == 'approved',
+            Leave.start_date.between(start, end)
+        )).scalar()
+        active = employee_metrics(organization_id, label)['active_employees']
+    
+        weeks = ((min(end, date.today()) - start).days + 1) / 7
+        return {
+            'attendance_rate': _percent(attended, records),
+            'punctuality_rate': _percent(on_time, on_time + late),
+            'avg_hours_per_week': _rounded(total_hours / employees / weeks, 1)
+            if total_hours and employees and weeks > 0 else 0.0,
+            'overtime_hours': _rounded(overtime or 0, 1),
+            'remote_work_percentage': None,
+            'sick_leave_usage': _rounded(sick_days / active, 1) if active else 0.0
+        }
+    
+    return _cached(organization_id, 'attendance', label, compute)
+
+def performance_metrics(organization_id, period=None):
+    """Review ratings and training completion over the twelve months ending with period"""
+    label, start, end = parse_period(period)
+    
+    def compute():
+        window_start = _shift_month(start, -11)
+        row = db.session.execute(select(
+            func.count(PerformanceReview.id),
+            func.avg(PerformanceReview.rating),
+            func.count(case((PerformanceReview.rating >= HIGH_PERFORMER_RATING, 1))),
+            func.count(case((PerformanceReview.rating < LOW_PERFORMER_RATING, 1)))
+        ).join(Employee, PerformanceReview.employee_id == Employee.id).where(
+            Employee.organization_id == organization_id,
+            PerformanceReview.rating.isnot(None),
+            PerformanceReview.review_period_end.between(window_start, end)
+        )).one()
+        reviews, avg_rating, high, low = row
+    
+        enrolled, completed = db.session.execute(select(
+            func.count(case((TrainingEnrollment.completion_status != 'dropped', 1))),
+            func.count(case((TrainingEnrollment.completion_status == 'completed', 1)))
+        ).join(Employee, TrainingEnrollment.employee_id == Employee.id).where(
+            Employee.organization_id == organization_id,
+            TrainingEnrollment.enrollment_date >= datetime.combine(window_start, datetime.min.time()),
+            TrainingEnrollment.enrollment_date < datetime.combine(end + timedelta(days=1), datetime.min.time())
+        )).one()
+    
+        return {
+            'avg_performance_score': _rounded(avg_rating) or 0.0,
+            'goals_completion_rate': None,
+            'training_completion_rate': _percent(completed, enrolled),
+            'promotion_rate': None,
+            'high_performers_percentage': _percent(high, reviews),
+            'improvement_needed_percentage': _percent(low, reviews)
+        }
+    
+    return _cached(organization_id, 'performance', label, compute)
+
+def financial_metrics(organization_id, period=None):
+    """Payroll and benefit cost for one month"""
+    label, start, end = parse_period(period)
+    
+    def compute():
+        total_payroll = db.session.execute(select(func.coalesce(func.sum(Payroll.net_salary), 0)).join(
+            Employee, Payroll.employee_id == Employee.id
+        ).where(
+            Employee.organization_id == organization_id,
+            Payroll.year == start.year,
+            Payroll.month == start.month,
+            Payroll.status != 'cancelled'
+        )).scalar()
+        avg_salary = db.session.execute(select(func.avg(Employee.salary)).where(
+            Employee.organization_id == organization_id,
+            Employee.status == 'active'
+        )).scalar()
+        benefits_cost = db.session.execute(select(
+            func.coalesce(func.sum(EmployeeBenefit.employer_contribution), 0)
+        ).join(Employee, EmployeeBenefit.employee_id == Employee.id).where(
+            Employee.organization_id == organization_id,
+            EmployeeBenefit.status == 'active',
+            EmployeeBenefit.start_date <= end,
+            (EmployeeBenefit.end_date.is_(None)) | (EmployeeBenefit.end_date >= start)
+        )).scalar()
+        active = employee_metrics(organization_id, label)['active_employees']
+    
+        total_payroll = float(total_payroll)
+        benefits_cost = float(benefits_cost)
+        return {
+            'total_payroll': round(total_payroll, 2),
+            'avg_salary': _rounded(avg_salary) or 0.0,
+            'benefits_cost': round(benefits_cost, 2),
+            'recruitment_cost': None,
+            'training_cost': None,
+            'cost_per_employee': round((total_payroll + benefits_cost) / active, 2) if active else 0.0
+        }
+    
+    return _cached(organization_id, 'financial', label, compute)
+
+def benefits_utilization(organization_id, period=None):
+    """Share of active employees enrolled in each benefit type during one month"""
+    label, start, end = parse_period(period)
+    
+    def compute():
+        enrolled = db.session.execute(select(
+            EmployeeBenefit.benefit_type, func.count(distinct(EmployeeBenefit.employee_id))
+        ).join(Employee, EmployeeBenefit.employee_id == Employee.id).where(
+            Employee.organization_id == organization_id,
+            Employee.status == 'active',
+            EmployeeBenefit.status == 'active',
+            EmployeeBenefit.start_date <= end,
+            (EmployeeBenefit.end_date.is_(None)) | (EmployeeBenefit.end_date >= start)
+        ).group_by(EmployeeBenefit.benefit_type).order_by(EmployeeBenefit.benefit_type)).all()
+        active = employee_metrics(organization_id, label)['active_employees']
+        return {benefit_type: _percent(count, active) for benefit_type, count in enrolled}
+    
+    return _cached(organization_id, 'benefits', label, compute)
+
+def department_breakdown(organization_id):
+    """Active head count, average salary and review rating per department"""
+    label = date.today().strftime('%Y-%m')
+    
+    def compute():
+        ratings = select(
+            PerformanceReview.employee_id, func.avg(PerformanceReview.rating).label('rating')
+        ).group_by(PerformanceReview.employee_id).subquery()
+        stmt = select(
+            func.coalesce(Department.name, 'Unassigned'),
+            func.count(Employee.id),
+            func.avg(Employee.salary),
+            func.avg(ratings.c.rating)
+        ).select_from(Employee).outerjoin(
+            Department, Employee.department_id == Department.id
+        ).outerjoin(
+            ratings, ratings.c.employee_id == Employee.id
+        ).where(
+            Employee.organization_id == organization_id,
+            Employee.status == 'active'
+        ).group_by(Department.name).order_by(Department.name)
+    
+        return {
+            name: {
+                'count': count,
+                'avg_salary': _rounded(avg_salary) or 0.0,
+                'satisfaction': None,
+                'avg_rating': _rounded(avg_rating)
+            }
+            for name, count, avg_salary, avg_rating in db.session.execute(stmt)
+        }
+    
+    return _cached(organization_id, 'departments', label, compute)
+
+def _trend_buckets(organization_id, first, last):
+    """Compute monthly trend buckets for every month from first to last (month starts)"""
+    lo, hi = first.year * 12 + first.month, last.year * 12 + last.month
+    window_end = _shift_month(last, 1)
+    window_start_dt = datetime.combine(first, datetime.min.time())
+    window_end_dt = datetime.combine(window_end, datetime.min.time())
+    org = Employee.organization_id == organization_id
+    left = Employee.status.in_(LEFT_STATUSES)
+    
+    # Head count entering the window, then monthly hires and leavers inside it
+    hired_before, left_before = db.session.execute(select(
+        func.count(case((Employee.hire_date < first, 1))),
+        func.count(case((and_(left, Employee.terminated_at < window_start_dt), 1)))
+    ).where(org)).one()
+    hires = dict(db.session.execute(select(
+        _month_key(Employee.hire_date), func.count(Employee.id)
+    ).where(org, Employee.hire_date >= first, Employee.hire_date < window_end).group_by(
+        _month_key(Employee.hire_date)
+    )).all())
+    leavers = dict(db.session.execute(select(
+        _month_key(Employee.terminated_at), func.count(Employee.id)
+    ).where(org, left, Employee.terminated_at >= window_start_dt, Employee.terminated_at < window_end_dt).group_by(
+        _month_key(Employee.terminated_at)
+    )).all())
+    attendance = defaultdict(lambda: [0, 0])
+    for day, (records, attended, _, _) in daily_attendance(
+        organization_id, first, window_end - timedelta(days=1)
+    ).items():
+        totals = attendance[day.year * 12 + day.month]
+        totals[0] += records
+        totals[1] += attended
+    ratings = dict(db.session.execute(select(
+        _month_key(PerformanceReview.review_period_end), func.avg(PerformanceReview.rating)
+    ).join(Employee, PerformanceReview.employee_id == Employee.id).where(
+        org, PerformanceReview.rating.isnot(None),
+        PerformanceReview.review_period_end >= first, PerformanceReview.review_period_end < window_end
+    ).group_by(_month_key(PerformanceReview.review_period_end))).all())
+    
+    buckets = {}
+    headcount = hired_before - left_before
+    for index in range(lo, hi + 1):
+        month_leavers = leavers.get(index, 0)
+        headcount += hires.get(index, 0) - month_leavers
+        records, attended = attendance.get(index, (0, 0))
+        month = date((index - 1) // 12, (index - 1) % 12 + 1, 1)
+        buckets[month.strftime('%Y-%m')] = {
+            'employee_growth': headcount,
+            'satisfaction_scores': None,
+            'performance_scores': _rounded(ratings.get(index)),
+            'attendance_rates': _percent(attended, records),
+            'turnover_rates': _percent(month_leavers, headcount + month_leavers)
+        }
+    return buckets
+
+def trend_data(organization_id, period='12m'):
+    """Monthly series for the last 3, 6 or 12 months, oldest first.
+    
+    Each month is cached as its own bucket, so a request only recomputes
+    the months that are missing (normally just the current one).
+    """
+    if period not in TREND_PERIODS:
+        raise InvalidPeriod('period must be one of 3m, 6m, 12m')
+    current = date.today().replace(day=1)
+    months = [_shift_month(current, offset) for offset in range(1 - TREND_PERIODS[period], 1)]
+    version = get_analytics_version(organization_id)
+    
+    buckets = {}
+    missing = []
+    for month in months:
+        label = month.strftime('%Y-%m')
+        bucket = analytics_cache.get((organization_id, 'trend', label), version=version)
+        if bucket is None:
+            missing.append(month)
+        else:
+            buckets[label] = bucket
+    if missing:
+        for label, bucket in _trend_buckets(organization_id, missing[0], missing[-1]).items():
+            ttl = None if label == current.strftime('%Y-%m') else _history_ttl
+            analytics_cache.set((organization_id, 'trend', label), bucket, version=version, ttl=ttl)
+            buckets[label] = bucket
+    
+    labels = [month.strftime('%Y-%m') for month in months]
+    series = {key: [buckets[label][key] for label in labels] for key in buckets[labels[0]]}
+    series['months'] = [month.strftime('%b') for month in months]
+    series['periods'] = labels
+    return series
+
+def rating_distribution(organization_id, period=None):
+    """Share of reviews per rating band over the twelve months ending with period"""
+    label, start, end = parse_period(period)
+    
+    def compute():
+        rating = PerformanceReview.rating
+        row = db.session.execute(select(
+            func.count(case((rating >= HIGH_PERFORMER_RATING, 1))),
+            func.count(case((and_(rating >= 3.5, rating < HIGH_PERFORMER_RATING), 1))),
+            func.count(case((and_(rating >= LOW_PERFORMER_RATING, rating < 3.5), 1))),
+            func.count(case((rating < LOW_PERFORMER_RATING, 1)))
+        ).join(Employee, PerformanceReview.employee_id == Employee.id).where(
+            Employee.organization_id == organization_id,
+            rating.isnot(None),
+            PerformanceReview.review_period_end.between(_shift_month(start, -11), end)
+        )).one()
+        total = sum(row)
+        return dict(zip(('excellent', 'good', 'satisfactory', 'needs_improvement'),
+                        (_percent(count, total) for count in row)))
+    
+    return _cached(organization_id, 'rating_distribution', label, compute)
+
+def attendance_patterns(organization_id, period=None):
+    """Attendance rate per weekday and approved leave per type for one month"""
+    label, start, end = parse_period(period)
+    
+    def compute():
+        # Weekdays are folded in Python because day-of-week extraction
+        # differs between databases
+        weekdays = {}
+        for day, (records, attended, _, _) in daily_attendance(organization_id, start, end).items():
+            totals = weekdays.setdefault(day.weekday(), [0, 0])
+            totals[0] += records
+            totals[1] += attended
+        
+        active = employee_metrics(organization_id, label)['active_employees']
+        leave_analysis = {
+            leave_type: {
+                'total_days': days,
+                'avg_per_employee': _rounded(days / active, 1) if active else 0.0
+            }
+            for leave_type, days in sorted(leave_days_by_type(organization_id, start, end).items())
+        }
+        
+        return {
+            'attendance_patterns': {
+                calendar.day_name[index].lower(): _percent(attended, records)
+                for index, (records, attended) in sorted(weekdays.items())
+            },
+            'leave_analysis': leave_analysis
+        }
+    
+    return _cached(organization_id, 'attendance_patterns', label, compute)
+
+def salary_distribution(organization_id):
+    """Active employees per salary band"""
+    label = date.today().strftime('%Y-%m')
+    return _cached(organization_id, 'salary_distribution', label,
+                   lambda: salary_bands(load_workforce(organization_id)))
+
+def compensation_overview(organization_id):
+    """Salary totals, per-department spread, bands, percentiles and tenure"""
+    label = date.today().strftime('%Y-%m')
+    
+    def compute():
+        data = load_workforce(organization_id)
+        total = float(sum(data.salary))
+        equity = pay_equity(data)
+        quartiles = percentiles(data.salary)
+        return {
+            'summary': {
+                'total_employees': data.active_count,
+                'avg_salary': round(total / len(data), 2) if len(data) else 0.0,
+                'total_compensation': round(total, 2),
+                'salary_percentiles': {f'p{q}': _rounded(value) for q, value in quartiles.items()},
+                'pay_equity_score': round(equity['overall_ratio'] * 100) if equity['overall_ratio'] else None,
+                'market_reviews_due': None,
+                **tenure_summary(data)
+            },
+            'departments': department_summary(data),
+            'distribution': [
+                dict(band, name=name) for name, band in salary_bands(data).items()
+            ],
+            'alerts': [
+                {
+                    'type': 'warning',
+                    'message': f"{position['position']} pay differs across departments (ratio {position['ratio']})",
+                    'priority': 'high' if position['status'] == 'action_needed' else 'medium'
+                }
+                for position in equity['positions'] if position['status'] != 'good'
+            ]
+        }
+    
+    return _cached(organization_id, 'compensation', label, compute)
+
+def pay_equity_report(organization_id):
+    """Pay equity across departments and positions"""
+    label = date.today().strftime('%Y-%m')
+    return _cached(organization_id, 'pay_equity', label,
+                   lambda: pay_equity(load_workforce(organization_id)))
@@ -0,0 +1,230 @@
+import atexit
+import os
+import queue
+import threading
+import time
+import click
+from datetime import datetime, timedelta
+from flask import current_app, has_request_context, request
+from flask.cli import AppGroup
+from sqlalchemy import insert, select, delete
+from sqlalchemy.orm import joinedload
+from app.models.employee import Employee
+from app.models.rbac import AuditLog, AuditLogArchive
+from app.utils.pagination import keyset_paginate
+from app import db
+
+class AuditWriter:
+    """Buffers audit events and writes them in bulk from a background thread.
+
+    Events are queued in a bounded in-process queue and flushed with a single
+    multi-row INSERT every AUDIT_FLUSH_INTERVAL seconds or AUDIT_BATCH_SIZE
+    events, whichever comes first. When the queue is full the event is
+    written synchronously instead of being dropped. With AUDIT_ASYNC disabled
+    (the default for tests) every event is committed inline.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.async_mode = False
+        self.batch_size = 500
+        self.flush_interval = 1.0
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._atexit_registered = False
+
+    def init_app(self, app):
+        self.shutdown()
+        self.app = app
+        self.async_mode = app.config.get('AUDIT_ASYNC', False)
+        self.batch_size = app.config.get('AUDIT_BATCH_SIZE', 500)
+        self.flush_interval = app.config.get('AUDIT_FLUSH_INTERVAL', 1.0)
+        self._queue = queue.Queue(maxsize=app.config.get('AUDIT_QUEUE_SIZE', 10000))
+        if self.async_mode and not self._atexit_registered:
+            atexit.register(self.shutdown)
+            self._atexit_registered = True
+
+    def submit(self, event):
+        """Record an audit event (a dict of AuditLog column values)"""
+        if not self.async_mode:
+            self._write_sync(event)
+            return
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            current_app.logger.warning("Audit queue full, writing event synchronously")
+            self._write_sync(event)
+
+    def flush(self):
+        """Write every queued event now"""
+        events = self._drain()
+        while events:
+            self._write_batch(events)
+            events = self._drain()
+
+    def shutdown(self, timeout=5.0):
+        """Stop the worker thread and flush what is left in the queue"""
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            self._stop.set()
+            thread.join(timeout)
+        self._thread = None
+        if self._queue is not None and self.app is not None:
+            self.flush()
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so (re)start lazily in each process
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def _drain(self):
+        events = []
+        while len(events) < self.batch_size:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def _run(self):
+        while not self._stop.is_set():
+            events = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(events) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    events.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if events:
+                self._write_batch(events)
+
+    def _write_batch(self, events):
+        with self.app.app_context():
+            rows = [event for event in events if event.get('organization_id')]
+            if len(rows) != len(events):
+                current_app.logger.warning(f"Dropped {len(events) - len(rows)} audit events without organization")
+            if not rows:
+                return
+            try:
+                db.session.execute(insert(AuditLog), rows)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.error(f"Audit batch write error: {str(e)}")
+            finally:
+                db.session.remove()
+
+    def _write_sync(self, event):
+        try:
+            db.session.add(AuditLog(**event))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Audit log error: {str(e)}")
+
+audit_writer = AuditWriter()
+
+def build_audit_event(employee_id, action, resource_type, resource_id=None,
+                      old_values=None, new_values=None, organization_id=None):
+    """Capture an audit event, resolving request metadata at call time"""
+    if not organization_id and employee_id:
+        principal = getattr(request, '_hr_principal', None) if has_request_context() else None
+        if principal is not None and str(principal.id) == str(employee_id):
+            organization_id = principal.organization_id
+        else:
+            organization_id = db.session.query(Employee.organization_id).filter(
+                Employee.id == employee_id
+            ).scalar()
+
+    return {
+        'organization_id': organization_id,
+        'user_id': int(employee_id) if employee_id is not None else None,
+        'action': action,
+        'resource_type': resource_type,
+        'resource_id': resource_id,
+        'old_values': old_values,
+        'new_values': new_values,
+        'ip_address': request.remote_addr if has_request_context() else None,
+        'user_agent': request.headers.get('User-Agent') if has_request_context() else None,
+        'timestamp': datetime.utcnow()
+    }
+
+def query_audit_logs(organization_id, cursor=None, limit=50, user_id=None, action=None,
+                     resource_type=None, resource_id=None, archived=False):
+    """Return one keyset page of an organization's audit history, newest first.
+
+    Pages are addressed by a (timestamp, id) cursor and served from the
+    (organization_id, timestamp, id) index, so fetching page 1 and page
+    10,000 costs the same. Set archived=True to browse rolled-over rows.
+    """
+    model = AuditLogArchive if archived else AuditLog
+    query = model.query.options(joinedload(model.user)).filter(
+        model.organization_id == organization_id
+    )
+    
+    if user_id:
+        query = query.filter(model.user_id == user_id)
+    if action:
+        query = query.filter(model.action == action)
+    if resource_type:
+        query = query.filter(model.resource_type == resource_type)
+    if resource_id:
+        query = query.filter(model.resource_id == resource_id)
+    
+    return keyset_paginate(query, [model.timestamp, model.id], cursor=cursor, limit=limit)
+
+def archive_audit_logs(before, batch_size=5000):
+    """Move audit rows older than `before` into audit_logs_archive.
+
+    Rows are copied and deleted in id-ordered batches, each in its own
+    transaction, so the live table never holds long locks. Returns the
+    number of rows moved.
+    """
+    columns = [c.name for c in AuditLog.__table__.columns]
+    moved = 0
+    while True:
+        ids = [row[0] for row in db.session.execute(
+            select(AuditLog.id).where(AuditLog.timestamp < before).order_by(AuditLog.id).limit(batch_size)
+        )]
+        if not ids:
+            break
+        
+        db.session.execute(
+            insert(AuditLogArchive).from_select(
+                columns,
+                select(*[AuditLog.__table__.c[name] for name in columns]).where(AuditLog.id.in_(ids))
+            )
+        )
+        db.session.execute(delete(AuditLog).where(AuditLog.id.in_(ids)))
+        db.session.commit()
+        moved += len(ids)
+    return moved
+
+audit_cli = AppGroup('audit', help='Audit log maintenance')
+
+@audit_cli.command('archive')
+@click.option('--months', default=12, show_default=True, help='Keep this many months in the live table')
+@click.option('--batch-size', default=5000, show_default=True)
+def archive_command(months, batch_size):
+    """Roll audit rows older than the retention window into the archive"""
+    # Roll over whole calendar months: keep the current month plus `months` full months
+    cutoff = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(months):
+        cutoff = (cutoff - timedelta(days=1)).replace(day=1)
+    moved = archive_audit_logs(cutoff, batch_size=batch_size)
+    click.echo(f"Archived {moved} audit rows older than {cutoff.date().isoformat()}")
@@ -0,0 +1,44 @@
+from datetime import datetime
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app.models.rbac import CacheVersion
+from app.utils.database import PRIMARY
+from app import db
+
+def read_cache_version(name):
+    """Persisted version of a named cache, read from the primary (0 until first bumped)"""
+    return db.session.execute(select(CacheVersion.version).where(
+        CacheVersion.name == name
+    ), bind_arguments=PRIMARY).scalar() or 0
+
+def bump_cache_version(name):
+    """Increment a named cache version in the current transaction, creating its row on first use.
+    
+    Call it before committing the write it covers so every process sees the
+    new version exactly when the data changes.
+    """
+    now = datetime.utcnow()
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        connection.execute(dialect_insert(CacheVersion).values(
+            name=name, version=1, updated_at=now
+        ).on_conflict_do_update(index_elements=['name'], set_={
+            'version': CacheVersion.version + 1, 'updated_at': now
+        }))
+        return
+    
+    bump = update(CacheVersion).where(CacheVersion.name == name).values(
+        version=CacheVersion.version + 1, updated_at=now
+    )
+    if connection.execute(bump).rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            connection.execute(insert(CacheVersion).values(name=name, version=1, updated_at=now))
+    except IntegrityError:
+        connection.execute(bump)
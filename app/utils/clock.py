@@ -0,0 +1,102 @@
+from datetime import date, datetime
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app.models.attendance import Attendance
+from app.utils.counters import adjust_counters, organization_id_for_employee
+from app.utils.serializers import ATTENDANCE_SERIALIZER
+from app import db
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 64
+
+class ClockError(Exception):
+    """Clock-in/out rejected; the message is returned to the client"""
+
+def _attendance_dict(row):
+    return ATTENDANCE_SERIALIZER.dump([row])[0]
+
+def _check_in_insert(values):
+    """Insert today's attendance unless it exists; returns (row, inserted) with the new or existing row"""
+    connection = db.session.connection()
+    returned = (*ATTENDANCE_SERIALIZER.columns, Attendance.check_in_key)
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        # DO NOTHING ... RETURNING yields a row only when this statement inserted it
+        row = connection.execute(dialect_insert(Attendance).values(**values).on_conflict_do_nothing(
+            index_elements=['employee_id', 'date']
+        ).returning(*returned)).first()
+        inserted = row is not None
+    else:
+        row = None
+        try:
+            with db.session.begin_nested():
+                connection.execute(insert(Attendance).values(**values))
+            inserted = True
+        except IntegrityError:
+            inserted = False
+    
+    if row is None:
+        row = connection.execute(select(*returned).where(
+            Attendance.employee_id == values['employee_id'], Attendance.date == values['date']
+        )).one()
+    return row, inserted
+
+def clock_in(employee_id, idempotency_key=None):
+    """Record today's check-in, relying on uq_attendance_employee_date instead of a prior read.
+    
+    Returns (attendance dict, replayed). A retry carrying the idempotency
+    key of the request that checked in replays that response; any other
+    second check-in raises ClockError.
+    """
+    now = datetime.utcnow()
+    row, inserted = _check_in_insert({
+        'employee_id': employee_id, 'date': date.today(), 'check_in': now, 'status': 'present',
+        'check_in_key': idempotency_key, 'created_at': now
+    })
+    if inserted:
+        adjust_counters(organization_id_for_employee(employee_id), present_today=1)
+        db.session.commit()
+        return _attendance_dict(row), False
+    
+    db.session.rollback()
+    if idempotency_key and row.check_in_key == idempotency_key:
+        return _attendance_dict(row), True
+    raise ClockError('Already checked in for today')
+
+def clock_out(employee_id, idempotency_key=None):
+    """Record today's check-out with one conditional UPDATE ... RETURNING.
+    
+    The update only matches a row whose check_out is still NULL, so a
+    returned row (or a rowcount of 1) means this request set it; otherwise
+    the row is read to tell a replay from a repeat. Returns (attendance
+    dict, replayed) like clock_in.
+    """
+    now = datetime.utcnow()
+    today = date.today()
+    connection = db.session.connection()
+    returned = (*ATTENDANCE_SERIALIZER.columns, Attendance.check_out_key)
+    stmt = update(Attendance).where(
+        Attendance.employee_id == employee_id, Attendance.date == today, Attendance.check_out.is_(None)
+    ).values(check_out=now, check_out_key=idempotency_key)
+    if connection.dialect.update_returning:
+        row = connection.execute(stmt.returning(*returned)).first()
+        updated = row is not None
+    else:
+        row = None
+        updated = connection.execute(stmt).rowcount == 1
+    if row is None:
+        row = connection.execute(select(*returned).where(
+            Attendance.employee_id == employee_id, Attendance.date == today
+        )).first()
+    db.session.commit()
+    
+    if row is None:
+        raise ClockError('No check-in record found for today')
+    if updated:
+        return _attendance_dict(row), False
+    if idempotency_key and row.check_out_key == idempotency_key:
+        return _attendance_dict(row), True
+    raise ClockError('Already checked out for today')
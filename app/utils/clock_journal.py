@@ -0,0 +1,422 @@
+import atexit
+import json
+import os
+import threading
+import click
+from collections import Counter
+from datetime import date, datetime
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.exc import DataError, IntegrityError
+from app.models.attendance import Attendance
+from app.utils.counters import adjust_counters
+from app import db
+
+try:
+    import fcntl
+except ImportError:  # Optional: without flock every process shares slot 0
+    fcntl = None
+
+class ClockJournal:
+    """Write-behind buffer for clock-in/out events with group commit.
+    
+    With CLOCK_JOURNAL_ENABLED, clock requests append a JSON line to a
+    per-process journal file and return once it is fsynced; appenders that
+    arrive while an fsync is running are covered by the next single fsync.
+    A background thread applies the journal to attendances every
+    CLOCK_JOURNAL_FLUSH_INTERVAL_MS in one transaction per batch and then
+    records the applied offset. Applying is idempotent (ON CONFLICT DO
+    NOTHING for check-ins, COALESCE for check-outs, counters only for rows
+    actually inserted), so events between the last recorded offset and a
+    crash are simply replayed on the next start.
+    
+    When a batch fails because of an event in it (a foreign-key violation,
+    a malformed line), its events are applied one at a time and those that
+    still fail are quarantined the same way, so the offset keeps advancing.
+    Events that cannot take effect (a check-out without a check-in, a second
+    check-in or check-out that is not a retry of the first) were already
+    acknowledged with 202, so instead of a 400 they are logged and appended
+    to clock-<n>.rejected for follow-up.
+    
+    Each process locks its own slot file (clock-<n>.journal) with flock;
+    journals left by processes that are gone are replayed in the background
+    when the next process initializes the journal, or by
+    `flask clock-journal replay`.
+    """
+    
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.directory = None
+        self.flush_interval = 0.2
+        self.batch_size = 1000
+        self._file = None
+        self._slot = None
+        self._pid = None
+        self._end = 0
+        self._synced = 0
+        self._applied = 0
+        self._thread = None
+        self._replayer = None
+        self._stop = threading.Event()
+        self._append_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._atexit_registered = False
+    
+    def init_app(self, app):
+        self.shutdown()
+        self.app = app
+        self.enabled = app.config.get('CLOCK_JOURNAL_ENABLED', False)
+        self.directory = app.config.get('CLOCK_JOURNAL_DIR') or os.path.join(app.instance_path, 'clock-journal')
+        self.flush_interval = app.config.get('CLOCK_JOURNAL_FLUSH_INTERVAL_MS', 200) / 1000.0
+        self.batch_size = app.config.get('CLOCK_JOURNAL_BATCH_SIZE', 1000)
+        if self.enabled and not self._atexit_registered:
+            atexit.register(self.shutdown)
+            self._atexit_registered = True
+        # Journals of stopped processes must not wait for this one's first clock event.
+        # Without flock a live process's journal cannot be told apart, so nothing is replayed.
+        if self.enabled and fcntl is not None:
+            self._replayer = threading.Thread(target=self._replay_orphans, name='clock-journal-replay', daemon=True)
+            self._replayer.start()
+    
+    def append(self, action, employee_id, organization_id, idempotency_key=None):
+        """Durably record a clock event ('in' or 'out'); returns the event once it is on disk"""
+        self._ensure_open()
+        now = datetime.utcnow()
+        event = {
+            'action': action,
+            'employee_id': int(employee_id),
+            'organization_id': organization_id,
+            'date': date.today().isoformat(),
+            'at': now.isoformat(),
+            'key': idempotency_key
+        }
+        line = (json.dumps(event, separators=(',', ':')) + '\n').encode()
+        with self._append_lock:
+            event['event_id'] = f'{self._slot}-{self._end}'
+            self._file.write(line)
+            self._end += len(line)
+            end = self._end
+        self._sync(end)
+        return event
+    
+    def flush(self):
+        """Apply every journaled event to the database now"""
+        if self._file is None or self._pid != os.getpid():
+            return 0
+        applied = 0
+        with self._flush_lock:
+            while True:
+                count = self._apply_next_batch()
+                if not count:
+                    break
+                applied += count
+            self._compact()
+        return applied
+    
+    def shutdown(self, timeout=5.0):
+        """Stop the flusher, apply what is left and release the slot"""
+        replayer = self._replayer
+        if replayer is not None and replayer.is_alive():
+            replayer.join(timeout)
+        self._replayer = None
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            self._stop.set()
+            thread.join(timeout)
+        self._thread = None
+        if self._file is not None and self._pid == os.getpid() and self.app is not None:
+            with self.app.app_context():
+                self.flush()
+            self._file.close()
+        self._file = None
+    
+    def _ensure_open(self):
+        # File handles, locks and threads do not survive fork; open lazily per process
+        if self._file is not None and self._pid == os.getpid():
+            return
+        with self._open_lock:
+            if self._file is not None and self._pid == os.getpid():
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            self._slot, self._file = self._claim_slot()
+            self._pid = os.getpid()
+            self._applied = min(self._read_offset(self._slot), self._repair_tail(self._file))
+            self._end = self._synced = self._file.seek(0, os.SEEK_END)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='clock-journal', daemon=True)
+            self._thread.start()
+    
+    def _path(self, slot, suffix='journal'):
+        return os.path.join(self.directory, f'clock-{slot}.{suffix}')
+    
+    def _claim_slot(self):
+        slot = 0
+        while True:
+            handle = open(self._path(slot), 'a+b', buffering=0)
+            if fcntl is None:
+                return slot, handle
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return slot, handle
+            except OSError:
+                handle.close()
+                slot += 1
+    
+    def _repair_tail(self, handle):
+        """Drop a torn last line left by a crash mid-write; returns the file size"""
+        size = handle.seek(0, os.SEEK_END)
+        if not size:
+            return 0
+        handle.seek(max(size - 65536, 0))
+        tail = handle.read()
+        if tail.endswith(b'\n'):
+            return size
+        cut = size - len(tail) + tail.rfind(b'\n') + 1
+        handle.truncate(cut)
+        os.fsync(handle.fileno())
+        return cut
+    
+    def _sync(self, end):
+        """fsync through offset end; one fsync covers every append made before it started"""
+        if self._synced >= end:
+            return
+        with self._sync_lock:
+            if self._synced >= end:
+                return
+            target = self._end
+            os.fsync(self._file.fileno())
+            self._synced = target
+    
+    def _read_offset(self, slot):
+        try:
+            with open(self._path(slot, 'offset')) as handle:
+                return int(handle.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+    
+    def _write_offset(self, slot, offset):
+        path = self._path(slot, 'offset')
+        with open(path + '.tmp', 'w') as handle:
+            handle.write(str(offset))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(path + '.tmp', path)
+    
+    def _replay_orphans(self):
+        try:
+            with self.app.app_context():
+                applied = replay_orphaned_journals(self.directory)
+            if applied:
+                self.app.logger.info(f"Clock journal replayed {applied} orphaned events")
+        except Exception as e:
+            self.app.logger.error(f"Clock journal replay error: {str(e)}")
+    
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                with self.app.app_context():
+                    self.flush()
+            except Exception as e:
+                # Events stay in the journal and are retried on the next pass
+                self.app.logger.error(f"Clock journal flush error: {str(e)}")
+    
+    def _apply_next_batch(self):
+        start, end = self._applied, self._synced
+        if start >= end:
+            return 0
+        with open(self._path(self._slot), 'rb') as handle:
+            handle.seek(start)
+            lines = []
+            offset = start
+            while len(lines) < self.batch_size and offset < end:
+                line = handle.readline()
+                if not line.endswith(b'\n'):
+                    break
+                lines.append(line)
+                offset += len(line)
+        if not lines:
+            return 0
+        events, rejected = [], []
+        for line in lines:
+            try:
+                event = json.loads(line)
+                if not isinstance(event, dict):
+                    raise ValueError('not an object')
+                events.append(event)
+            except ValueError:
+                rejected.append(({'line': line.decode(errors='replace').rstrip('\n')}, 'Malformed journal line'))
+        try:
+            rejected += apply_clock_events(events)
+        except EVENT_ERRORS:
+            # One bad event must not hold back the rest: apply one by one and quarantine failures.
+            # Anything else (e.g. the database being down) propagates and the batch is retried.
+            for event in events:
+                try:
+                    rejected += apply_clock_events([event])
+                except EVENT_ERRORS as e:
+                    rejected.append((event, f'Could not apply: {getattr(e, "orig", None) or e}'))
+        if rejected:
+            self._reject(rejected)
+        self._applied = offset
+        self._write_offset(self._slot, offset)
+        return len(lines)
+    
+    def _reject(self, rejected):
+        """Dead-letter (event, reason) pairs to clock-<n>.rejected"""
+        with open(self._path(self._slot, 'rejected'), 'ab') as handle:
+            for event, reason in rejected:
+                self.app.logger.warning(f"Clock journal rejected {event.get('action')} event for employee "
+                                        f"{event.get('employee_id')} on {event.get('date')}: {reason}")
+                handle.write((json.dumps({'reason': reason, 'event': event}, separators=(',', ':')) + '\n').encode())
+            handle.flush()
+            os.fsync(handle.fileno())
+    
+    def _compact(self):
+        """Truncate the journal once everything in it has been applied"""
+        with self._append_lock:
+            if not self._end or self._applied != self._end:
+                return
+            self._file.truncate(0)
+            os.fsync(self._file.fileno())
+            self._end = self._synced = self._applied = 0
+        self._write_offset(self._slot, 0)
+
+clock_journal = ClockJournal()
+
+# Failures caused by the event itself rather than by the database being unavailable
+EVENT_ERRORS = (IntegrityError, DataError, KeyError, TypeError, ValueError, AttributeError)
+
+def _upsert_statement():
+    dialect = db.session.connection().dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        raise RuntimeError(f'The clock journal needs INSERT ... ON CONFLICT support, not {dialect}')
+    return dialect_insert(Attendance).on_conflict_do_nothing(index_elements=['employee_id', 'date'])
+
+def _is_retry(event, at, key, stored_at, stored_key):
+    """Whether event is the one that set a stored check-in/out, or a retry of it"""
+    # Journaled timestamps are written verbatim, so a re-applied event matches exactly
+    return at == stored_at or (key is not None and key == stored_key)
+
+def apply_clock_events(events):
+    """Write a batch of journaled clock events to attendances in one transaction.
+    
+    Check-ins insert with ON CONFLICT DO NOTHING and RETURNING so present
+    counters only move for rows actually inserted; check-outs keep the
+    first time through COALESCE. Re-applying a batch changes nothing.
+    
+    Returns the events that did not take effect as (event, reason) pairs,
+    i.e. the cases the synchronous endpoints answer with a 400.
+    """
+    check_ins = {}
+    check_outs = {}
+    rejected = []
+    for event in events:
+        at = datetime.fromisoformat(event['at'])
+        key = (event['employee_id'], date.fromisoformat(event['date']))
+        pending = check_ins if event['action'] == 'in' else check_outs
+        if key not in pending:
+            pending[key] = (event, at)
+        elif not _is_retry(event, at, event.get('key'), pending[key][1], pending[key][0].get('key')):
+            reason = 'Already checked in for today' if event['action'] == 'in' else 'Already checked out for today'
+            rejected.append((event, reason))
+    
+    try:
+        connection = db.session.connection()
+        present = Counter()
+        inserted = set()
+        if check_ins:
+            inserted = set(connection.execute(_upsert_statement().returning(Attendance.employee_id, Attendance.date), [
+                {'employee_id': key[0], 'date': key[1], 'check_in': at, 'status': 'present',
+                 'check_in_key': event.get('key'), 'created_at': at}
+                for key, (event, at) in check_ins.items()
+            ]).all())
+            for employee_id, day in inserted:
+                present[(check_ins[(employee_id, day)][0].get('organization_id'), day)] += 1
+        
+        # Rows the events above did not create, read once to classify duplicates and orphaned check-outs
+        lookup = [key for key in check_ins if key not in inserted] + list(check_outs)
+        existing = {}
+        if lookup:
+            existing = {(row.employee_id, row.date): row for row in connection.execute(select(
+                Attendance.employee_id, Attendance.date, Attendance.check_in, Attendance.check_in_key,
+                Attendance.check_out, Attendance.check_out_key
+            ).where(
+                Attendance.employee_id.in_({key[0] for key in lookup}),
+                Attendance.date.in_({key[1] for key in lookup})
+            ))}
+        for key, (event, at) in check_ins.items():
+            row = existing.get(key)
+            if key not in inserted and row is not None and \
+                    not _is_retry(event, at, event.get('key'), row.check_in, row.check_in_key):
+                rejected.append((event, 'Already checked in for today'))
+        
+        updates = []
+        for key, (event, at) in check_outs.items():
+            row = existing.get(key)
+            if row is None:
+                rejected.append((event, 'No check-in record found for today'))
+            elif row.check_out is not None and \
+                    not _is_retry(event, at, event.get('key'), row.check_out, row.check_out_key):
+                rejected.append((event, 'Already checked out for today'))
+            else:
+                updates.append({'employee': key[0], 'day': key[1], 'at': at, 'key': event.get('key')})
+        if updates:
+            connection.execute(update(Attendance).where(
+                Attendance.employee_id == bindparam('employee'), Attendance.date == bindparam('day')
+            ).values(
+                check_out=func.coalesce(Attendance.check_out, bindparam('at')),
+                check_out_key=func.coalesce(Attendance.check_out_key, bindparam('key'))
+            ).execution_options(synchronize_session=False), updates)
+        for (organization_id, day), count in present.items():
+            adjust_counters(organization_id, present_today=count, on_date=day)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return rejected
+
+def replay_orphaned_journals(directory, skip_slot=None):
+    """Apply journals whose owning process is gone; returns the number of events applied"""
+    if not os.path.isdir(directory):
+        return 0
+    journal = ClockJournal()
+    journal.app = current_app._get_current_object()
+    journal.directory = directory
+    journal.batch_size = current_app.config.get('CLOCK_JOURNAL_BATCH_SIZE', 1000)
+    applied = 0
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith('clock-') and name.endswith('.journal')):
+            continue
+        slot = int(name[len('clock-'):-len('.journal')])
+        if slot == skip_slot:
+            continue
+        handle = open(journal._path(slot), 'a+b', buffering=0)
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue  # Owned by a live process; its flusher applies it
+            journal._file, journal._slot, journal._pid = handle, slot, os.getpid()
+            journal._applied = min(journal._read_offset(slot), journal._repair_tail(handle))
+            journal._end = journal._synced = handle.seek(0, os.SEEK_END)
+            applied += journal.flush()
+        finally:
+            handle.close()
+    return applied
+
+clock_journal_cli = AppGroup('clock-journal', help='Write-behind clock event journal')
+
+@clock_journal_cli.command('replay')
+def replay_command():
+    """Apply clock events left in journals of stopped processes"""
+    applied = replay_orphaned_journals(clock_journal.directory)
+    click.echo(f"Applied {applied} journaled clock events")
@@ -0,0 +1,155 @@
+import click
+from datetime import date, datetime
+from flask import has_request_context, request
+from flask.cli import AppGroup
+from sqlalchemy import case, func, select, update
+from sqlalchemy.exc import IntegrityError
+from app.models.attendance import Attendance
+from app.models.department import Department
+from app.models.employee import Employee
+from app.models.leave import Leave
+from app.models.organization import Organization, OrganizationCounter
+from app import db
+
+COUNTER_FIELDS = ('active_employees', 'departments', 'pending_leaves', 'present_today')
+
+def _computed_counts(organization_id=None, today=None):
+    """Recount every counter from the source tables, keyed by organization id"""
+    today = today or date.today()
+    active = select(Employee.organization_id, func.count(Employee.id)).where(
+        Employee.status == 'active'
+    )
+    departments = select(Department.organization_id, func.count(Department.id))
+    pending = select(Employee.organization_id, func.count(Leave.id)).join(
+        Employee, Leave.employee_id == Employee.id
+    ).where(Leave.status == 'pending')
+    present = select(Employee.organization_id, func.count(Attendance.id)).join(
+        Employee, Attendance.employee_id == Employee.id
+    ).where(Attendance.date == today, Attendance.status == 'present')
+    org_ids = select(Organization.id)
+    
+    if organization_id:
+        active = active.where(Employee.organization_id == organization_id)
+        departments = departments.where(Department.organization_id == organization_id)
+        pending = pending.where(Employee.organization_id == organization_id)
+        present = present.where(Employee.organization_id == organization_id)
+        org_ids = org_ids.where(Organization.id == organization_id)
+    
+    counts = {org_id: dict.fromkeys(COUNTER_FIELDS, 0) for org_id in db.session.scalars(org_ids)}
+    for field, stmt in (('active_employees', active.group_by(Employee.organization_id)),
+                        ('departments', departments.group_by(Department.organization_id)),
+                        ('pending_leaves', pending.group_by(Employee.organization_id)),
+                        ('present_today', present.group_by(Employee.organization_id))):
+        for org_id, count in db.session.execute(stmt):
+            if org_id in counts:
+                counts[org_id][field] = count
+    return counts
+
+def organization_id_for_employee(employee_id):
+    """Resolve an employee's organization, reusing the request principal when it matches"""
+    principal = getattr(request, '_hr_principal', None) if has_request_context() else None
+    if principal is not None and str(principal.id) == str(employee_id):
+        return principal.organization_id
+    return db.session.query(Employee.organization_id).filter(Employee.id == employee_id).scalar()
+
+def adjust_counters(organization_id, active_employees=0, departments=0, pending_leaves=0,
+                    present_today=0, on_date=None):
+    """Apply counter deltas inside the caller's transaction.
+
+    Call before the caller commits so the counters change atomically with
+    the rows they count. present_today deltas only apply to today's
+    attendance; the first write of a new day restarts the count. A missing
+    row is created from a full recount, which already includes the
+    caller's pending changes.
+    """
+    if not organization_id:
+        return
+    today = date.today()
+    values = {}
+    if active_employees:
+        values['active_employees'] = OrganizationCounter.active_employees + active_employees
+    if departments:
+        values['departments'] = OrganizationCounter.departments + departments
+    if pending_leaves:
+        values['pending_leaves'] = OrganizationCounter.pending_leaves + pending_leaves
+    if present_today and (on_date or today) == today:
+        values['present_today'] = case(
+            (OrganizationCounter.present_date == today, OrganizationCounter.present_today + present_today),
+            else_=max(present_today, 0)
+        )
+        values['present_date'] = today
+    if not values:
+        return
+    values['updated_at'] = datetime.utcnow()
+
+    db.session.flush()
+    stmt = update(OrganizationCounter).where(
+        OrganizationCounter.organization_id == organization_id
+    ).values(**values).execution_options(synchronize_session=False)
+    if db.session.execute(stmt).rowcount:
+        return
+
+    counts = _computed_counts(organization_id, today).get(organization_id)
+    if counts is None:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(OrganizationCounter(
+                organization_id=organization_id, present_date=today, updated_at=datetime.utcnow(), **counts
+            ))
+    except IntegrityError:
+        # Another transaction created the row first; apply the delta to it
+        db.session.execute(stmt)
+
+def get_dashboard_counters(organization_id):
+    """Read an organization's dashboard counters with a single primary-key lookup"""
+    counters = db.session.get(OrganizationCounter, organization_id)
+    if counters is None:
+        reconcile_counters(organization_id)
+        counters = db.session.get(OrganizationCounter, organization_id)
+    return counters.to_dict() if counters else dict.fromkeys(
+        ('employee_count', 'department_count', 'attendance_today', 'pending_leaves'), 0
+    )
+
+def reconcile_counters(organization_id=None):
+    """Recompute counters from the source tables and fix any that drifted.
+
+    Returns the number of organizations whose stored counters were created
+    or corrected.
+    """
+    today = date.today()
+    now = datetime.utcnow()
+    computed = _computed_counts(organization_id, today)
+    existing = {
+        row.organization_id: row for row in OrganizationCounter.query.filter(
+            OrganizationCounter.organization_id.in_(list(computed))
+        )
+    }
+
+    corrected = 0
+    for org_id, counts in computed.items():
+        row = existing.get(org_id)
+        if row is None:
+            row = OrganizationCounter(organization_id=org_id)
+            db.session.add(row)
+        stored = {field: getattr(row, field) for field in COUNTER_FIELDS}
+        if row.present_date != today:
+            stored['present_today'] = 0
+        if org_id not in existing or stored != counts:
+            corrected += 1
+            for field, value in counts.items():
+                setattr(row, field, value)
+            row.updated_at = now
+        row.present_date = today
+        row.reconciled_at = now
+    db.session.commit()
+    return corrected
+
+counters_cli = AppGroup('counters', help='Dashboard counter maintenance')
+
+@counters_cli.command('reconcile')
+@click.option('--organization-id', type=int, default=None, help='Only reconcile this organization')
+def reconcile_command(organization_id):
+    """Recount dashboard counters from the source tables (run nightly)"""
+    corrected = reconcile_counters(organization_id)
+    click.echo(f"Corrected counters for {corrected} organizations")
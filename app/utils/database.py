@@ -0,0 +1,213 @@
+import itertools
+import threading
+import time
+from functools import wraps
+from flask import current_app, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+from config import DATABASE_PROFILES
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+POOL_CLASSES = {
+    'null': NullPool,
+}
+
+def resolve_profile_name(app, profile_name=None):
+    """Pick the database profile: explicit argument, DB_PROFILE, then the URL's backend"""
+    name = profile_name or app.config.get('DB_PROFILE')
+    if not name:
+        backend = make_url(app.config['SQLALCHEMY_DATABASE_URI']).get_backend_name()
+        name = 'postgres-pooled' if backend == 'postgresql' else 'sqlite-dev'
+    if name not in DATABASE_PROFILES:
+        raise ValueError(f"Unknown database profile: {name}")
+    return name
+
+def configure_database(app, profile_name=None):
+    """Apply a database profile's engine options. Call before db.init_app."""
+    name = resolve_profile_name(app, profile_name)
+    profile = DATABASE_PROFILES[name]
+    
+    options = dict(profile.get('engine_options', {}))
+    if options.get('poolclass') in POOL_CLASSES:
+        options['poolclass'] = POOL_CLASSES[options['poolclass']]
+    
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        # In-memory databases use a static single connection; pool sizing does not apply
+        for key in ('pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle'):
+            options.pop(key, None)
+    
+    if url.get_backend_name() == 'postgresql' and not profile.get('per_transaction_settings'):
+        settings = []
+        if profile.get('statement_timeout_ms'):
+            settings.append(f"-c statement_timeout={profile['statement_timeout_ms']}")
+        if profile.get('idle_in_transaction_timeout_ms'):
+            settings.append(f"-c idle_in_transaction_session_timeout={profile['idle_in_transaction_timeout_ms']}")
+        if settings:
+            connect_args = dict(options.get('connect_args', {}))
+            connect_args['options'] = ' '.join(filter(None, [connect_args.get('options')] + settings))
+            options['connect_args'] = connect_args
+    
+    # Explicit SQLALCHEMY_ENGINE_OPTIONS in the config win over the profile
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    app.config['DB_PROFILE'] = name
+    return name
+
+def register_engine_events(app, engine):
+    """Install the profile's per-connection hooks on an engine"""
+    profile = DATABASE_PROFILES[app.config['DB_PROFILE']]
+    backend = engine.url.get_backend_name()
+    
+    if backend == 'sqlite' and profile.get('sqlite_pragmas'):
+        pragmas = profile['sqlite_pragmas']
+        
+        @event.listens_for(engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for name, value in pragmas.items():
+                    cursor.execute(f"PRAGMA {name}={value}")
+            finally:
+                cursor.close()
+    
+    if backend == 'postgresql' and profile.get('per_transaction_settings'):
+        timeout = profile.get('statement_timeout_ms')
+        
+        @event.listens_for(engine, 'begin')
+        def set_transaction_timeout(connection):
+            # SET LOCAL resets at transaction end, so it is safe when
+            # PgBouncer hands the server connection to another client
+            if timeout:
+                connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
+
+
+class ReplicaRouter:
+    """Round-robin choice among replicas whose replication lag is acceptable.
+
+    Lag is sampled at most once per check interval per replica; a replica
+    that errors or lags more than max_lag is skipped until the next sample.
+    """
+
+    def __init__(self, engines, max_lag=5.0, check_interval=10.0):
+        self.engines = dict(engines)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._status = {}
+        self._lock = threading.Lock()
+        self._cycle = itertools.cycle(list(self.engines))
+
+    def measure_lag(self, engine):
+        """Seconds the replica is behind the primary (0 when unknown to the backend)"""
+        if engine.url.get_backend_name() != 'postgresql':
+            return 0.0
+        with engine.connect() as conn:
+            lag = conn.execute(text(
+                "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+            )).scalar()
+        return float(lag or 0)
+
+    def is_healthy(self, key, engine):
+        now = time.monotonic()
+        status = self._status.get(key)
+        if status is None or status[1] < now:
+            try:
+                lag = self.measure_lag(engine)
+            except Exception as e:
+                current_app.logger.warning(f"Replica {key} unavailable: {str(e)}")
+                lag = None
+            status = (lag is not None and lag <= self.max_lag, now + self.check_interval)
+            with self._lock:
+                self._status[key] = status
+        return status[0]
+
+    def mark_unhealthy(self, key):
+        with self._lock:
+            self._status[key] = (False, time.monotonic() + self.check_interval)
+
+    def choose(self):
+        """Return a healthy replica engine, or None to fall back to the primary"""
+        for _ in range(len(self.engines)):
+            key = next(self._cycle)
+            engine = self.engines[key]
+            if self.is_healthy(key, engine):
+                return engine
+        return None
+
+    def dispose(self):
+        for engine in self.engines.values():
+            engine.dispose()
+
+def read_only(f):
+    """Route a non-GET view's reads to a replica (e.g. a POST that only queries)"""
+    f._db_read_only = True
+    return f
+
+def use_primary(f):
+    """Keep a GET view on the primary, e.g. when it must read its own writes"""
+    f._db_use_primary = True
+    return f
+
+# bind_arguments that keep one statement on the primary inside a replica-routed
+# request, e.g. staleness checks whose answer must not lag behind a write
+PRIMARY = {'primary': True}
+
+def _request_allows_replica():
+    if not has_request_context():
+        return False
+    view = current_app.view_functions.get(request.endpoint)
+    if view is not None and getattr(view, '_db_use_primary', False):
+        return False
+    if request.method in READ_METHODS:
+        return True
+    return view is not None and getattr(view, '_db_read_only', False)
+
+class RoutingSession(Session):
+    """Session that sends read-only request traffic to replica binds.
+
+    Flushes and DML always go to the primary, and once a session has written
+    all of its later reads stay on the primary as well. Statements executed
+    with bind_arguments=PRIMARY skip the replicas.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        primary = kwargs.pop('primary', False)
+        if bind is None and not primary and self._use_replica(clause):
+            router = current_app.extensions.get('db_replicas')
+            engine = router.choose() if router else None
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _use_replica(self, clause):
+        if self._flushing or self.info.get('wrote'):
+            return False
+        if clause is not None and not getattr(clause, 'is_select', False):
+            self.info['wrote'] = True
+            return False
+        return _request_allows_replica()
+
+def init_replicas(app):
+    """Create replica engines from SQLALCHEMY_REPLICA_URIS with the primary's options"""
+    uris = app.config.get('SQLALCHEMY_REPLICA_URIS') or []
+    if not uris:
+        app.extensions['db_replicas'] = None
+        return None
+    
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    engines = {}
+    for index, uri in enumerate(uris):
+        engine = create_engine(uri, **options)
+        register_engine_events(app, engine)
+        engines[f"replica_{index}"] = engine
+    
+    router = ReplicaRouter(
+        engines,
+        max_lag=app.config.get('REPLICA_MAX_LAG_SECONDS', 5.0),
+        check_interval=app.config.get('REPLICA_LAG_CHECK_INTERVAL', 10.0)
+    )
+    app.extensions['db_replicas'] = router
+    return router
@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import aliased
+from app.models.department import Department
+from app.models.employee import Employee
+from app.utils.cache import TTLCache, VersionRegistry
+from app import db
+
+# Department listings with stats keyed by (organization_id, day). Writes in
+# the employee/department routes bump the organization's version; the TTL
+# bounds staleness for writes made elsewhere or in other workers.
+department_cache = TTLCache(maxsize=1024, ttl=60)
+department_versions = VersionRegistry()
+
+RECENT_HIRE_DAYS = 30
+
+def configure_department_cache(app):
+    department_cache.configure(maxsize=app.config.get('DEPARTMENT_CACHE_SIZE', 1024),
+                               ttl=app.config.get('DEPARTMENT_CACHE_TTL', 60))
+    department_versions.clear()
+
+def invalidate_department_summaries(organization_id):
+    """Drop cached department listings for an organization"""
+    return department_versions.bump(organization_id)
+
+def get_department_summaries(organization_id=None):
+    """Departments with manager details and head counts from one grouped query"""
+    today = date.today()
+    key = (organization_id, today)
+    version = department_versions.get(organization_id)
+    summaries = department_cache.get(key, version=version)
+    if summaries is not None:
+        return summaries
+    
+    manager = aliased(Employee)
+    staff = aliased(Employee)
+    cutoff = today - timedelta(days=RECENT_HIRE_DAYS)
+    
+    stmt = select(
+        Department.id, Department.organization_id, Department.name, Department.description,
+        Department.manager_id, Department.created_at,
+        manager.id.label('manager_found'), manager.first_name, manager.last_name, manager.email,
+        func.count(staff.id).label('employee_count'),
+        func.count(case((staff.status == 'active', 1))).label('active_employee_count'),
+        func.count(case((staff.hire_date >= cutoff, 1))).label('recent_hires')
+    ).outerjoin(
+        manager, manager.id == Department.manager_id
+    ).outerjoin(
+        staff, staff.department_id == Department.id
+    ).group_by(Department.id, manager.id).order_by(Department.id)
+    
+    if organization_id:
+        stmt = stmt.where(Department.organization_id == organization_id)
+    
+    summaries = []
+    for row in db.session.execute(stmt):
+        summary = {
+            'id': row.id,
+            'organization_id': row.organization_id,
+            'name': row.name,
+            'description': row.description,
+            'manager_id': row.manager_id,
+            'employee_count': row.employee_count,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'active_employee_count': row.active_employee_count,
+            'recent_hires': row.recent_hires
+        }
+        if row.manager_found is not None:
+            summary['manager_name'] = f"{row.first_name} {row.last_name}"
+            summary['manager_email'] = row.email
+        summaries.append(summary)
+    
+    department_cache.set(key, summaries, version=version)
+    return summaries
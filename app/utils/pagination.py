@@ -0,0 +1,149 @@
+import base64
+import json
+from datetime import date, datetime
+from flask import current_app, jsonify, request, url_for
+from app import db
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    return value
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        if 'd' in value:
+            return date.fromisoformat(value['d'])
+    return value
+
+def encode_cursor(values):
+    """Encode the sort key of the last row of a page as an opaque token"""
+    payload = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(token, size):
+    """Decode a cursor token into a list of sort key values"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor('Invalid cursor')
+    try:
+        return [_decode_value(v) for v in values]
+    except (TypeError, ValueError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+
+def parse_limit(value, default=50, maximum=500):
+    """Clamp a requested page size to [1, maximum]"""
+    try:
+        limit = int(value) if value is not None else default
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, maximum))
+
+# Dialects that sort NULL above every value (NULLS LAST ascending); the rest sort it below
+NULLS_HIGH_DIALECTS = ('postgresql', 'oracle')
+
+def _seek_condition(columns, values, descending, nulls_high=False):
+    # (a, b) < (x, y)  ==  a < x OR (a = x AND b < y), spelled out for portability.
+    # Nullable columns follow the database's native NULL placement, since
+    # col < NULL would match nothing and stop the walk at the first NULL key.
+    nulls_after = nulls_high != descending
+    condition = None
+    for i in reversed(range(len(columns))):
+        column, value = columns[i], values[i]
+        nullable = getattr(column, 'nullable', True)
+        if value is None:
+            equal = column.is_(None)
+            step = None if nulls_after else column.is_not(None)
+        else:
+            equal = column == value
+            step = column < value if descending else column > value
+            if nullable and nulls_after:
+                step = db.or_(step, column.is_(None))
+        if condition is None:
+            condition = step if step is not None else db.false()
+        elif step is None:
+            condition = db.and_(equal, condition)
+        else:
+            condition = db.or_(step, db.and_(equal, condition))
+    return condition
+
+def _ordered(query, columns, descending):
+    return query.order_by(*[c.desc() if descending else c.asc() for c in columns])
+
+def keyset_paginate(query, columns, cursor=None, limit=50, descending=True):
+    """Fetch one page of a query ordered by columns using keyset pagination.
+
+    The last column must be unique (normally the primary key) so the order
+    is total. Returns (items, next_cursor); next_cursor is None on the last
+    page. Page fetches cost the same regardless of how deep the page is.
+    """
+    if cursor:
+        values = decode_cursor(cursor, len(columns))
+        nulls_high = db.session.get_bind().dialect.name in NULLS_HIGH_DIALECTS
+        query = query.filter(_seek_condition(columns, values, descending, nulls_high))
+
+    items = _ordered(query, columns, descending).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return items, next_cursor
+
+def paginated_list(query, columns, serialize=None, descending=True, row_serializer=None):
+    """Respond with one keyset page of query as a JSON array.
+
+    Reads cursor and limit from the request. The next page's cursor is sent
+    in the X-Next-Cursor header and as a Link rel="next", so the body stays
+    the plain array existing clients expect. ?all=true opts back into the
+    unbounded list. With a row_serializer only its columns are selected and
+    rows are serialized column-wise instead of through to_dict(); a
+    fields= parameter narrows both the SELECT and the output further.
+    """
+    if row_serializer is not None:
+        try:
+            row_serializer = row_serializer.project(
+                request.args.get('fields'), required=[c.key for c in columns]
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        query = row_serializer.select(query)
+        dump = row_serializer.dump
+    else:
+        serialize = serialize or (lambda item: item.to_dict())
+        dump = lambda items: [serialize(item) for item in items]
+    
+    if request.args.get('all') == 'true':
+        return jsonify(dump(_ordered(query, columns, descending).all())), 200
+    
+    limit = parse_limit(
+        request.args.get('limit'),
+        default=current_app.config.get('PAGINATION_DEFAULT_LIMIT', 100),
+        maximum=current_app.config.get('PAGINATION_MAX_LIMIT', 1000)
+    )
+    try:
+        items, next_cursor = keyset_paginate(
+            query, columns, cursor=request.args.get('cursor'), limit=limit, descending=descending
+        )
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    response = jsonify(dump(items))
+    if next_cursor:
+        args = request.args.to_dict()
+        args.update(request.view_args or {})
+        args['cursor'] = next_cursor
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{url_for(request.endpoint, **args)}>; rel="next"'
+    return response, 200
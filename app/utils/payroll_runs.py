@@ -0,0 +1,433 @@
+import calendar
+import click
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from itertools import repeat
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import and_, func, insert, or_, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from app.models.employee import Employee
+from app.models.leave import Leave
+from app.models.payroll import Payroll, PayrollRun
+from app.models.training import EmployeeBenefit
+from app.utils.analytics import invalidate_analytics
+from app.utils.rollups import rewind_rollups
+from app import db
+
+try:
+    import numpy as np
+except ImportError:  # Optional: the pay pass falls back to plain lists
+    np = None
+
+UNPAID_LEAVE_TYPE = 'unpaid'
+PAYROLL_PERIOD_COLUMNS = ('employee_id', 'year', 'month')
+
+class PayrollRunConflict(Exception):
+    """Another worker advanced the run while this one was processing a chunk"""
+
+def _month_bounds(year, month):
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+def _scope_filter(organization_ids, after_employee_id=None, through_employee_id=None):
+    if organization_ids is None:
+        conditions = [Employee.organization_id.isnot(None)]
+    elif isinstance(organization_ids, int):
+        conditions = [Employee.organization_id == organization_ids]
+    else:
+        conditions = [Employee.organization_id.in_(list(organization_ids))]
+    if after_employee_id is not None:
+        conditions.append(Employee.id > after_employee_id)
+    if through_employee_id is not None:
+        conditions.append(Employee.id <= through_employee_id)
+    return and_(*conditions)
+
+def load_pay_inputs(organization_ids, year, month, after_employee_id=None, through_employee_id=None):
+    """Pay columns per active employee of one organization, several, or all (None).
+    
+    Three set queries regardless of head count: employees, approved unpaid
+    leave overlapping the month, and active benefit contributions. Rows are
+    ordered by (organization, department, employee) so shards of the
+    columns cover whole departments. The employee id bounds select one
+    chunk of a payroll run.
+    """
+    start, end = _month_bounds(year, month)
+    days_in_month = (end - start).days + 1
+    in_scope = _scope_filter(organization_ids, after_employee_id, through_employee_id)
+    
+    employee_ids, organizations, departments, salaries, paid_days = [], [], [], [], []
+    for employee_id, organization_id, department_id, salary, hire_date in db.session.execute(select(
+        Employee.id, Employee.organization_id, Employee.department_id, Employee.salary, Employee.hire_date
+    ).where(
+        in_scope,
+        Employee.status == 'active',
+        Employee.salary.isnot(None),
+        Employee.hire_date <= end
+    ).order_by(Employee.organization_id, Employee.department_id, Employee.id)):
+        employee_ids.append(employee_id)
+        organizations.append(organization_id)
+        departments.append(department_id)
+        salaries.append(float(salary))
+        # Employees hired during the month are paid from their hire date
+        paid_days.append(days_in_month - max((hire_date - start).days, 0))
+    
+    unpaid = dict.fromkeys(employee_ids, 0)
+    for employee_id, leave_start, leave_end, days in db.session.execute(select(
+        Leave.employee_id, Leave.start_date, Leave.end_date, Leave.days
+    ).join(Employee, Leave.employee_id == Employee.id).where(
+        in_scope,
+        Leave.leave_type == UNPAID_LEAVE_TYPE,
+        Leave.status == 'approved',
+        Leave.start_date <= end,
+        Leave.end_date >= start
+    )):
+        if employee_id in unpaid:
+            overlap = (min(leave_end, end) - max(leave_start, start)).days + 1
+            unpaid[employee_id] += min(overlap, days or overlap)
+    
+    contributions = dict.fromkeys(employee_ids, 0.0)
+    for employee_id, amount in db.session.execute(select(
+        EmployeeBenefit.employee_id, EmployeeBenefit.employee_contribution
+    ).join(Employee, EmployeeBenefit.employee_id == Employee.id).where(
+        in_scope,
+        EmployeeBenefit.status == 'active',
+        EmployeeBenefit.start_date <= end,
+        (EmployeeBenefit.end_date.is_(None)) | (EmployeeBenefit.end_date >= start)
+    )):
+        if employee_id in contributions and amount is not None:
+            contributions[employee_id] += float(amount)
+    
+    return {
+        'employee_ids': employee_ids,
+        'organization_ids': organizations,
+        'department_ids': departments,
+        'salary': salaries,
+        'paid_days': paid_days,
+        'unpaid_days': [unpaid[employee_id] for employee_id in employee_ids],
+        'contributions': [contributions[employee_id] for employee_id in employee_ids],
+        'days_in_month': days_in_month
+    }
+
+def compute_pay(inputs, allowance_rate=0.0):
+    """Basic, allowances, deductions and net pay for every employee in one pass.
+    
+    Monthly basic is a twelfth of the annual salary, prorated by paid days;
+    unpaid leave is deducted at the calendar-day rate and benefit employee
+    contributions are deducted in full. Net pay never goes below zero.
+    """
+    days_in_month = inputs['days_in_month']
+    if np is not None:
+        monthly = np.asarray(inputs['salary'], dtype=np.float64) / 12
+        basic = np.round(monthly * np.asarray(inputs['paid_days']) / days_in_month, 2)
+        allowances = np.round(basic * allowance_rate, 2)
+        leave = monthly / days_in_month * np.asarray(inputs['unpaid_days'])
+        deductions = np.round(np.minimum(leave, basic) + np.asarray(inputs['contributions']), 2)
+        net = np.round(np.maximum(basic + allowances - deductions, 0), 2)
+        return basic.tolist(), allowances.tolist(), deductions.tolist(), net.tolist()
+    
+    basic, allowances, deductions, net = [], [], [], []
+    for salary, paid_days, unpaid_days, contribution in zip(
+        inputs['salary'], inputs['paid_days'], inputs['unpaid_days'], inputs['contributions']
+    ):
+        monthly = salary / 12
+        employee_basic = round(monthly * paid_days / days_in_month, 2)
+        employee_allowances = round(employee_basic * allowance_rate, 2)
+        employee_deductions = round(min(monthly / days_in_month * unpaid_days, employee_basic) + contribution, 2)
+        basic.append(employee_basic)
+        allowances.append(employee_allowances)
+        deductions.append(employee_deductions)
+        net.append(round(max(employee_basic + employee_allowances - employee_deductions, 0), 2))
+    return basic, allowances, deductions, net
+
+def shard_inputs(inputs, shard_size):
+    """Split pay columns into contiguous shards of about shard_size rows.
+    
+    Shards break on (organization, department) boundaries unless a single
+    department is larger than shard_size. Only the columns compute_pay
+    reads are copied, as typed arrays, so shards pickle compactly.
+    """
+    groups = list(zip(inputs['organization_ids'], inputs['department_ids']))
+    bounds = []
+    start = 0
+    for index in range(1, len(groups) + 1):
+        if index == len(groups):
+            bounds.append((start, index))
+        elif index - start >= shard_size or (groups[index] != groups[index - 1] and
+                                              index - start >= shard_size // 2):
+            bounds.append((start, index))
+            start = index
+    return [
+        {
+            'salary': array('d', inputs['salary'][low:high]),
+            'paid_days': array('l', inputs['paid_days'][low:high]),
+            'unpaid_days': array('l', inputs['unpaid_days'][low:high]),
+            'contributions': array('d', inputs['contributions'][low:high]),
+            'days_in_month': inputs['days_in_month']
+        }
+        for low, high in bounds
+    ]
+
+def compute_pay_parallel(inputs, allowance_rate=0.0, workers=None, shard_size=None, executor=None):
+    """compute_pay across a process pool, merged back in input order.
+    
+    Results are identical to compute_pay(inputs) whatever the worker count:
+    shards are contiguous and executor.map yields them in submission order.
+    Pass an executor to reuse one pool across calls (execute_run does, for
+    every chunk of a run); otherwise a pool is started for this call.
+    """
+    workers = workers or current_app.config.get('PAYROLL_WORKERS', 1)
+    shard_size = shard_size or current_app.config.get('PAYROLL_SHARD_SIZE', 5000)
+    if workers <= 1 or len(inputs['employee_ids']) <= shard_size:
+        return compute_pay(inputs, allowance_rate)
+    
+    shards = shard_inputs(inputs, shard_size)
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+            return _merge_shards(executor.map(compute_pay, shards, repeat(allowance_rate)))
+    return _merge_shards(executor.map(compute_pay, shards, repeat(allowance_rate)))
+
+def _merge_shards(results):
+    basic, allowances, deductions, net = [], [], [], []
+    for shard in results:
+        basic.extend(shard[0])
+        allowances.extend(shard[1])
+        deductions.extend(shard[2])
+        net.extend(shard[3])
+    return basic, allowances, deductions, net
+
+def run_shard_size(chunk_size, workers, shard_size=None):
+    """Shard size that spreads every chunk of a run over all workers.
+    
+    Sharding happens per chunk, so a PAYROLL_SHARD_SIZE at or above the
+    chunk size would leave the pool idle; it is capped at chunk_size / workers.
+    """
+    shard_size = shard_size or current_app.config.get('PAYROLL_SHARD_SIZE', 5000)
+    return max(1, min(shard_size, -(-chunk_size // workers)))
+
+def _insert_statement(dialect):
+    """INSERT into payrolls that skips rows whose (employee, year, month) already exists"""
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect in ('mysql', 'mariadb'):
+        return insert(Payroll).prefix_with('IGNORE')
+    else:
+        return None
+    return dialect_insert(Payroll).on_conflict_do_nothing(index_elements=list(PAYROLL_PERIOD_COLUMNS))
+
+def insert_payrolls(rows, batch_size=None):
+    """Bulk-insert payroll rows, skipping employees already paid for the period.
+    
+    Returns the number of rows inserted. Runs in the caller's transaction.
+    """
+    batch_size = batch_size or current_app.config.get('PAYROLL_RUN_BATCH_SIZE', 500)
+    connection = db.session.connection()
+    stmt = _insert_statement(connection.dialect.name)
+    if stmt is None:
+        # No upsert syntax: filter out existing periods before inserting
+        keys = [(row['employee_id'], row['year'], row['month']) for row in rows]
+        existing = set()
+        for offset in range(0, len(keys), batch_size):
+            existing.update(tuple(row) for row in connection.execute(select(
+                Payroll.employee_id, Payroll.year, Payroll.month
+            ).where(tuple_(Payroll.employee_id, Payroll.year, Payroll.month).in_(keys[offset:offset + batch_size]))))
+        rows = [row for row, key in zip(rows, keys) if key not in existing]
+        stmt = insert(Payroll)
+    
+    if not rows:
+        return 0
+    if connection.dialect.insert_executemany_returning:
+        # executemany is batched into multi-row INSERTs by SQLAlchemy; RETURNING
+        # yields only the rows that were inserted, not the ones skipped
+        result = connection.execute(stmt.returning(Payroll.id), rows,
+                                    execution_options={'insertmanyvalues_page_size': batch_size})
+        return len(result.all())
+    return connection.execute(stmt, rows).rowcount
+
+def _chunk_end(organization_ids, year, month, after_employee_id, chunk_size):
+    """Highest employee id in the next chunk of chunk_size payable employees, None when done"""
+    _, end = _month_bounds(year, month)
+    ids = select(Employee.id).where(
+        _scope_filter(organization_ids, after_employee_id),
+        Employee.status == 'active',
+        Employee.salary.isnot(None),
+        Employee.hire_date <= end
+    ).order_by(Employee.id).limit(chunk_size).subquery()
+    return db.session.execute(select(func.max(ids.c.id))).scalar()
+
+def _lease_until(now):
+    return now + timedelta(seconds=current_app.config.get('PAYROLL_RUN_LEASE_SECONDS', 600))
+
+def start_run(organization_id, year, month, chunk_size=None):
+    """Get the run for an organization (None for all) and month, creating or reopening it.
+    
+    A failed run, or a running one whose lease has expired because its
+    worker stopped committing chunks, resumes after its last committed
+    chunk; a running run whose lease is still held raises
+    PayrollRunConflict. A completed run starts a new pass from the first
+    employee; payrolls that already exist are skipped, so the pass only adds
+    employees that were missing, such as late hires.
+    """
+    chunk_size = chunk_size or current_app.config.get('PAYROLL_RUN_CHUNK_SIZE', 2000)
+    now = datetime.utcnow()
+    lookup = PayrollRun.query.filter_by(scope_key=organization_id or 0, year=year, month=month)
+    run = lookup.first()
+    if run is None:
+        run = PayrollRun(organization_id=organization_id, year=year, month=month, chunk_size=chunk_size,
+                         lease_expires_at=_lease_until(now))
+        db.session.add(run)
+        try:
+            db.session.commit()
+            return run
+        except IntegrityError:
+            # Another worker created it first; continue with theirs
+            db.session.rollback()
+            run = lookup.one()
+    
+    # Claim the run with a compare-and-set on the status read above, so of
+    # two workers reopening it (or taking over an expired lease) one wins
+    previous = run.status
+    claim = [PayrollRun.id == run.id, PayrollRun.status == previous]
+    if previous == 'running':
+        claim.append(or_(PayrollRun.lease_expires_at.is_(None), PayrollRun.lease_expires_at < now))
+    values = {'status': 'running', 'chunk_size': chunk_size, 'attempts': PayrollRun.attempts + 1,
+              'error': None, 'lease_expires_at': _lease_until(now), 'updated_at': now}
+    if previous == 'completed':
+        values.update(last_employee_id=None, chunks_completed=0, employees=0, created=0, skipped=0,
+                      total_basic=0.0, total_allowances=0.0, total_deductions=0.0, total_net=0.0,
+                      completed_at=None)
+    claimed = db.session.execute(update(PayrollRun).where(*claim).values(**values).execution_options(
+        synchronize_session=False
+    )).rowcount
+    if not claimed:
+        db.session.rollback()
+        raise PayrollRunConflict(f'Payroll run {run.id} is being processed by another worker')
+    db.session.commit()
+    db.session.refresh(run)
+    return run
+
+def _process_chunk(run, through_employee_id, allowance_rate, payment_date, payment_method, workers, executor):
+    """Insert one chunk's payrolls and advance the checkpoint in a single transaction"""
+    inputs = load_pay_inputs(run.organization_id, run.year, run.month,
+                             run.last_employee_id, through_employee_id)
+    basic, allowances, deductions, net = compute_pay_parallel(
+        inputs, allowance_rate, workers, run_shard_size(run.chunk_size, workers), executor
+    )
+    
+    now = datetime.utcnow()
+    rows = [
+        {'employee_id': employee_id, 'month': run.month, 'year': run.year, 'basic_salary': employee_basic,
+         'allowances': employee_allowances, 'deductions': employee_deductions, 'bonus': 0.0,
+         'net_salary': employee_net, 'payment_date': payment_date, 'payment_method': payment_method,
+         'status': 'pending', 'created_at': now, 'updated_at': now}
+        for employee_id, employee_basic, employee_allowances, employee_deductions, employee_net in zip(
+            inputs['employee_ids'], basic, allowances, deductions, net
+        )
+    ]
+    created = insert_payrolls(rows)
+    
+    # Compare-and-set on the checkpoint: if another worker resumed the same
+    # run and committed this chunk first, roll back instead of counting twice
+    previous = run.last_employee_id
+    checkpoint = PayrollRun.last_employee_id.is_(None) if previous is None else \
+        PayrollRun.last_employee_id == previous
+    advanced = db.session.execute(update(PayrollRun).where(PayrollRun.id == run.id, checkpoint).values(
+        last_employee_id=through_employee_id,
+        chunks_completed=PayrollRun.chunks_completed + 1,
+        employees=PayrollRun.employees + len(rows),
+        created=PayrollRun.created + created,
+        skipped=PayrollRun.skipped + len(rows) - created,
+        total_basic=PayrollRun.total_basic + sum(basic),
+        total_allowances=PayrollRun.total_allowances + sum(allowances),
+        total_deductions=PayrollRun.total_deductions + sum(deductions),
+        total_net=PayrollRun.total_net + sum(net),
+        lease_expires_at=_lease_until(now),
+        updated_at=now
+    ).execution_options(synchronize_session=False)).rowcount
+    if not advanced:
+        raise PayrollRunConflict(f'Payroll run {run.id} was advanced by another worker')
+    if created:
+        for organization_id in sorted(set(inputs['organization_ids'])):
+            rewind_rollups(date(run.year, run.month, 1), organization_id)
+            invalidate_analytics(organization_id, date(run.year, run.month, 1))
+    db.session.commit()
+    db.session.refresh(run)
+
+def execute_run(run, allowance_rate=None, payment_date=None, payment_method=None, workers=None):
+    """Process a run chunk by chunk from its checkpoint until every employee is paid.
+    
+    Each chunk commits its payrolls together with the checkpoint, so the
+    transaction (and the lock time on payrolls) is bounded by the run's
+    chunk_size. A failure marks the run failed and re-raises; the next
+    start_run resumes after the last committed chunk. With more than one
+    worker a single process pool serves every chunk of the run.
+    """
+    if allowance_rate is None:
+        allowance_rate = current_app.config.get('PAYROLL_ALLOWANCE_RATE', 0.0)
+    workers = workers or current_app.config.get('PAYROLL_WORKERS', 1)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while True:
+            through = _chunk_end(run.organization_id, run.year, run.month, run.last_employee_id, run.chunk_size)
+            if through is None:
+                break
+            _process_chunk(run, through, allowance_rate, payment_date, payment_method, workers, executor)
+    except PayrollRunConflict:
+        db.session.rollback()
+        raise
+    except Exception as e:
+        db.session.rollback()
+        run.status = 'failed'
+        run.error = str(e)
+        run.lease_expires_at = None
+        db.session.commit()
+        raise
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    
+    run.status = 'completed'
+    run.completed_at = datetime.utcnow()
+    run.lease_expires_at = None
+    db.session.commit()
+    return run
+
+def run_payroll(organization_id, year, month, allowance_rate=None, payment_date=None,
+                payment_method=None, workers=None, chunk_size=None):
+    """Generate pending payroll records for every active employee of an organization.
+    
+    Employees that already have a payroll for the period are left untouched,
+    so a run can be repeated safely. Returns the run's progress summary.
+    """
+    run = start_run(organization_id, year, month, chunk_size)
+    return execute_run(run, allowance_rate, payment_date, payment_method, workers).to_dict()
+
+def close_payroll(year, month, organization_ids=None, workers=None, chunk_size=None):
+    """Month-end payroll for the given organizations, or all of them in one run.
+    
+    Returns one run summary per organization, or a single summary for the
+    all-organization run.
+    """
+    if organization_ids:
+        return [run_payroll(organization_id, year, month, workers=workers, chunk_size=chunk_size)
+                for organization_id in organization_ids]
+    return [run_payroll(None, year, month, workers=workers, chunk_size=chunk_size)]
+
+payroll_cli = AppGroup('payroll', help='Payroll runs')
+
+@payroll_cli.command('close')
+@click.option('--year', type=int, required=True)
+@click.option('--month', type=int, required=True)
+@click.option('--organization-id', 'organization_ids', type=int, multiple=True,
+              help='Only close these organizations (repeatable, default all)')
+@click.option('--workers', type=int, default=None, help='Worker processes (default PAYROLL_WORKERS)')
+@click.option('--chunk-size', type=int, default=None, help='Employees per commit (default PAYROLL_RUN_CHUNK_SIZE)')
+def close_command(year, month, organization_ids, workers, chunk_size):
+    """Generate the month's payroll for every active employee; resumes an interrupted close"""
+    for result in close_payroll(year, month, organization_ids or None, workers, chunk_size):
+        scope = result['organization_id'] or 'all organizations'
+        click.echo(f"Run {result['run_id']} ({scope}): created {result['created']} payrolls "
+                   f"({result['skipped']} already existed) in {result['chunks_completed']} chunks, "
+                   f"net total {result['total_net']}")
@@ -1,13 +1,321 @@
 from functools import wraps
 from flask import request, jsonify, current_app
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+from datetime import datetime
+from sqlalchemy import func, insert, or_, select, update
 from app.models.employee import Employee
-from app.models.rbac import Role, Permission, EmployeeRole, RolePermission, OrganizationSetting, AuditLog
+from app.models.organization import Organization
+from app.models.rbac import Role, Permission, EmployeeRole, RolePermission, OrganizationSetting
+from app.utils.cache import TTLCache, VersionRegistry
+from app.utils.cache_versions import read_cache_version, bump_cache_version
+from app.utils.audit import audit_writer, build_audit_event
+from app.utils.database import PRIMARY
 from app import db
 import json
 
-def has_permission(permission_name):
-    """Decorator to check if current user has specific permission"""
+# Role memberships keyed by (employee_id, organization_id). Entries are
+# stamped with the organization's permission version so that role changes can
+# invalidate a whole tenant at once. The cache is per process; the TTL bounds
+# how long another worker can serve a stale entry after a change.
+permission_cache = TTLCache(maxsize=4096, ttl=300)
+
+# Organization.permission_version is the cross-process source of truth for
+# staleness. It is re-read at most once per PERMISSION_VERSION_TTL seconds.
+version_cache = TTLCache(maxsize=4096, ttl=30)
+
+# Principals resolved from the database for tokens whose stamp is stale
+principal_cache = TTLCache(maxsize=4096, ttl=300)
+
+# Decoded organization settings snapshots keyed by organization id. Writes
+# through set_organization_setting bump the organization's version locally;
+# the TTL bounds how long another worker can serve an old snapshot.
+settings_cache = TTLCache(maxsize=1024, ttl=60)
+settings_versions = VersionRegistry()
+
+# Role -> permission matrices keyed by organization id, each stamped with the
+# persisted CacheVersions it was built from: the global one covering the
+# permission catalogue and system roles, and the organization's own covering
+# its roles. A grant change in one tenant only rebuilds that tenant's matrix.
+# Like organization versions, stamps are re-read at most once per
+# PERMISSION_VERSION_TTL seconds.
+MATRIX_VERSION = 'permission_matrix'
+matrix_cache = TTLCache(maxsize=4096, ttl=300)
+
+class PermissionMatrix:
+    """Bitset encoding of the role -> permission grants.
+
+    Each permission owns bit ``Permission.id`` (ids are never reused, so the
+    index is stable across restarts) and each role carries the OR of its
+    permission bits. Resolving an employee's permissions becomes an OR over
+    their role masks and a permission check is a single bit test.
+    """
+
+    def __init__(self, permissions, grants):
+        self.bits = {}
+        self.permissions = {}
+        for permission in permissions:
+            self.bits[permission['name']] = 1 << permission['id']
+            self.permissions[permission['id']] = permission
+        self.role_masks = {}
+        for role_id, permission_id in grants:
+            self.role_masks[role_id] = self.role_masks.get(role_id, 0) | (1 << permission_id)
+        self.all_mask = 0
+        for bit in self.bits.values():
+            self.all_mask |= bit
+
+    def mask_for_roles(self, role_ids):
+        mask = 0
+        for role_id in role_ids:
+            mask |= self.role_masks.get(role_id, 0)
+        return mask
+
+    def has(self, mask, permission_name):
+        bit = self.bits.get(permission_name)
+        return bool(bit and mask & bit)
+
+    def permission_dicts(self, mask):
+        return [perm for perm_id, perm in sorted(self.permissions.items()) if mask >> perm_id & 1]
+
+    def names(self, mask):
+        return frozenset(perm['name'] for perm in self.permission_dicts(mask))
+
+def configure_permission_cache(app):
+    """Apply cache sizing from the app config and start from an empty cache"""
+    size = app.config.get('PERMISSION_CACHE_SIZE', 4096)
+    ttl = app.config.get('PERMISSION_CACHE_TTL', 300)
+    permission_cache.configure(maxsize=size, ttl=ttl)
+    principal_cache.configure(maxsize=size, ttl=ttl)
+    matrix_cache.configure(maxsize=size, ttl=ttl)
+    version_cache.configure(maxsize=size, ttl=app.config.get('PERMISSION_VERSION_TTL', 30))
+    settings_cache.configure(maxsize=app.config.get('SETTINGS_CACHE_SIZE', 1024),
+                             ttl=app.config.get('SETTINGS_CACHE_TTL', 60))
+    settings_versions.clear()
+
+def get_permission_version(organization_id):
+    """Current permission version for an organization"""
+    if organization_id is None:
+        return 0
+    version = version_cache.get(organization_id)
+    if version is None:
+        # Versions, and the data cached under them, are read from the primary
+        # so a lagging replica cannot vouch for a stale token
+        version = db.session.execute(select(Organization.permission_version).where(
+            Organization.id == organization_id
+        ), bind_arguments=PRIMARY).scalar() or 0
+        version_cache.set(organization_id, version)
+    return version
+
+def invalidate_organization_permissions(organization_id):
+    """Invalidate cached permissions and issued token stamps for an organization.
+    
+    Bumps Organization.permission_version in the current transaction; call it
+    before committing the change it covers so both land together.
+    """
+    if organization_id is None:
+        permission_cache.delete_where(lambda key: isinstance(key, tuple) and key[1] is None)
+        principal_cache.clear()
+        return
+    
+    Organization.query.filter_by(id=organization_id).update(
+        {Organization.permission_version: func.coalesce(Organization.permission_version, 0) + 1},
+        synchronize_session=False
+    )
+    version_cache.delete(organization_id)
+
+def invalidate_employee_permissions(employee_id):
+    """Invalidate cached permissions after an employee's roles changed (before committing)"""
+    organization_id = db.session.query(Employee.organization_id).filter(
+        Employee.id == employee_id
+    ).scalar()
+    permission_cache.delete_where(lambda key: isinstance(key, tuple) and key[0] == employee_id)
+    principal_cache.delete(employee_id)
+    invalidate_organization_permissions(organization_id)
+
+def _matrix_version_name(organization_id):
+    if organization_id is None:
+        return MATRIX_VERSION
+    return f'{MATRIX_VERSION}:{organization_id}'
+
+def _read_matrix_version(name):
+    version = version_cache.get(name)
+    if version is None:
+        version = read_cache_version(name)
+        version_cache.set(name, version)
+    return version
+
+def get_matrix_version(organization_id=None):
+    """Persisted (global, organization) versions of an organization's permission matrix"""
+    organization_version = 0
+    if organization_id is not None:
+        organization_version = _read_matrix_version(_matrix_version_name(organization_id))
+    return _read_matrix_version(MATRIX_VERSION), organization_version
+
+def invalidate_permission_matrix(organization_id=None):
+    """Rebuild an organization's permission matrix in every process.
+    
+    Pass the organization whose roles changed; without one the global
+    version is bumped, which rebuilds every organization's matrix (use it for
+    the permission catalogue and system roles). Bumps the persisted version
+    in the current transaction; call it before committing the grant changes
+    it covers.
+    """
+    name = _matrix_version_name(organization_id)
+    bump_cache_version(name)
+    version_cache.delete(name)
+    if organization_id is None:
+        matrix_cache.clear()
+    else:
+        matrix_cache.delete(organization_id)
+
+def get_permission_matrix(organization_id=None):
+    """Return an organization's materialized permission matrix, loading it in two queries.
+    
+    The matrix covers the organization's own roles plus the system roles
+    shared by every organization.
+    """
+    version = get_matrix_version(organization_id)
+    matrix = matrix_cache.get(organization_id, version=version)
+    if matrix is not None:
+        return matrix
+    
+    permissions = [perm.to_dict() for perm in db.session.execute(
+        select(Permission), bind_arguments=PRIMARY
+    ).scalars()]
+    roles = Role.organization_id.is_(None)
+    if organization_id is not None:
+        roles = or_(roles, Role.organization_id == organization_id)
+    grants = db.session.execute(
+        select(RolePermission.role_id, RolePermission.permission_id).join(
+            Role, Role.id == RolePermission.role_id
+        ).where(roles), bind_arguments=PRIMARY
+    ).all()
+    matrix = PermissionMatrix(permissions, grants)
+    matrix_cache.set(organization_id, matrix, version=version)
+    return matrix
+
+def get_employee_role_ids(employee):
+    """Return the ids of the roles assigned to an employee (cached)"""
+    key = (employee.id, employee.organization_id)
+    version = get_permission_version(employee.organization_id)
+    role_ids = permission_cache.get(key, version=version)
+    if role_ids is not None:
+        return role_ids
+    
+    rows = db.session.execute(select(EmployeeRole.role_id).where(
+        EmployeeRole.employee_id == employee.id
+    ), bind_arguments=PRIMARY).all()
+    
+    role_ids = frozenset(row[0] for row in rows)
+    permission_cache.set(key, role_ids, version=version)
+    return role_ids
+
+def get_permission_mask(employee):
+    """Return the permission bitmask granted to an employee through roles"""
+    return get_permission_matrix(employee.organization_id).mask_for_roles(get_employee_role_ids(employee))
+
+def get_compiled_permissions(employee):
+    """Return the set of permission names granted to an employee through roles"""
+    return get_permission_matrix(employee.organization_id).names(get_permission_mask(employee))
+
+def get_employees_with_permission(permission_name, employee_ids=None, organization_id=None):
+    """Return the ids of the employees that hold a permission.
+
+    Resolves any number of employees with one query over their role
+    assignments, e.g. to find who can approve leaves in an organization.
+    Super admins always qualify.
+    """
+    query = db.session.query(Employee.id, Employee.organization_id, Employee.role, EmployeeRole.role_id).outerjoin(
+        EmployeeRole, EmployeeRole.employee_id == Employee.id
+    )
+    if employee_ids is not None:
+        if not employee_ids:
+            return set()
+        query = query.filter(Employee.id.in_(employee_ids))
+    if organization_id is not None:
+        query = query.filter(Employee.organization_id == organization_id)
+    
+    granted = set()
+    for employee_id, employee_organization_id, legacy_role, role_id in query.all():
+        matrix = get_permission_matrix(employee_organization_id)
+        if legacy_role == 'super_admin' or matrix.has(matrix.role_masks.get(role_id, 0), permission_name):
+            granted.add(employee_id)
+    return granted
+
+class Principal:
+    """Identity of the authenticated caller, as needed by authorization checks"""
+
+    __slots__ = ('id', 'organization_id', 'role', 'role_ids')
+
+    def __init__(self, id, organization_id, role, role_ids):
+        self.id = id
+        self.organization_id = organization_id
+        self.role = role
+        self.role_ids = frozenset(role_ids)
+
+    def to_claims(self):
+        return {
+            'org': self.organization_id,
+            'role': self.role,
+            'role_ids': sorted(self.role_ids),
+            'pv': get_permission_version(self.organization_id)
+        }
+
+def build_principal_claims(employee):
+    """Additional JWT claims embedded when JWT_EMBED_CLAIMS is enabled"""
+    # Org-less principals (super admins) have no persisted permission version
+    # to stamp, so their tokens always resolve through the database
+    if not current_app.config.get('JWT_EMBED_CLAIMS') or employee.organization_id is None:
+        return {}
+    principal = Principal(employee.id, employee.organization_id, employee.role,
+                          get_employee_role_ids(employee))
+    return principal.to_claims()
+
+def current_principal():
+    """Return the Principal for the current request, or None if the user is gone.
+
+    Tokens issued with embedded claims are trusted without touching the
+    employees table as long as their permission-version stamp matches the
+    organization's current version. Plain or stale tokens fall back to a
+    lookup, which is cached per employee until the version changes again.
+    """
+    # Memoize on the request object; g can outlive a request (e.g. in tests)
+    if not hasattr(request, '_hr_principal'):
+        request._hr_principal = _resolve_principal()
+    return request._hr_principal
+
+def _resolve_principal():
+    employee_id = int(get_jwt_identity())
+    claims = get_jwt()
+    
+    if 'pv' in claims and claims.get('org') is not None:
+        organization_id = claims.get('org')
+        version = get_permission_version(organization_id)
+        if claims['pv'] == version:
+            return Principal(employee_id, organization_id, claims.get('role'), claims.get('role_ids', []))
+        
+        principal = principal_cache.get(employee_id, version=version)
+        if principal is not None:
+            return principal
+    
+    employee = db.session.get(Employee, employee_id, bind_arguments=PRIMARY)
+    if not employee:
+        return None
+    
+    principal = Principal(employee.id, employee.organization_id, employee.role,
+                          get_employee_role_ids(employee))
+    if 'pv' in claims and employee.organization_id is not None:
+        principal_cache.set(employee_id, principal, version=get_permission_version(employee.organization_id))
+    return principal
+
+def principal_has_permission(principal, permission_name):
+    """Check a permission using the role ids carried by a Principal"""
+    if principal.role == 'super_admin':
+        return True
+    matrix = get_permission_matrix(principal.organization_id)
+    return matrix.has(matrix.mask_for_roles(principal.role_ids), permission_name)
+
+def has_permission(*permission_names):
+    """Decorator to check if current user has any of the given permissions"""
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
@@ -18,16 +326,16 @@ def has_permission(permission_name):
                 if not current_user_id:
                     return jsonify({'error': 'Authentication required'}), 401
                 
-                employee = Employee.query.get(current_user_id)
-                if not employee:
+                principal = current_principal()
+                if not principal:
                     return jsonify({'error': 'User not found'}), 404
                 
                 # Super admins have all permissions
-                if employee.role == 'super_admin':
+                if principal.role == 'super_admin':
                     return f(*args, **kwargs)
                 
                 # Check if user has the required permission
-                if check_user_permission(employee, permission_name):
+                if any(principal_has_permission(principal, name) for name in permission_names):
                     return f(*args, **kwargs)
                 else:
                     return jsonify({'error': 'Insufficient permissions'}), 403
@@ -42,21 +350,7 @@ def has_permission(permission_name):
 def check_user_permission(employee, permission_name):
     """Check if employee has specific permission"""
     try:
-        # Get all roles for the employee
-        employee_roles = EmployeeRole.query.filter_by(employee_id=employee.id).all()
-        
-        for emp_role in employee_roles:
-            role = emp_role.role
-            # Check if role has the permission
-            role_permission = RolePermission.query.join(Permission).filter(
-                RolePermission.role_id == role.id,
-                Permission.name == permission_name
-            ).first()
-            
-            if role_permission:
-                return True
-        
-        return False
+        return get_permission_matrix(employee.organization_id).has(get_permission_mask(employee), permission_name)
     except Exception as e:
         current_app.logger.error(f"Permission check error: {str(e)}")
         return False
@@ -64,18 +358,7 @@ def check_user_permission(employee, permission_name):
 def get_user_permissions(employee):
     """Get all permissions for an employee"""
     try:
-        permissions = []
-        
-        # Get all roles for the employee
-        employee_roles = EmployeeRole.query.filter_by(employee_id=employee.id).all()
-        
-        for emp_role in employee_roles:
-            role = emp_role.role
-            for permission in role.permissions:
-                if permission.name not in [p['name'] for p in permissions]:
-                    permissions.append(permission.to_dict())
-        
-        return permissions
+        return get_permission_matrix(employee.organization_id).permission_dicts(get_permission_mask(employee))
     except Exception as e:
         current_app.logger.error(f"Get permissions error: {str(e)}")
         return []
@@ -108,6 +391,7 @@ def assign_role_to_employee(employee_id, role_id, assigned_by_id=None, is_primar
         )
         
         db.session.add(employee_role)
+        invalidate_employee_permissions(employee_id)
         db.session.commit()
         
         # Log the action
@@ -129,6 +413,82 @@ def assign_role_to_employee(employee_id, role_id, assigned_by_id=None, is_primar
         current_app.logger.error(f"Role assignment error: {str(e)}")
         return False, f"Error assigning role: {str(e)}"
 
+def _chunks(values, size=500):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def assign_roles_to_employees(employee_ids, role_ids, organization_id, assigned_by_id=None,
+                              primary_role_id=None):
+    """Assign every role in role_ids to every employee in employee_ids.
+
+    Existing assignments are skipped, new rows are inserted in one
+    executemany and, when primary_role_id is given, every listed employee's
+    primary flag is rewritten by a single UPDATE. One audit record covers the
+    whole batch. Returns (success, message, stats).
+    """
+    try:
+        employee_ids = sorted({int(e) for e in employee_ids})
+        role_ids = sorted({int(r) for r in role_ids})
+        assigner_id = int(assigned_by_id) if assigned_by_id is not None else None
+        if primary_role_id is not None and int(primary_role_id) not in role_ids:
+            role_ids.append(int(primary_role_id))
+        
+        existing = set()
+        for chunk in _chunks(employee_ids):
+            existing.update(db.session.query(EmployeeRole.employee_id, EmployeeRole.role_id).filter(
+                EmployeeRole.employee_id.in_(chunk),
+                EmployeeRole.role_id.in_(role_ids)
+            ).all())
+        
+        now = datetime.utcnow()
+        rows = [
+            {'employee_id': employee_id, 'role_id': role_id, 'assigned_by': assigner_id,
+             'assigned_at': now, 'is_primary': False}
+            for employee_id in employee_ids
+            for role_id in role_ids
+            if (employee_id, role_id) not in existing
+        ]
+        if rows:
+            db.session.execute(insert(EmployeeRole), rows)
+        
+        if primary_role_id is not None:
+            for chunk in _chunks(employee_ids):
+                db.session.execute(
+                    update(EmployeeRole)
+                    .where(EmployeeRole.employee_id.in_(chunk))
+                    .values(is_primary=EmployeeRole.role_id == int(primary_role_id))
+                )
+        
+        if rows or primary_role_id is not None:
+            employee_set = set(employee_ids)
+            permission_cache.delete_where(lambda key: isinstance(key, tuple) and key[0] in employee_set)
+            for employee_id in employee_ids:
+                principal_cache.delete(employee_id)
+            invalidate_organization_permissions(organization_id)
+        db.session.commit()
+        
+        stats = {
+            'employees': len(employee_ids),
+            'roles': len(role_ids),
+            'assigned': len(rows),
+            'skipped': len(employee_ids) * len(role_ids) - len(rows)
+        }
+        
+        log_audit_action(
+            employee_id=assigned_by_id,
+            action="bulk_assign_roles",
+            resource_type="employee_role",
+            new_values=json.dumps(dict(stats, role_ids=role_ids, primary_role_id=primary_role_id)),
+            organization_id=organization_id
+        )
+        
+        return True, f"Assigned {stats['assigned']} roles", stats
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Bulk role assignment error: {str(e)}")
+        return False, f"Error assigning roles: {str(e)}", None
+
 def remove_role_from_employee(employee_id, role_id, removed_by_id=None):
     """Remove a role from an employee"""
     try:
@@ -154,6 +514,7 @@ def remove_role_from_employee(employee_id, role_id, removed_by_id=None):
         )
         
         db.session.delete(employee_role)
+        invalidate_employee_permissions(employee_id)
         db.session.commit()
         
         return True, "Role removed successfully"
@@ -162,18 +523,55 @@ def remove_role_from_employee(employee_id, role_id, removed_by_id=None):
         current_app.logger.error(f"Role removal error: {str(e)}")
         return False, f"Error removing role: {str(e)}"
 
+class OrganizationSettings:
+    """Read-only snapshot of an organization's settings, decoded by data_type.
+
+    Values are shared between callers; treat json settings as immutable.
+    """
+
+    __slots__ = ('organization_id', 'values', 'categories')
+
+    def __init__(self, organization_id, rows):
+        self.organization_id = organization_id
+        self.values = {}
+        self.categories = {}
+        for key, value, data_type, category in rows:
+            self.values[key] = OrganizationSetting.decode_value(value, data_type)
+            self.categories.setdefault(category, []).append(key)
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def category(self, name):
+        return {key: self.values[key] for key in self.categories.get(name, [])}
+
+    def __contains__(self, key):
+        return key in self.values
+
+def get_settings_snapshot(organization_id):
+    """Return the settings snapshot for an organization, loading it in one query"""
+    version = settings_versions.get(organization_id)
+    snapshot = settings_cache.get(organization_id, version=version)
+    if snapshot is not None:
+        return snapshot
+    
+    rows = db.session.query(
+        OrganizationSetting.key, OrganizationSetting.value,
+        OrganizationSetting.data_type, OrganizationSetting.category
+    ).filter(OrganizationSetting.organization_id == organization_id).all()
+    snapshot = OrganizationSettings(organization_id, rows)
+    settings_cache.set(organization_id, snapshot, version=version)
+    return snapshot
+
+def invalidate_organization_settings(organization_id):
+    """Drop the cached settings snapshot for an organization"""
+    settings_cache.delete(organization_id)
+    return settings_versions.bump(organization_id)
+
 def get_organization_setting(organization_id, key, default_value=None):
     """Get organization setting value"""
     try:
-        setting = OrganizationSetting.query.filter_by(
-            organization_id=organization_id,
-            key=key
-        ).first()
-        
-        if setting:
-            return setting.get_value()
-        else:
-            return default_value
+        return get_settings_snapshot(organization_id).get(key, default_value)
     except Exception as e:
         current_app.logger.error(f"Get setting error: {str(e)}")
         return default_value
@@ -208,6 +606,7 @@ def set_organization_setting(organization_id, key, value, category='general',
             db.session.add(setting)
         
         db.session.commit()
+        invalidate_organization_settings(organization_id)
         
         # Log the action
         log_audit_action(
@@ -227,29 +626,18 @@ def set_organization_setting(organization_id, key, value, category='general',
 
 def log_audit_action(employee_id, action, resource_type, resource_id=None, 
                     old_values=None, new_values=None, organization_id=None):
-    """Log audit action"""
+    """Log audit action (queued for a bulk write when AUDIT_ASYNC is enabled)"""
     try:
-        if not organization_id and employee_id:
-            employee = Employee.query.get(employee_id)
-            if employee:
-                organization_id = employee.organization_id
-        
-        audit_log = AuditLog(
-            organization_id=organization_id,
-            user_id=employee_id,
+        audit_writer.submit(build_audit_event(
+            employee_id=employee_id,
             action=action,
             resource_type=resource_type,
             resource_id=resource_id,
             old_values=old_values,
             new_values=new_values,
-            ip_address=request.remote_addr if request else None,
-            user_agent=request.headers.get('User-Agent') if request else None
-        )
-        
-        db.session.add(audit_log)
-        db.session.commit()
+            organization_id=organization_id
+        ))
     except Exception as e:
-        db.session.rollback()
         current_app.logger.error(f"Audit log error: {str(e)}")
 
 def initialize_default_permissions():
@@ -324,12 +712,18 @@ def initialize_default_permissions():
     ]
     
     try:
+        added = False
         for perm_data in default_permissions:
             existing = Permission.query.filter_by(name=perm_data['name']).first()
             if not existing:
                 permission = Permission(**perm_data)
                 db.session.add(permission)
+                added = True
         
+        # The catalogue is shared by every organization; only a change to it
+        # warrants rebuilding all of their matrices
+        if added:
+            invalidate_permission_matrix()
         db.session.commit()
         return True
     except Exception as e:
@@ -337,83 +731,98 @@ def initialize_default_permissions():
         current_app.logger.error(f"Initialize permissions error: {str(e)}")
         return False
 
-def initialize_default_roles(organization_id):
-    """Initialize default roles for an organization"""
-    default_roles = [
-        {
-            'name': 'admin',
-            'display_name': 'Administrator',
-            'description': 'Full access to all organization features',
-            'is_system_role': True,
-            'permissions': [
-                'employees.manage', 'attendance.manage', 'leaves.manage', 'payroll.manage',
-                'performance.manage', 'recruitment.manage', 'departments.manage',
-                'roles.manage', 'settings.manage', 'reports.manage', 'audit.read'
-            ]
-        },
-        {
-            'name': 'manager',
-            'display_name': 'Manager',
-            'description': 'Management access with team oversight',
-            'is_system_role': True,
-            'permissions': [
-                'employees.read', 'employees.update', 'attendance.read', 'attendance.update',
-                'leaves.read', 'leaves.approve', 'payroll.read', 'performance.read',
-                'performance.create', 'performance.update', 'recruitment.read',
-                'departments.read', 'reports.read'
-            ]
-        },
-        {
-            'name': 'hr',
-            'display_name': 'HR Specialist',
-            'description': 'Human resources specialist with employee management access',
-            'is_system_role': True,
-            'permissions': [
-                'employees.create', 'employees.read', 'employees.update',
-                'attendance.read', 'leaves.read', 'leaves.approve',
-                'recruitment.manage', 'performance.read', 'departments.read',
-                'reports.read'
-            ]
-        },
-        {
-            'name': 'employee',
-            'display_name': 'Employee',
-            'description': 'Basic employee access to personal information',
-            'is_system_role': True,
-            'permissions': [
-                'employees.read', 'attendance.create', 'attendance.read',
-                'leaves.create', 'leaves.read', 'performance.read'
-            ]
-        }
-    ]
-    
+DEFAULT_ROLES = [
+    {
+        'name': 'admin',
+        'display_name': 'Administrator',
+        'description': 'Full access to all organization features',
+        'is_system_role': True,
+        'permissions': [
+            'view_employees', 'create_employees', 'edit_employees', 'delete_employees',
+            'manage_employee_roles', 'attendance.manage', 'leaves.manage', 'payroll.manage',
+            'performance.manage', 'recruitment.manage', 'departments.manage',
+            'roles.manage', 'settings.manage', 'reports.manage', 'view_audit_logs'
+        ]
+    },
+    {
+        'name': 'manager',
+        'display_name': 'Manager',
+        'description': 'Management access with team oversight',
+        'is_system_role': True,
+        'permissions': [
+            'view_employees', 'edit_employees', 'attendance.read', 'attendance.update',
+            'leaves.read', 'leaves.approve', 'payroll.read', 'performance.read',
+            'performance.create', 'performance.update', 'recruitment.read',
+            'departments.read', 'reports.read'
+        ]
+    },
+    {
+        'name': 'hr',
+        'display_name': 'HR Specialist',
+        'description': 'Human resources specialist with employee management access',
+        'is_system_role': True,
+        'permissions': [
+            'create_employees', 'view_employees', 'edit_employees',
+            'attendance.read', 'leaves.read', 'leaves.approve',
+            'recruitment.manage', 'performance.read', 'departments.read',
+            'reports.read'
+        ]
+    },
+    {
+        'name': 'employee',
+        'display_name': 'Employee',
+        'description': 'Basic employee access to personal information',
+        'is_system_role': True,
+        'permissions': [
+            'attendance.create', 'attendance.read',
+            'leaves.create', 'leaves.read', 'performance.read'
+        ]
+    }
+]
+
+def initialize_default_roles(organization_id, commit=True):
+    """Initialize default roles for an organization.
+
+    Runs a fixed number of queries regardless of how many permissions the
+    roles carry. With commit=False the rows are only flushed so the caller
+    can provision inside its own transaction.
+    """
     try:
-        for role_data in default_roles:
-            permissions_list = role_data.pop('permissions', [])
-            
-            existing_role = Role.query.filter_by(
-                organization_id=organization_id,
-                name=role_data['name']
-            ).first()
-            
-            if not existing_role:
-                role = Role(organization_id=organization_id, **role_data)
-                db.session.add(role)
-                db.session.flush()  # To get the role ID
-                
-                # Assign permissions to role
-                for perm_name in permissions_list:
-                    permission = Permission.query.filter_by(name=perm_name).first()
-                    if permission:
-                        role_permission = RolePermission(
-                            role_id=role.id,
-                            permission_id=permission.id
-                        )
-                        db.session.add(role_permission)
-        
-        db.session.commit()
+        existing_names = {row[0] for row in db.session.query(Role.name).filter(
+            Role.organization_id == organization_id,
+            Role.name.in_([role_data['name'] for role_data in DEFAULT_ROLES])
+        )}
+        pending = [role_data for role_data in DEFAULT_ROLES if role_data['name'] not in existing_names]
+        if not pending:
+            return True
+        
+        wanted = {perm_name for role_data in pending for perm_name in role_data['permissions']}
+        permission_ids = dict(db.session.query(Permission.name, Permission.id).filter(
+            Permission.name.in_(wanted)
+        ).all())
+        
+        roles = [
+            Role(organization_id=organization_id,
+                 **{k: v for k, v in role_data.items() if k != 'permissions'})
+            for role_data in pending
+        ]
+        db.session.add_all(roles)
+        db.session.flush()  # One batched INSERT for all role IDs
+        
+        rows = [
+            {'role_id': role.id, 'permission_id': permission_ids[perm_name]}
+            for role, role_data in zip(roles, pending)
+            for perm_name in role_data['permissions']
+            if perm_name in permission_ids
+        ]
+        if rows:
+            db.session.execute(insert(RolePermission), rows)
+        
+        invalidate_permission_matrix(organization_id)
+        if commit:
+            db.session.commit()
         return True
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Initialize roles error: {str(e)}")
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,366 @@
+import click
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app.models.attendance import Attendance
+from app.models.employee import Employee
+from app.models.leave import Leave
+from app.models.payroll import Payroll
+from app.models.rollup import DailyWorkforceFact, DailyLeaveFact, RollupDirtyRange, RollupWatermark
+from app import db
+
+ROLLUP_NAME = 'daily_facts'
+LEFT_STATUSES = ('inactive', 'terminated')
+ATTENDED_STATUSES = ('present', 'late', 'half-day')
+
+def get_watermark():
+    """Last closed day the fact tables are built through, or None before the first run"""
+    row = db.session.get(RollupWatermark, ROLLUP_NAME)
+    return row.watermark if row else None
+
+def rewind_rollups(on_date, organization_id=None):
+    """Make the next run rebuild an organization's facts from on_date if that day is already rolled up.
+    
+    Only that organization's range is marked stale; without an organization
+    the shared watermark itself moves back (e.g. `flask rollups rebuild`).
+    Runs in the caller's transaction, so call it before committing the
+    write it accounts for.
+    """
+    watermark = get_watermark()
+    if watermark is None or on_date > watermark:
+        return
+    if organization_id is None:
+        _set_watermark(on_date - timedelta(days=1))
+    else:
+        _mark_dirty(organization_id, on_date)
+
+def _mark_dirty(organization_id, since):
+    """Record since as the organization's first stale day unless an earlier one is recorded"""
+    now = datetime.utcnow()
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(RollupDirtyRange).values(organization_id=organization_id, since=since, updated_at=now)
+        connection.execute(stmt.on_conflict_do_update(index_elements=['organization_id'], set_={
+            'since': case((stmt.excluded.since < RollupDirtyRange.since, stmt.excluded.since),
+                          else_=RollupDirtyRange.since),
+            'updated_at': now
+        }))
+        return
+    
+    earliest = update(RollupDirtyRange).where(RollupDirtyRange.organization_id == organization_id).values(
+        since=case((RollupDirtyRange.since > since, since), else_=RollupDirtyRange.since), updated_at=now
+    )
+    if connection.execute(earliest).rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            connection.execute(insert(RollupDirtyRange).values(
+                organization_id=organization_id, since=since, updated_at=now
+            ))
+    except IntegrityError:
+        connection.execute(earliest)
+
+def fresh_through(organization_id):
+    """Last day whose fact rows are current for an organization, or None"""
+    watermark = get_watermark()
+    since = db.session.query(RollupDirtyRange.since).filter(
+        RollupDirtyRange.organization_id == organization_id
+    ).scalar()
+    if watermark and since and since <= watermark:
+        return since - timedelta(days=1)
+    return watermark
+
+def _set_watermark(day):
+    row = db.session.get(RollupWatermark, ROLLUP_NAME)
+    if row is None:
+        db.session.add(RollupWatermark(name=ROLLUP_NAME, watermark=day))
+    else:
+        row.watermark = day
+
+def _midnight(day):
+    return datetime.combine(day, datetime.min.time())
+
+def _in_scope(organization_id):
+    if organization_id is None:
+        return Employee.organization_id.isnot(None)
+    return Employee.organization_id == organization_id
+
+def _headcounts(start, end, organization_id=None):
+    """Head count per (organization, department) for every day in [start, end].
+    
+    An employee counts from hire_date; employees no longer active stop
+    counting on the day of their last update (the schema has no
+    termination date).
+    """
+    key = (Employee.organization_id, Employee.department_id)
+    has_org = _in_scope(organization_id)
+    left = Employee.status.in_(LEFT_STATUSES)
+    left_day = func.date(Employee.updated_at)
+    
+    base = defaultdict(int)
+    for org_id, dept_id, count in db.session.execute(
+        select(*key, func.count(Employee.id)).where(has_org, Employee.hire_date < start).group_by(*key)
+    ):
+        base[(org_id, dept_id)] += count
+    for org_id, dept_id, count in db.session.execute(
+        select(*key, func.count(Employee.id)).where(
+            has_org, left, Employee.updated_at < _midnight(start)
+        ).group_by(*key)
+    ):
+        base[(org_id, dept_id)] -= count
+    
+    changes = defaultdict(int)
+    for org_id, dept_id, day, count in db.session.execute(
+        select(*key, Employee.hire_date, func.count(Employee.id)).where(
+            has_org, Employee.hire_date.between(start, end)
+        ).group_by(*key, Employee.hire_date)
+    ):
+        changes[(org_id, dept_id, day)] += count
+    for org_id, dept_id, day, count in db.session.execute(
+        select(*key, left_day, func.count(Employee.id)).where(
+            has_org, left, Employee.updated_at >= _midnight(start),
+            Employee.updated_at < _midnight(end + timedelta(days=1))
+        ).group_by(*key, left_day)
+    ):
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        # Leavers stop counting the day after they leave
+        changes[(org_id, dept_id, day + timedelta(days=1))] -= count
+    
+    groups = set(base) | {(org_id, dept_id) for org_id, dept_id, _ in changes}
+    counts = {}
+    for group in groups:
+        running = base.get(group, 0)
+        day = start
+        while day <= end:
+            running += changes.get(group + (day,), 0)
+            if running:
+                counts[group + (day,)] = running
+            day += timedelta(days=1)
+    return counts
+
+def _build_facts(start, end, organization_id=None):
+    """Aggregate the source tables into fact rows for [start, end], for one organization or all"""
+    facts = {}
+    in_scope = _in_scope(organization_id)
+    
+    def fact(org_id, dept_id, day):
+        row = facts.get((org_id, dept_id, day))
+        if row is None:
+            row = facts[(org_id, dept_id, day)] = {
+                'organization_id': org_id, 'department_id': dept_id, 'day': day,
+                'headcount': 0, 'attendance_records': 0, 'present': 0, 'late': 0,
+                'half_day': 0, 'absent': 0, 'payroll_total': 0.0
+            }
+        return row
+    
+    for (org_id, dept_id, day), count in _headcounts(start, end, organization_id).items():
+        fact(org_id, dept_id, day)['headcount'] = count
+    
+    for row in db.session.execute(select(
+        Employee.organization_id, Employee.department_id, Attendance.date,
+        func.count(Attendance.id),
+        func.count(case((Attendance.status == 'present', 1))),
+        func.count(case((Attendance.status == 'late', 1))),
+        func.count(case((Attendance.status == 'half-day', 1))),
+        func.count(case((Attendance.status == 'absent', 1)))
+    ).join(Employee, Attendance.employee_id == Employee.id).where(
+        in_scope,
+        Attendance.date.between(start, end)
+    ).group_by(Employee.organization_id, Employee.department_id, Attendance.date)):
+        org_id, dept_id, day, records, present, late, half_day, absent = row
+        target = fact(org_id, dept_id, day)
+        target.update(attendance_records=records, present=present, late=late,
+                      half_day=half_day, absent=absent)
+    
+    # Payroll is attributed to the first day of its pay period
+    for org_id, dept_id, year, month, total in db.session.execute(select(
+        Employee.organization_id, Employee.department_id, Payroll.year, Payroll.month,
+        func.sum(Payroll.net_salary)
+    ).join(Employee, Payroll.employee_id == Employee.id).where(
+        in_scope,
+        Payroll.status != 'cancelled',
+        Payroll.year * 12 + Payroll.month >= start.year * 12 + start.month,
+        Payroll.year * 12 + Payroll.month <= end.year * 12 + end.month
+    ).group_by(Employee.organization_id, Employee.department_id, Payroll.year, Payroll.month)):
+        day = date(year, month, 1)
+        if start <= day <= end:
+            fact(org_id, dept_id, day)['payroll_total'] = float(total or 0)
+    
+    leave_rows = [
+        {'organization_id': org_id, 'department_id': dept_id, 'day': day,
+         'leave_type': leave_type, 'leave_days': int(days or 0)}
+        for org_id, dept_id, day, leave_type, days in db.session.execute(select(
+            Employee.organization_id, Employee.department_id, Leave.start_date, Leave.leave_type,
+            func.sum(Leave.days)
+        ).join(Employee, Leave.employee_id == Employee.id).where(
+            in_scope,
+            Leave.status == 'approved',
+            Leave.start_date.between(start, end)
+        ).group_by(Employee.organization_id, Employee.department_id, Leave.start_date, Leave.leave_type))
+    ]
+    return list(facts.values()), leave_rows
+
+def rebuild_range(start, end, organization_id=None):
+    """Replace the fact rows for [start, end], for one organization or all, in the current transaction"""
+    workforce_rows, leave_rows = _build_facts(start, end, organization_id)
+    workforce_scope = [DailyWorkforceFact.day.between(start, end)]
+    leave_scope = [DailyLeaveFact.day.between(start, end)]
+    if organization_id is not None:
+        workforce_scope.append(DailyWorkforceFact.organization_id == organization_id)
+        leave_scope.append(DailyLeaveFact.organization_id == organization_id)
+    db.session.execute(delete(DailyWorkforceFact).where(*workforce_scope))
+    db.session.execute(delete(DailyLeaveFact).where(*leave_scope))
+    if workforce_rows:
+        db.session.execute(insert(DailyWorkforceFact), workforce_rows)
+    if leave_rows:
+        db.session.execute(insert(DailyLeaveFact), leave_rows)
+    return len(workforce_rows) + len(leave_rows)
+
+def _rebuild_dirty(watermark, chunk_days):
+    """Rebuild each stale organization range through the watermark; returns (days, rows)"""
+    db.session.execute(delete(RollupDirtyRange).where(RollupDirtyRange.since > watermark))
+    db.session.commit()
+    days = rows = 0
+    for organization_id, since in db.session.execute(select(
+        RollupDirtyRange.organization_id, RollupDirtyRange.since
+    )).all():
+        start = since
+        while start <= watermark:
+            end = min(start + timedelta(days=chunk_days - 1), watermark)
+            try:
+                rows += rebuild_range(start, end, organization_id)
+                # Advance only if no backdated write marked an earlier day meanwhile
+                progress = (RollupDirtyRange.organization_id == organization_id, RollupDirtyRange.since == start)
+                if end == watermark:
+                    db.session.execute(delete(RollupDirtyRange).where(*progress))
+                else:
+                    db.session.execute(update(RollupDirtyRange).where(*progress).values(
+                        since=end + timedelta(days=1), updated_at=datetime.utcnow()
+                    ))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            days += (end - start).days + 1
+            start = end + timedelta(days=1)
+    return days, rows
+
+def run_rollups(until=None, chunk_days=None, backfill_days=None):
+    """Build fact rows from the day after the watermark through until (default yesterday).
+    
+    Organizations with backdated changes are first rebuilt from their
+    first stale day through the watermark. Each chunk of days is rebuilt
+    and its progress recorded in its own transaction, so an interrupted run
+    resumes where it stopped. Returns (days processed, fact rows written).
+    """
+    chunk_days = chunk_days or current_app.config.get('ROLLUP_CHUNK_DAYS', 31)
+    backfill_days = backfill_days or current_app.config.get('ROLLUP_BACKFILL_DAYS', 400)
+    until = until or date.today() - timedelta(days=1)
+    
+    watermark = get_watermark()
+    days = rows = 0
+    if watermark:
+        days, rows = _rebuild_dirty(watermark, chunk_days)
+    start = watermark + timedelta(days=1) if watermark else until - timedelta(days=backfill_days - 1)
+    
+    while start <= until:
+        end = min(start + timedelta(days=chunk_days - 1), until)
+        try:
+            rows += rebuild_range(start, end)
+            _set_watermark(end)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        days += (end - start).days + 1
+        start = end + timedelta(days=1)
+    return days, rows
+
+def daily_attendance(organization_id, start, end):
+    """Attendance totals per day as {day: (records, attended, present, late)}.
+    
+    Days up to the organization's fresh watermark come from
+    daily_workforce_facts; later days (normally just today, or a range
+    invalidated by a backdated write) are aggregated from attendances.
+    """
+    watermark = fresh_through(organization_id)
+    totals = {}
+    if watermark and start <= watermark:
+        for day, records, attended, present, late in db.session.execute(select(
+            DailyWorkforceFact.day,
+            func.sum(DailyWorkforceFact.attendance_records),
+            func.sum(DailyWorkforceFact.present + DailyWorkforceFact.late + DailyWorkforceFact.half_day),
+            func.sum(DailyWorkforceFact.present),
+            func.sum(DailyWorkforceFact.late)
+        ).where(
+            DailyWorkforceFact.organization_id == organization_id,
+            DailyWorkforceFact.day.between(start, min(end, watermark))
+        ).group_by(DailyWorkforceFact.day)):
+            totals[day] = (records, attended, present, late)
+    
+    raw_start = max(start, watermark + timedelta(days=1)) if watermark else start
+    if raw_start <= end:
+        for day, records, attended, present, late in db.session.execute(select(
+            Attendance.date, func.count(Attendance.id),
+            func.count(case((Attendance.status.in_(ATTENDED_STATUSES), 1))),
+            func.count(case((Attendance.status == 'present', 1))),
+            func.count(case((Attendance.status == 'late', 1)))
+        ).join(Employee, Attendance.employee_id == Employee.id).where(
+            Employee.organization_id == organization_id,
+            Attendance.date.between(raw_start, end)
+        ).group_by(Attendance.date)):
+            totals[day] = (records, attended, present, late)
+    return totals
+
+def leave_days_by_type(organization_id, start, end):
+    """Approved leave days starting in [start, end], per leave type"""
+    watermark = fresh_through(organization_id)
+    totals = defaultdict(int)
+    if watermark and start <= watermark:
+        for leave_type, days in db.session.execute(select(
+            DailyLeaveFact.leave_type, func.sum(DailyLeaveFact.leave_days)
+        ).where(
+            DailyLeaveFact.organization_id == organization_id,
+            DailyLeaveFact.day.between(start, min(end, watermark))
+        ).group_by(DailyLeaveFact.leave_type)):
+            totals[leave_type] += int(days or 0)
+    
+    raw_start = max(start, watermark + timedelta(days=1)) if watermark else start
+    if raw_start <= end:
+        for leave_type, days in db.session.execute(select(
+            Leave.leave_type, func.sum(Leave.days)
+        ).join(Employee, Leave.employee_id == Employee.id).where(
+            Employee.organization_id == organization_id,
+            Leave.status == 'approved',
+            Leave.start_date.between(raw_start, end)
+        ).group_by(Leave.leave_type)):
+            totals[leave_type] += int(days or 0)
+    return dict(totals)
+
+rollups_cli = AppGroup('rollups', help='Daily analytics fact tables')
+
+@rollups_cli.command('run')
+@click.option('--until', default=None, help='Last day to roll up (YYYY-MM-DD, default yesterday)')
+def run_command(until):
+    """Roll up every closed day after the watermark (run nightly)"""
+    until = datetime.strptime(until, '%Y-%m-%d').date() if until else None
+    days, rows = run_rollups(until)
+    click.echo(f"Rolled up {days} days ({rows} fact rows), watermark {get_watermark()}")
+
+@rollups_cli.command('rebuild')
+@click.option('--since', required=True, help='First day to rebuild (YYYY-MM-DD)')
+def rebuild_command(since):
+    """Rewind the watermark and rebuild every day from since"""
+    rewind_rollups(datetime.strptime(since, '%Y-%m-%d').date())
+    db.session.commit()
+    days, rows = run_rollups()
+    click.echo(f"Rebuilt {days} days ({rows} fact rows), watermark {get_watermark()}")
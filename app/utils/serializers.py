@@ -0,0 +1,126 @@
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import Date, DateTime
+from app.models.employee import Employee
+from app.models.attendance import Attendance
+from app.models.leave import Leave
+from app.models.payroll import Payroll
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the stdlib encoder
+    orjson = None
+
+class InvalidFields(ValueError):
+    """Raised when a fields= parameter names unknown columns"""
+
+def _isoformat(values):
+    return [value.isoformat() if value is not None else None for value in values]
+
+class RowSerializer:
+    """Columnar serializer producing the same dicts as a model's to_dict().
+
+    Selects only the listed columns (as tuples rather than ORM instances),
+    converts date/datetime columns one column at a time and zips the result
+    back into dicts, skipping per-row attribute lookups and identity-map
+    bookkeeping.
+    """
+
+    def __init__(self, model, fields, extra=()):
+        self.model = model
+        self.fields = list(fields)
+        # Extra columns are selected (e.g. keyset sort keys) but not emitted
+        selected = self.fields + [name for name in extra if name not in self.fields]
+        self.columns = [getattr(model, name) for name in selected]
+        self._converters = [
+            index for index, column in enumerate(self.columns[:len(self.fields)])
+            if isinstance(column.type, (Date, DateTime))
+        ]
+
+    def project(self, fields=None, required=()):
+        """Return a serializer limited to a comma-separated or list subset of fields.
+
+        required names are always selected so callers can read them from
+        the rows (for keyset cursors) without adding them to the output.
+        """
+        if isinstance(fields, str):
+            fields = [name.strip() for name in fields.split(',') if name.strip()]
+        if not fields:
+            fields = self.fields
+        unknown = [name for name in fields if name not in self.fields]
+        if unknown:
+            raise InvalidFields(f"Unknown fields: {', '.join(unknown)}")
+        fields = list(dict.fromkeys(fields))
+        if fields == self.fields and all(name in self.fields for name in required):
+            return self
+        return RowSerializer(self.model, fields, extra=required)
+
+    def select(self, query):
+        """Narrow an ORM query to this serializer's columns"""
+        return query.with_entities(*self.columns)
+
+    def dump(self, rows):
+        """Serialize a sequence of row tuples"""
+        if not rows:
+            return []
+        fields = self.fields
+        columns = list(zip(*rows))[:len(fields)]
+        for index in self._converters:
+            columns[index] = _isoformat(columns[index])
+        return [dict(zip(fields, values)) for values in zip(*columns)]
+
+EMPLOYEE_SERIALIZER = RowSerializer(Employee, [
+    'id', 'organization_id', 'employee_id', 'email', 'first_name', 'last_name', 'phone',
+    'date_of_birth', 'hire_date', 'position', 'department_id', 'salary', 'status',
+    'address', 'emergency_contact', 'role', 'created_at'
+])
+
+ATTENDANCE_SERIALIZER = RowSerializer(Attendance, [
+    'id', 'employee_id', 'date', 'check_in', 'check_out', 'status', 'notes', 'created_at'
+])
+
+LEAVE_SERIALIZER = RowSerializer(Leave, [
+    'id', 'employee_id', 'leave_type', 'start_date', 'end_date', 'days', 'reason',
+    'status', 'approved_by', 'approved_at', 'created_at'
+])
+
+PAYROLL_SERIALIZER = RowSerializer(Payroll, [
+    'id', 'employee_id', 'month', 'year', 'basic_salary', 'allowances', 'deductions',
+    'bonus', 'net_salary', 'payment_date', 'payment_method', 'status', 'notes', 'created_at'
+])
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson when it is installed.
+
+    Datetimes are passed through to Flask's default hook so the output
+    matches the stdlib provider; anything orjson rejects (e.g. integers
+    wider than 64 bits) is retried with the stdlib encoder. jsonify() passes
+    either compact separators or indent=2, which map onto orjson's compact
+    output and OPT_INDENT_2; any other formatting argument uses the stdlib.
+    """
+
+    def _orjson_option(self, kwargs):
+        if orjson is None or set(kwargs) - {'indent', 'separators'}:
+            return None
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        indent = kwargs.get('indent')
+        if indent == 2:
+            return option | orjson.OPT_INDENT_2
+        if indent is None and kwargs.get('separators') in (None, (',', ':')):
+            return option
+        return None
+
+    def dumps(self, obj, **kwargs):
+        option = self._orjson_option(kwargs)
+        if option is None:
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode()
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
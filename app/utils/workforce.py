@@ -0,0 +1,304 @@
+import bisect
+import math
+from collections import defaultdict
+from datetime import date
+from sqlalchemy import select
+from app.models.department import Department
+from app.models.employee import Employee
+from app import db
+
+try:
+    import numpy as np
+except ImportError:  # Optional: every metric has a pure-Python path
+    np = None
+
+LEFT_STATUSES = ('inactive', 'terminated')
+DAYS_PER_MONTH = 365.25 / 12
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# (name, label, lower bound) in ascending order; the last band is open-ended
+SALARY_BANDS = (
+    ('below_entry', '<40k', 0),
+    ('entry_level', '40-60k', 40000),
+    ('mid_level', '60-80k', 60000),
+    ('senior_level', '80-120k', 80000),
+    ('executive', '120k+', 120000),
+)
+
+# Ratio thresholds for pay-equity status: >= GOOD is good, >= REVIEW needs review
+EQUITY_GOOD_RATIO = 0.95
+EQUITY_REVIEW_RATIO = 0.90
+
+def _factorize(values):
+    """Integer codes for values plus the sorted list of distinct values they index"""
+    names = sorted(set(values))
+    codes = {name: code for code, name in enumerate(names)}
+    if np is not None:
+        return np.fromiter((codes[value] for value in values), dtype=np.int64, count=len(values)), names
+    return [codes[value] for value in values], names
+
+class WorkforceData:
+    """Column arrays for one organization's employees, pulled with a single query.
+    
+    Dates are day ordinals and departments/positions are integer codes into
+    the names lists, so metrics run as array operations (NumPy when it is
+    installed, plain lists otherwise). Salary columns only cover active
+    employees with a salary.
+    """
+    
+    def __init__(self, rows, as_of=None):
+        self.as_of = as_of or date.today()
+        columns = list(zip(*rows))
+        salary, hire_date, position, status, terminated_at, department = columns or ([],) * 6
+        department = ['Unassigned' if name is None else name for name in department]
+        if np is not None:
+            self._from_arrays(salary, hire_date, position, status, terminated_at, department)
+        else:
+            self._from_lists(salary, hire_date, position, status, terminated_at, department)
+    
+    def _from_arrays(self, salary, hire_date, position, status, terminated_at, department):
+        status = np.asarray(status, dtype=object)
+        active = status == 'active'
+        salary = np.asarray(salary, dtype=np.float64)
+        paid = active & ~np.isnan(salary)
+        # toordinal() per value is several times faster than a datetime64 cast of date objects
+        hire_day = np.fromiter((day.toordinal() for day in hire_date), dtype=np.int64, count=len(hire_date))
+        
+        left = np.flatnonzero(np.isin(status, LEFT_STATUSES))
+        self.left_day = np.fromiter(
+            (terminated_at[i].date().toordinal() for i in left.tolist() if terminated_at[i] is not None),
+            dtype=np.int64
+        )
+        self.active_count = int(np.count_nonzero(active))
+        self.active_hire_day = hire_day[active]
+        
+        self.salary = salary[paid]
+        self.hire_day = hire_day[paid]
+        paid_index = np.flatnonzero(paid).tolist()
+        self.department, self.departments = _factorize([department[index] for index in paid_index])
+        self.position, self.positions = _factorize([position[index] for index in paid_index])
+    
+    def _from_lists(self, salary, hire_date, position, status, terminated_at, department):
+        active = [value == 'active' for value in status]
+        paid = [index for index, is_active in enumerate(active) if is_active and salary[index] is not None]
+        self.left_day = [
+            terminated_at[index].date().toordinal() for index, value in enumerate(status)
+            if value in LEFT_STATUSES and terminated_at[index] is not None
+        ]
+        self.active_count = sum(active)
+        self.active_hire_day = [day.toordinal() for day, is_active in zip(hire_date, active) if is_active]
+        
+        self.salary = [float(salary[index]) for index in paid]
+        self.hire_day = [hire_date[index].toordinal() for index in paid]
+        self.department, self.departments = _factorize([department[index] for index in paid])
+        self.position, self.positions = _factorize([position[index] for index in paid])
+    
+    def __len__(self):
+        return len(self.salary)
+
+def load_workforce(organization_id, as_of=None):
+    """Pull the columns every workforce metric needs in one query"""
+    rows = db.session.execute(select(
+        Employee.salary, Employee.hire_date, Employee.position, Employee.status, Employee.terminated_at,
+        Department.name.label('department_name')
+    ).outerjoin(Department, Employee.department_id == Department.id).where(
+        Employee.organization_id == organization_id
+    ))
+    return WorkforceData(rows, as_of=as_of)
+
+def _percentile(sorted_values, q):
+    # Linear interpolation between closest ranks (NumPy's default method)
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100.0
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def percentiles(values, qs=(25, 50, 75, 90)):
+    """{q: value} for the given percentiles, None for an empty input"""
+    if not len(values):
+        return {q: None for q in qs}
+    if np is not None:
+        return dict(zip(qs, (float(v) for v in np.percentile(values, qs))))
+    ordered = sorted(values)
+    return {q: _percentile(ordered, q) for q in qs}
+
+def group_stats(codes, values):
+    """Per-group (count, sum, min, max, median) keyed by group code.
+    
+    The NumPy path sorts once by (code, value) and reduces every group
+    with reduceat, so there is no Python-level loop per employee.
+    """
+    if not len(values):
+        return {}
+    if np is not None:
+        order = np.lexsort((values, codes))
+        sorted_codes, sorted_values = codes[order], values[order]
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(sorted_codes)) + 1))
+        counts = np.diff(np.concatenate((starts, [len(sorted_values)])))
+        sums = np.add.reduceat(sorted_values, starts)
+        maxs = sorted_values[starts + counts - 1]
+        medians = (sorted_values[starts + (counts - 1) // 2] + sorted_values[starts + counts // 2]) / 2
+        return {
+            int(code): (int(count), float(total), float(low), float(high), float(median))
+            for code, count, total, low, high, median in zip(
+                sorted_codes[starts], counts, sums, sorted_values[starts], maxs, medians
+            )
+        }
+    groups = defaultdict(list)
+    for code, value in zip(codes, values):
+        groups[code].append(value)
+    stats = {}
+    for code, members in groups.items():
+        members.sort()
+        count = len(members)
+        median = (members[(count - 1) // 2] + members[count // 2]) / 2
+        stats[code] = (count, sum(members), members[0], members[-1], median)
+    return stats
+
+def salary_bands(data, bands=SALARY_BANDS):
+    """Head count, share and average salary per salary band"""
+    edges = [lower for _, _, lower in bands]
+    total = len(data)
+    if np is not None:
+        index = np.searchsorted(edges, data.salary, side='right') - 1
+        index = np.clip(index, 0, len(edges) - 1)
+        counts = np.bincount(index, minlength=len(edges)).tolist()
+        sums = np.bincount(index, weights=data.salary, minlength=len(edges)).tolist()
+    else:
+        counts = [0] * len(edges)
+        sums = [0.0] * len(edges)
+        for salary in data.salary:
+            band = max(bisect.bisect_right(edges, salary) - 1, 0)
+            counts[band] += 1
+            sums[band] += salary
+    return {
+        name: {
+            'range': label,
+            'count': count,
+            'percentage': round(count * 100.0 / total, 1) if total else 0.0,
+            'avg_salary': round(band_sum / count, 2) if count else 0.0
+        }
+        for (name, label, _), count, band_sum in zip(bands, counts, sums)
+    }
+
+def tenure_summary(data):
+    """Mean, median and quartiles of active employees' tenure in months"""
+    as_of = data.as_of.toordinal()
+    if np is not None:
+        months = (as_of - data.active_hire_day) / DAYS_PER_MONTH
+        mean = float(months.mean()) if len(months) else None
+    else:
+        months = [(as_of - day) / DAYS_PER_MONTH for day in data.active_hire_day]
+        mean = sum(months) / len(months) if months else None
+    quartiles = percentiles(months, (25, 50, 75))
+    return {
+        'avg_tenure_months': round(mean, 1) if mean is not None else 0.0,
+        'median_tenure_months': round(quartiles[50], 1) if quartiles[50] is not None else 0.0,
+        'tenure_p25_months': round(quartiles[25], 1) if quartiles[25] is not None else 0.0,
+        'tenure_p75_months': round(quartiles[75], 1) if quartiles[75] is not None else 0.0
+    }
+
+def turnover_rate(data, start, end):
+    """Leavers between start and end as a percentage of active employees plus leavers"""
+    low, high = start.toordinal(), end.toordinal()
+    if np is not None:
+        leavers = int(np.count_nonzero((data.left_day >= low) & (data.left_day <= high)))
+    else:
+        leavers = sum(1 for day in data.left_day if low <= day <= high)
+    population = data.active_count + leavers
+    return round(leavers * 100.0 / population, 1) if population else 0.0
+
+def _equity_status(ratio):
+    if ratio >= EQUITY_GOOD_RATIO:
+        return 'good'
+    if ratio >= EQUITY_REVIEW_RATIO:
+        return 'review'
+    return 'action_needed'
+
+def department_summary(data):
+    """Head count and salary spread per department"""
+    return {
+        data.departments[code]: {
+            'count': count,
+            'avg_salary': round(total / count, 2),
+            'median_salary': round(median, 2),
+            'min': low,
+            'max': high
+        }
+        for code, (count, total, low, high, median) in sorted(group_stats(data.department, data.salary).items())
+    }
+
+def pay_equity(data):
+    """Compare pay for the same position across departments.
+    
+    Each employee's compa-ratio is their salary over the median salary of
+    their position; a department's ratio is the mean compa-ratio of its
+    employees. A position's ratio is its lowest department average over its
+    highest, so 1.0 means every department pays the role the same.
+    """
+    if not len(data):
+        return {'overall_ratio': None, 'status': 'no_data', 'departments': [], 'positions': []}
+    
+    width = len(data.departments)
+    position_stats = group_stats(data.position, data.salary)
+    if np is not None:
+        pairs = data.position * width + data.department
+    else:
+        pairs = [position * width + department for position, department in zip(data.position, data.department)]
+    pair_stats = group_stats(pairs, data.salary)
+    
+    if np is not None:
+        medians = np.zeros(len(data.positions))
+        for code, stats in position_stats.items():
+            medians[code] = stats[4]
+        compa = data.salary / medians[data.position]
+        department_counts = np.bincount(data.department, minlength=len(data.departments))
+        department_compa = np.bincount(data.department, weights=compa, minlength=len(data.departments))
+        department_ratios = {
+            code: float(department_compa[code] / department_counts[code])
+            for code in np.flatnonzero(department_counts).tolist()
+        }
+    else:
+        medians = {code: stats[4] for code, stats in position_stats.items()}
+        sums = defaultdict(float)
+        counts = defaultdict(int)
+        for salary, position, department in zip(data.salary, data.position, data.department):
+            sums[department] += salary / medians[position]
+            counts[department] += 1
+        department_ratios = {code: sums[code] / counts[code] for code in counts}
+    
+    departments = [
+        {
+            'name': data.departments[code],
+            'avg_compa_ratio': round(ratio, 3),
+            'status': _equity_status(min(ratio, 1 / ratio) if ratio else 0.0)
+        }
+        for code, ratio in sorted(department_ratios.items())
+    ]
+    
+    by_position = defaultdict(list)
+    for pair, (count, total, _, _, _) in pair_stats.items():
+        by_position[pair // width].append(total / count)
+    positions = []
+    for code, averages in sorted(by_position.items()):
+        if len(averages) < 2:
+            continue
+        ratio = min(averages) / max(averages) if max(averages) else 1.0
+        positions.append({
+            'position': data.positions[code],
+            'ratio': round(ratio, 3),
+            'department_count': len(averages),
+            'employee_count': position_stats[code][0],
+            'status': _equity_status(ratio)
+        })
+    
+    values = list(department_ratios.values())
+    overall = min(values) / max(values) if max(values) else 1.0
+    return {
+        'overall_ratio': round(overall, 3),
+        'status': 'within_range' if overall >= EQUITY_GOOD_RATIO else 'review',
+        'departments': departments,
+        'positions': positions
+    }
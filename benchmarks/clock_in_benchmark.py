@@ -0,0 +1,122 @@
+"""
+Simulate the morning clock-in spike against POST /api/attendance/check-in.
+
+Seeds a file-backed SQLite database with one organization, then has a pool
+of client threads check every employee in once. A share of requests is
+resent with the same Idempotency-Key, as mobile clients do after a
+timeout. Reports throughput and latency percentiles and verifies that
+every employee has exactly one attendance row and that the dashboard
+counter matches. With --journal, requests are acknowledged from the
+write-behind clock journal and the time to drain it is reported too.
+
+    python benchmarks/clock_in_benchmark.py --employees 5000 --threads 16 --retry-rate 0.1
+    python benchmarks/clock_in_benchmark.py --employees 5000 --threads 16 --journal
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def seed(employees):
+    from sqlalchemy import insert, select
+    from app import db
+    from app.models import Organization, Employee
+    org = Organization(name='Bench', slug='bench', email='bench@example.com')
+    db.session.add(org)
+    db.session.flush()
+    now = datetime.utcnow()
+    db.session.execute(insert(Employee), [
+        {'organization_id': org.id, 'employee_id': f'E{i:06d}', 'email': f'user{i}@example.com',
+         'first_name': 'First', 'last_name': f'Last{i}', 'hire_date': date(2020, 1, 1),
+         'position': 'Engineer', 'salary': 50000, 'status': 'active', 'role': 'employee',
+         'created_at': now, 'updated_at': now}
+        for i in range(employees)
+    ])
+    db.session.commit()
+    return org.id, db.session.scalars(select(Employee.id).where(Employee.organization_id == org.id)).all()
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q / 100), len(ordered) - 1)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--employees', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--retry-rate', type=float, default=0.1)
+    parser.add_argument('--journal', action='store_true', help='Acknowledge from the write-behind journal')
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix='clock-bench-')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    os.environ['CLOCK_JOURNAL_ENABLED'] = 'true' if args.journal else 'false'
+    os.environ['CLOCK_JOURNAL_DIR'] = os.path.join(workdir, 'journal')
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import func, select
+    from app import create_app, db
+    from app.models.attendance import Attendance
+    from app.utils.clock_journal import clock_journal
+    from app.utils.counters import get_dashboard_counters
+    
+    app = create_app('production')
+    with app.app_context():
+        db.create_all()
+        organization_id, employee_ids = seed(args.employees)
+        tokens = {employee_id: create_access_token(identity=str(employee_id)) for employee_id in employee_ids}
+    
+    requests = [(employee_id, f'checkin-{employee_id}') for employee_id in employee_ids]
+    requests += random.Random(7).sample(requests, int(len(requests) * args.retry_rate))
+    random.Random(11).shuffle(requests)
+    
+    local = threading.local()
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+    
+    def clock(request):
+        employee_id, key = request
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        headers = {'Authorization': f'Bearer {tokens[employee_id]}', 'Idempotency-Key': key}
+        start = time.perf_counter()
+        response = local.client.post('/api/attendance/check-in', headers=headers)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        list(executor.map(clock, requests))
+    wall = time.perf_counter() - start
+    
+    drain = None
+    if args.journal:
+        start = time.perf_counter()
+        with app.app_context():
+            clock_journal.flush()
+        drain = time.perf_counter() - start
+    
+    with app.app_context():
+        rows = db.session.scalar(select(func.count(Attendance.id)))
+        present = get_dashboard_counters(organization_id)['attendance_today']
+    
+    print(f"employees={args.employees} requests={len(requests)} threads={args.threads} "
+          f"mode={'journal' if args.journal else 'direct'}")
+    print(f"throughput: {len(requests) / wall:8.1f} req/s   wall: {wall:6.2f} s")
+    print(f"latency p50: {percentile(latencies, 50) * 1000:6.1f} ms   p95: {percentile(latencies, 95) * 1000:6.1f} ms"
+          f"   p99: {percentile(latencies, 99) * 1000:6.1f} ms")
+    print(f"status codes: {dict(sorted(statuses.items()))}")
+    if drain is not None:
+        print(f"journal drain after the spike: {drain * 1000:8.1f} ms")
+    print(f"attendance rows: {rows}   present_today counter: {present}")
+    assert rows == present == args.employees, 'every employee must be checked in exactly once'
+
+if __name__ == '__main__':
+    main()
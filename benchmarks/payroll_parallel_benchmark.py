@@ -0,0 +1,88 @@
+"""
+Compare payroll computation across worker process counts.
+
+Seeds an in-memory SQLite database with many organizations and
+departments, loads the pay columns once, then times compute_pay_parallel
+with each worker count and checks every result matches the in-process one.
+    
+    python benchmarks/payroll_parallel_benchmark.py --employees 100000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert, select
+from app import create_app, db
+from app.models import Organization, Department, Employee, Leave, EmployeeBenefit
+from app.utils import payroll_runs
+
+def seed(employees, organizations, first):
+    now = datetime.utcnow()
+    db.session.execute(insert(Organization), [
+        {'name': f'Org {i}', 'slug': f'org-{i}', 'email': f'org{i}@example.com', 'created_at': now}
+        for i in range(organizations)
+    ])
+    org_ids = db.session.scalars(select(Organization.id).order_by(Organization.id)).all()
+    db.session.execute(insert(Department), [
+        {'name': f'Dept {d}', 'organization_id': org_id} for org_id in org_ids for d in range(5)
+    ])
+    departments = db.session.execute(select(Department.id, Department.organization_id)).all()
+    
+    db.session.execute(insert(Employee), [
+        {'organization_id': departments[i % len(departments)][1], 'employee_id': f'E{i:07d}',
+         'email': f'user{i}@example.com', 'first_name': 'First', 'last_name': f'Last{i}',
+         'hire_date': first - timedelta(days=i % 3650) + timedelta(days=i % 7), 'position': 'Engineer',
+         'department_id': departments[i % len(departments)][0], 'salary': 40000 + (i * 7919) % 110000,
+         'status': 'active', 'role': 'employee', 'created_at': now, 'updated_at': now}
+        for i in range(employees)
+    ])
+    ids = db.session.scalars(select(Employee.id)).all()
+    db.session.execute(insert(Leave), [
+        {'employee_id': employee_id, 'leave_type': 'unpaid', 'start_date': first + timedelta(days=3),
+         'end_date': first + timedelta(days=4), 'days': 2, 'status': 'approved'}
+        for employee_id in ids[::10]
+    ])
+    db.session.execute(insert(EmployeeBenefit), [
+        {'employee_id': employee_id, 'benefit_type': 'health', 'benefit_name': 'Health plan',
+         'start_date': first - timedelta(days=365), 'employee_contribution': 120, 'status': 'active'}
+        for employee_id in ids[::3]
+    ])
+    db.session.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--employees', type=int, default=100000)
+    parser.add_argument('--organizations', type=int, default=200)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--shard-size', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        first = date.today().replace(day=1)
+        seed(args.employees, args.organizations, first)
+        
+        start = time.perf_counter()
+        inputs = payroll_runs.load_pay_inputs(None, first.year, first.month)
+        print(f"employees={len(inputs['employee_ids'])} organizations={args.organizations} "
+              f"numpy={'yes' if payroll_runs.np is not None else 'no'}")
+        print(f"load (3 queries): {(time.perf_counter() - start) * 1000:8.1f} ms")
+        
+        expected = payroll_runs.compute_pay(inputs, 0.05)
+        for workers in args.workers:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                result = payroll_runs.compute_pay_parallel(inputs, 0.05, workers, args.shard_size)
+                timings.append(time.perf_counter() - start)
+            assert result == expected, f"workers={workers} result differs from in-process computation"
+            print(f"workers={workers:<2} compute: {min(timings) * 1000:8.1f} ms")
+
+if __name__ == '__main__':
+    main()
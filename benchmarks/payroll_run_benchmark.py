@@ -0,0 +1,75 @@
+"""
+Time a payroll run for one organization.
+
+Seeds an in-memory SQLite database with active employees, some approved
+unpaid leave and benefit contributions, then times the first run (every
+row inserted) and a repeated run (every row skipped by ON CONFLICT).
+
+    python benchmarks/payroll_run_benchmark.py --employees 10000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert, select
+from app import create_app, db
+from app.models import Organization, Employee, Leave, EmployeeBenefit
+from app.utils.payroll_runs import run_payroll
+
+def seed(employees, first):
+    org = Organization(name='Bench', slug='bench', email='bench@example.com')
+    db.session.add(org)
+    db.session.flush()
+    
+    now = datetime.utcnow()
+    db.session.execute(insert(Employee), [
+        {'organization_id': org.id, 'employee_id': f'E{i:06d}', 'email': f'user{i}@example.com',
+         'first_name': 'First', 'last_name': f'Last{i}', 'hire_date': first - timedelta(days=i % 3650),
+         'position': 'Engineer', 'salary': 40000 + (i * 7919) % 110000, 'status': 'active',
+         'role': 'employee', 'created_at': now, 'updated_at': now}
+        for i in range(employees)
+    ])
+    ids = db.session.scalars(select(Employee.id).where(Employee.organization_id == org.id)).all()
+    db.session.execute(insert(Leave), [
+        {'employee_id': employee_id, 'leave_type': 'unpaid', 'start_date': first + timedelta(days=3),
+         'end_date': first + timedelta(days=4), 'days': 2, 'status': 'approved'}
+        for employee_id in ids[::10]
+    ])
+    db.session.execute(insert(EmployeeBenefit), [
+        {'employee_id': employee_id, 'benefit_type': 'health', 'benefit_name': 'Health plan',
+         'start_date': first - timedelta(days=365), 'employee_contribution': 120, 'status': 'active'}
+        for employee_id in ids[::3]
+    ])
+    db.session.commit()
+    return org.id
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--employees', type=int, default=10000)
+    parser.add_argument('--chunk-size', type=int, default=None, help='Employees per committed chunk')
+    args = parser.parse_args()
+    
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        first = date.today().replace(day=1)
+        organization_id = seed(args.employees, first)
+        
+        print(f"employees={args.employees}")
+        for label in ('first run', 'repeat run'):
+            result, elapsed = timed(lambda: run_payroll(organization_id, first.year, first.month,
+                                                        chunk_size=args.chunk_size))
+            print(f"{label:<11} {elapsed * 1000:8.1f} ms   created={result['created']} skipped={result['skipped']} "
+                  f"chunks={result['chunks_completed']}")
+
+if __name__ == '__main__':
+    main()
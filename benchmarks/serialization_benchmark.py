@@ -0,0 +1,84 @@
+"""
+Compare the to_dict() + stdlib JSON path with the columnar serializers.
+
+Seeds an in-memory SQLite database and times both paths for the employee
+and attendance list payloads.
+
+    python benchmarks/serialization_benchmark.py --rows 50000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert
+from app import create_app, db
+from app.models import Organization, Employee
+from app.models.attendance import Attendance
+from app.utils import serializers
+from app.utils.serializers import EMPLOYEE_SERIALIZER, ATTENDANCE_SERIALIZER
+
+def seed(rows):
+    org = Organization(name='Bench', slug='bench', email='bench@example.com')
+    db.session.add(org)
+    db.session.flush()
+
+    today = date.today()
+    db.session.execute(insert(Employee), [
+        {'organization_id': org.id, 'employee_id': f'E{i:06d}', 'email': f'user{i}@example.com',
+         'first_name': 'First', 'last_name': f'Last{i}', 'hire_date': today - timedelta(days=i % 3650),
+         'position': 'Engineer', 'salary': 50000 + i, 'status': 'active', 'role': 'employee',
+         'created_at': datetime.utcnow()}
+        for i in range(rows)
+    ])
+    now = datetime.utcnow()
+    db.session.execute(insert(Attendance), [
+        {'employee_id': i + 1, 'date': today, 'check_in': now, 'check_out': now + timedelta(hours=8),
+         'status': 'present', 'created_at': now}
+        for i in range(rows)
+    ])
+    db.session.commit()
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    stdlib_json = DefaultJSONProvider(app)
+
+    with app.app_context():
+        db.create_all()
+        seed(args.rows)
+
+        cases = [
+            ('employees', Employee, [Employee.id], EMPLOYEE_SERIALIZER),
+            ('attendance', Attendance, [Attendance.date.desc(), Attendance.id.desc()], ATTENDANCE_SERIALIZER),
+        ]
+        print(f"rows={args.rows} json_backend={'orjson' if serializers.orjson else 'stdlib'}")
+        for name, model, order, serializer in cases:
+            legacy = best_of(lambda: stdlib_json.response(
+                [obj.to_dict() for obj in model.query.order_by(*order).all()]
+            ), args.repeat)
+            fast = best_of(lambda: app.json.response(
+                serializer.dump(serializer.select(model.query).order_by(*order).all())
+            ), args.repeat)
+            print(f"{name:<12} to_dict: {legacy * 1000:8.1f} ms   columnar: {fast * 1000:8.1f} ms   "
+                  f"speedup: {legacy / fast:4.1f}x")
+
+if __name__ == '__main__':
+    main()
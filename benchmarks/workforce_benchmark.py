@@ -0,0 +1,88 @@
+"""
+Time the compensation report computed from the workforce column arrays.
+
+Seeds an in-memory SQLite database with one organization and reports the
+load (single query) and compute times with NumPy, when it is installed, and
+with the pure-Python fallback.
+
+    python benchmarks/workforce_benchmark.py --rows 50000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert
+from app import create_app, db
+from app.models import Organization, Employee, Department
+from app.utils import workforce
+
+POSITIONS = ['Engineer', 'Analyst', 'Manager', 'Designer', 'Support Specialist', 'Sales Representative']
+
+def seed(rows):
+    org = Organization(name='Bench', slug='bench', email='bench@example.com')
+    db.session.add(org)
+    db.session.flush()
+    departments = [Department(name=f'Dept {i}', organization_id=org.id) for i in range(12)]
+    db.session.add_all(departments)
+    db.session.flush()
+    
+    today = date.today()
+    now = datetime.utcnow()
+    db.session.execute(insert(Employee), [
+        {'organization_id': org.id, 'employee_id': f'E{i:06d}', 'email': f'user{i}@example.com',
+         'first_name': 'First', 'last_name': f'Last{i}', 'hire_date': today - timedelta(days=i % 3650),
+         'position': POSITIONS[i % len(POSITIONS)], 'department_id': departments[i % len(departments)].id,
+         'salary': 40000 + (i * 7919) % 110000, 'status': 'active' if i % 20 else 'terminated',
+         'role': 'employee', 'created_at': now, 'updated_at': now,
+         'terminated_at': None if i % 20 else now - timedelta(days=i % 365)}
+        for i in range(rows)
+    ])
+    db.session.commit()
+    return org.id
+
+def report(data):
+    workforce.salary_bands(data)
+    workforce.department_summary(data)
+    workforce.percentiles(data.salary)
+    workforce.tenure_summary(data)
+    workforce.turnover_rate(data, date.today() - timedelta(days=30), date.today())
+    workforce.pay_equity(data)
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        organization_id = seed(args.rows)
+        
+        numpy_module = workforce.np
+        backends = [('numpy', numpy_module)] if numpy_module is not None else []
+        backends.append(('python', None))
+        
+        print(f"rows={args.rows}")
+        for name, module in backends:
+            workforce.np = module
+            load = best_of(lambda: workforce.load_workforce(organization_id), args.repeat)
+            data = workforce.load_workforce(organization_id)
+            compute = best_of(lambda: report(data), args.repeat)
+            print(f"{name:<8} load: {load * 1000:8.1f} ms   compute: {compute * 1000:8.1f} ms")
+        workforce.np = numpy_module
+
+if __name__ == '__main__':
+    main()
@@ -3,15 +3,152 @@ from datetime import timedelta
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
+# Named database deployment profiles, selected with DB_PROFILE or
+# create_app(db_profile=...). engine_options are passed to create_engine,
+# sqlite_pragmas run on every new SQLite connection and statement_timeout_ms
+# is enforced server-side on PostgreSQL.
+DATABASE_PROFILES = {
+    # Local development: defaults plus a busy timeout so the reloader and a
+    # shell can share the file
+    'sqlite-dev': {
+        'engine_options': {},
+        'sqlite_pragmas': {
+            'busy_timeout': 5000,
+        },
+    },
+    # Single-node production on SQLite: WAL lets readers run alongside the
+    # writer, synchronous=NORMAL is durable in WAL mode, mmap avoids
+    # read() copies for hot pages
+    'sqlite-wal-single-node': {
+        'engine_options': {
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 8)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 8)),
+            'pool_timeout': 30,
+        },
+        'sqlite_pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,
+            'mmap_size': 268435456,
+            'cache_size': -20000,
+            'temp_store': 'MEMORY',
+        },
+    },
+    # PostgreSQL with the application holding its own connection pool
+    'postgres-pooled': {
+        'engine_options': {
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+            'pool_timeout': 30,
+            'pool_recycle': 1800,
+            'pool_pre_ping': True,
+        },
+        'statement_timeout_ms': int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000)),
+        'idle_in_transaction_timeout_ms': 60000,
+    },
+    # PostgreSQL behind PgBouncer in transaction mode: PgBouncer owns the
+    # pool, so no connections are held here, and session-level settings are
+    # applied per transaction because server connections are shared
+    'postgres-pgbouncer': {
+        'engine_options': {
+            'poolclass': 'null',
+            'pool_pre_ping': False,
+        },
+        'statement_timeout_ms': int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000)),
+        'per_transaction_settings': True,
+    },
+}
+
 class Config:
     """Base configuration"""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, '..', 'instance', 'hr_management.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Database deployment profile (see DATABASE_PROFILES); inferred from the
+    # database URL when unset
+    DB_PROFILE = os.environ.get('DB_PROFILE')
+    
+    # Optional read replicas (comma-separated URLs). Reads from GET views and
+    # views marked @read_only go to a replica lagging less than the limit
+    SQLALCHEMY_REPLICA_URIS = [
+        uri.strip() for uri in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if uri.strip()
+    ]
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 5))
+    REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get('REPLICA_LAG_CHECK_INTERVAL', 10))
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    
+    # Compiled RBAC permission cache (per process)
+    PERMISSION_CACHE_SIZE = int(os.environ.get('PERMISSION_CACHE_SIZE', 4096))
+    PERMISSION_CACHE_TTL = int(os.environ.get('PERMISSION_CACHE_TTL', 300))
+    PERMISSION_VERSION_TTL = int(os.environ.get('PERMISSION_VERSION_TTL', 30))
+    
+    # Keyset pagination for list endpoints (?all=true returns every row)
+    PAGINATION_DEFAULT_LIMIT = int(os.environ.get('PAGINATION_DEFAULT_LIMIT', 100))
+    PAGINATION_MAX_LIMIT = int(os.environ.get('PAGINATION_MAX_LIMIT', 1000))
+    
+    # Department listings with head counts (per process)
+    DEPARTMENT_CACHE_SIZE = int(os.environ.get('DEPARTMENT_CACHE_SIZE', 1024))
+    DEPARTMENT_CACHE_TTL = int(os.environ.get('DEPARTMENT_CACHE_TTL', 60))
+    
+    # Analytics: current-month metrics expire after ANALYTICS_CACHE_TTL,
+    # closed months after ANALYTICS_HISTORY_TTL; the persisted per-organization
+    # version that backdated writes bump is re-read every ANALYTICS_VERSION_TTL
+    ANALYTICS_CACHE_SIZE = int(os.environ.get('ANALYTICS_CACHE_SIZE', 4096))
+    ANALYTICS_CACHE_TTL = int(os.environ.get('ANALYTICS_CACHE_TTL', 300))
+    ANALYTICS_HISTORY_TTL = int(os.environ.get('ANALYTICS_HISTORY_TTL', 86400))
+    ANALYTICS_VERSION_TTL = int(os.environ.get('ANALYTICS_VERSION_TTL', 30))
+    
+    # Daily fact rollups (`flask rollups run`): days rebuilt per transaction
+    # and how far back the first run starts
+    ROLLUP_CHUNK_DAYS = int(os.environ.get('ROLLUP_CHUNK_DAYS', 31))
+    ROLLUP_BACKFILL_DAYS = int(os.environ.get('ROLLUP_BACKFILL_DAYS', 400))
+    
+    # Payroll runs (POST /api/payroll/runs, `flask payroll close`): allowance
+    # as a fraction of basic pay and rows per multi-row INSERT. Each run
+    # commits PAYROLL_RUN_CHUNK_SIZE employees at a time and resumes after the
+    # last committed chunk. `flask payroll close` splits each chunk into shards
+    # of at most PAYROLL_SHARD_SIZE (and at most chunk / workers) employees
+    # across one pool of PAYROLL_WORKERS processes per run (1 computes in the
+    # calling process); the HTTP endpoint always computes in-process. A
+    # running run holds a lease renewed by every chunk; another worker only
+    # takes it over after PAYROLL_RUN_LEASE_SECONDS without progress, so keep
+    # it well above the time one chunk takes
+    PAYROLL_ALLOWANCE_RATE = float(os.environ.get('PAYROLL_ALLOWANCE_RATE', 0.0))
+    PAYROLL_RUN_BATCH_SIZE = int(os.environ.get('PAYROLL_RUN_BATCH_SIZE', 500))
+    PAYROLL_WORKERS = int(os.environ.get('PAYROLL_WORKERS', 1))
+    PAYROLL_SHARD_SIZE = int(os.environ.get('PAYROLL_SHARD_SIZE', 5000))
+    PAYROLL_RUN_CHUNK_SIZE = int(os.environ.get('PAYROLL_RUN_CHUNK_SIZE', 2000))
+    PAYROLL_RUN_LEASE_SECONDS = int(os.environ.get('PAYROLL_RUN_LEASE_SECONDS', 600))
+    
+    # Optional write-behind clock ingestion: check-in/out events are fsynced
+    # to a per-process journal under CLOCK_JOURNAL_DIR (default
+    # instance/clock-journal), acknowledged with 202 and group-committed into
+    # attendances every CLOCK_JOURNAL_FLUSH_INTERVAL_MS
+    CLOCK_JOURNAL_ENABLED = os.environ.get('CLOCK_JOURNAL_ENABLED', 'false').lower() == 'true'
+    CLOCK_JOURNAL_DIR = os.environ.get('CLOCK_JOURNAL_DIR')
+    CLOCK_JOURNAL_FLUSH_INTERVAL_MS = int(os.environ.get('CLOCK_JOURNAL_FLUSH_INTERVAL_MS', 200))
+    CLOCK_JOURNAL_BATCH_SIZE = int(os.environ.get('CLOCK_JOURNAL_BATCH_SIZE', 1000))
+    
+    # Rows fetched per round trip by streaming exports
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+    
+    # Decoded organization settings snapshots (per process)
+    SETTINGS_CACHE_SIZE = int(os.environ.get('SETTINGS_CACHE_SIZE', 1024))
+    SETTINGS_CACHE_TTL = int(os.environ.get('SETTINGS_CACHE_TTL', 60))
+    
+    # Embed organization, role ids and a permission-version stamp in access
+    # tokens so authorization can skip the per-request employee lookup
+    JWT_EMBED_CLAIMS = os.environ.get('JWT_EMBED_CLAIMS', 'false').lower() == 'true'
+    
+    # Audit events are buffered and bulk-inserted by a background thread
+    AUDIT_ASYNC = os.environ.get('AUDIT_ASYNC', 'true').lower() == 'true'
+    AUDIT_QUEUE_SIZE = int(os.environ.get('AUDIT_QUEUE_SIZE', 10000))
+    AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', 500))
+    AUDIT_FLUSH_INTERVAL = float(os.environ.get('AUDIT_FLUSH_INTERVAL', 1.0))
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -25,6 +162,10 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    DB_PROFILE = 'sqlite-dev'
+    SQLALCHEMY_REPLICA_URIS = []
+    AUDIT_ASYNC = False
+    CLOCK_JOURNAL_ENABLED = False
 
 config = {
     'development': DevelopmentConfig,
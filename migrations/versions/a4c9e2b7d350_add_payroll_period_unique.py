@@ -0,0 +1,33 @@
+"""Add unique payroll period constraint
+
+Revision ID: a4c9e2b7d350
+Revises: f5b2d8e4a617
+Create Date: 2025-10-12 14:05:41.273918
+
+Replaces the (employee_id, year, month) index on payrolls with a unique
+constraint so payroll runs can insert with ON CONFLICT DO NOTHING.
+Duplicate payrolls for the same employee and period must be removed
+before upgrading or the constraint cannot be created.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c9e2b7d350'
+down_revision = 'f5b2d8e4a617'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('payrolls', schema=None) as batch_op:
+        batch_op.drop_index('ix_payrolls_employee_period')
+        batch_op.create_unique_constraint('uq_payrolls_employee_period', ['employee_id', 'year', 'month'])
+
+
+def downgrade():
+    with op.batch_alter_table('payrolls', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_payrolls_employee_period', type_='unique')
+        batch_op.create_index('ix_payrolls_employee_period', ['employee_id', 'year', 'month'], unique=False)
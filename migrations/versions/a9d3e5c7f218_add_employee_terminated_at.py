@@ -0,0 +1,43 @@
+"""Add employee terminated_at
+
+Revision ID: a9d3e5c7f218
+Revises: f1b7d4a9c362
+Create Date: 2025-10-17 10:42:18.306157
+
+Records when an employee's status became inactive or terminated so
+turnover no longer reads the exit date from updated_at, which any later
+edit moves. Existing leavers are backfilled from updated_at, the best
+date available for them.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d3e5c7f218'
+down_revision = 'f1b7d4a9c362'
+branch_labels = None
+depends_on = None
+
+
+employees = sa.table(
+    'employees',
+    sa.column('status', sa.String),
+    sa.column('updated_at', sa.DateTime),
+    sa.column('terminated_at', sa.DateTime)
+)
+
+
+def upgrade():
+    with op.batch_alter_table('employees', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('terminated_at', sa.DateTime(), nullable=True))
+
+    op.execute(employees.update().where(
+        employees.c.status.in_(['inactive', 'terminated'])
+    ).values(terminated_at=employees.c.updated_at))
+
+
+def downgrade():
+    with op.batch_alter_table('employees', schema=None) as batch_op:
+        batch_op.drop_column('terminated_at')
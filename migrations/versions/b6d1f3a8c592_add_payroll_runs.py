@@ -0,0 +1,51 @@
+"""Add payroll runs
+
+Revision ID: b6d1f3a8c592
+Revises: a4c9e2b7d350
+Create Date: 2025-10-13 10:48:22.615037
+
+Checkpoint table for chunked payroll runs (POST /api/payroll/runs and
+`flask payroll close`).
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6d1f3a8c592'
+down_revision = 'a4c9e2b7d350'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('payroll_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=True),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('chunk_size', sa.Integer(), nullable=False),
+    sa.Column('last_employee_id', sa.Integer(), nullable=True),
+    sa.Column('chunks_completed', sa.Integer(), nullable=False),
+    sa.Column('employees', sa.Integer(), nullable=False),
+    sa.Column('created', sa.Integer(), nullable=False),
+    sa.Column('skipped', sa.Integer(), nullable=False),
+    sa.Column('total_basic', sa.Float(), nullable=False),
+    sa.Column('total_allowances', sa.Float(), nullable=False),
+    sa.Column('total_deductions', sa.Float(), nullable=False),
+    sa.Column('total_net', sa.Float(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('organization_id', 'year', 'month', name='uq_payroll_runs_org_period')
+    )
+
+
+def downgrade():
+    op.drop_table('payroll_runs')
@@ -0,0 +1,26 @@
+"""Add organization permission version
+
+Revision ID: b7c3d1e5f2a4
+Revises: 9a5f465dab45
+Create Date: 2025-10-06 09:12:31.418220
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7c3d1e5f2a4'
+down_revision = '9a5f465dab45'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('organizations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('permission_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('organizations', schema=None) as batch_op:
+        batch_op.drop_column('permission_version')
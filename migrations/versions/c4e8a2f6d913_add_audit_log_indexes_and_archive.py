@@ -0,0 +1,57 @@
+"""Add audit log indexes and archive table
+
+Revision ID: c4e8a2f6d913
+Revises: b7c3d1e5f2a4
+Create Date: 2025-10-08 14:27:05.902117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e8a2f6d913'
+down_revision = 'b7c3d1e5f2a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('audit_logs', schema=None) as batch_op:
+        batch_op.create_index('ix_audit_logs_org_timestamp', ['organization_id', 'timestamp', 'id'], unique=False)
+        batch_op.create_index('ix_audit_logs_org_resource', ['organization_id', 'resource_type', 'resource_id'], unique=False)
+        batch_op.create_index('ix_audit_logs_org_user_timestamp', ['organization_id', 'user_id', 'timestamp'], unique=False)
+
+    op.create_table('audit_logs_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('action', sa.String(length=100), nullable=False),
+    sa.Column('resource_type', sa.String(length=50), nullable=False),
+    sa.Column('resource_id', sa.Integer(), nullable=True),
+    sa.Column('old_values', sa.Text(), nullable=True),
+    sa.Column('new_values', sa.Text(), nullable=True),
+    sa.Column('ip_address', sa.String(length=45), nullable=True),
+    sa.Column('user_agent', sa.Text(), nullable=True),
+    sa.Column('timestamp', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['employees.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('audit_logs_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_audit_logs_archive_org_timestamp', ['organization_id', 'timestamp', 'id'], unique=False)
+        batch_op.create_index('ix_audit_logs_archive_org_resource', ['organization_id', 'resource_type', 'resource_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('audit_logs_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_audit_logs_archive_org_resource')
+        batch_op.drop_index('ix_audit_logs_archive_org_timestamp')
+
+    op.drop_table('audit_logs_archive')
+
+    with op.batch_alter_table('audit_logs', schema=None) as batch_op:
+        batch_op.drop_index('ix_audit_logs_org_user_timestamp')
+        batch_op.drop_index('ix_audit_logs_org_resource')
+        batch_op.drop_index('ix_audit_logs_org_timestamp')
@@ -0,0 +1,31 @@
+"""Add attendance idempotency keys
+
+Revision ID: c8e2a4f6b713
+Revises: b6d1f3a8c592
+Create Date: 2025-10-14 08:55:09.382146
+
+Stores the Idempotency-Key of the clock-in/out request that set each
+attendance's check_in and check_out, so client retries are replayed.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e2a4f6b713'
+down_revision = 'b6d1f3a8c592'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('attendances', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('check_in_key', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('check_out_key', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('attendances', schema=None) as batch_op:
+        batch_op.drop_column('check_out_key')
+        batch_op.drop_column('check_in_key')
@@ -0,0 +1,60 @@
+"""Add payroll run scope key and lease
+
+Revision ID: d2f6b9c4e815
+Revises: c8e2a4f6b713
+Create Date: 2025-10-15 10:21:37.504812
+
+Replaces the (organization_id, year, month) unique constraint on
+payroll_runs, which let duplicate all-organization runs through because
+organization_id is NULL for them, with one on scope_key (the organization
+id, or 0 for the all-organization run). Duplicate all-organization runs
+are collapsed to the latest one. Adds lease_expires_at so a running run
+is only taken over once its worker stops renewing the lease.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f6b9c4e815'
+down_revision = 'c8e2a4f6b713'
+branch_labels = None
+depends_on = None
+
+
+payroll_runs = sa.table(
+    'payroll_runs',
+    sa.column('id', sa.Integer),
+    sa.column('organization_id', sa.Integer),
+    sa.column('scope_key', sa.Integer),
+    sa.column('year', sa.Integer),
+    sa.column('month', sa.Integer)
+)
+
+
+def upgrade():
+    with op.batch_alter_table('payroll_runs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('scope_key', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+
+    op.execute(payroll_runs.update().values(scope_key=sa.func.coalesce(payroll_runs.c.organization_id, 0)))
+    latest = sa.select(sa.func.max(payroll_runs.c.id)).where(
+        payroll_runs.c.organization_id.is_(None)
+    ).group_by(payroll_runs.c.year, payroll_runs.c.month)
+    op.execute(payroll_runs.delete().where(
+        payroll_runs.c.organization_id.is_(None), payroll_runs.c.id.not_in(latest)
+    ))
+
+    with op.batch_alter_table('payroll_runs', schema=None) as batch_op:
+        batch_op.alter_column('scope_key', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_constraint('uq_payroll_runs_org_period', type_='unique')
+        batch_op.create_unique_constraint('uq_payroll_runs_scope_period', ['scope_key', 'year', 'month'])
+
+
+def downgrade():
+    with op.batch_alter_table('payroll_runs', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_payroll_runs_scope_period', type_='unique')
+        batch_op.create_unique_constraint('uq_payroll_runs_org_period', ['organization_id', 'year', 'month'])
+        batch_op.drop_column('lease_expires_at')
+        batch_op.drop_column('scope_key')
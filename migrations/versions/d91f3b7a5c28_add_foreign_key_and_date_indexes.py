@@ -0,0 +1,77 @@
+"""Add foreign key and date indexes
+
+Revision ID: d91f3b7a5c28
+Revises: c4e8a2f6d913
+Create Date: 2025-10-09 10:41:53.660214
+
+Adds composite indexes matching the filter/order patterns of the list and
+report endpoints, and a unique (employee_id, date) constraint on
+attendances. Duplicate attendance rows for the same employee and day must
+be merged before upgrading or the constraint cannot be created.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd91f3b7a5c28'
+down_revision = 'c4e8a2f6d913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('attendances', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_attendance_employee_date', ['employee_id', 'date'])
+        batch_op.create_index('ix_attendances_date', ['date'], unique=False)
+
+    with op.batch_alter_table('leaves', schema=None) as batch_op:
+        batch_op.create_index('ix_leaves_employee_created', ['employee_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_leaves_status_created', ['status', 'created_at'], unique=False)
+
+    with op.batch_alter_table('payrolls', schema=None) as batch_op:
+        batch_op.create_index('ix_payrolls_employee_period', ['employee_id', 'year', 'month'], unique=False)
+        batch_op.create_index('ix_payrolls_period', ['year', 'month'], unique=False)
+
+    with op.batch_alter_table('employees', schema=None) as batch_op:
+        batch_op.create_index('ix_employees_org_status', ['organization_id', 'status'], unique=False)
+        batch_op.create_index('ix_employees_department_status', ['department_id', 'status'], unique=False)
+
+    with op.batch_alter_table('employee_roles', schema=None) as batch_op:
+        batch_op.create_index('ix_employee_roles_role', ['role_id'], unique=False)
+
+    with op.batch_alter_table('usage_logs', schema=None) as batch_op:
+        batch_op.create_index('ix_usage_logs_org_recorded', ['organization_id', 'recorded_date'], unique=False)
+        batch_op.create_index('ix_usage_logs_org_created', ['organization_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('invoices', schema=None) as batch_op:
+        batch_op.create_index('ix_invoices_status_paid_at', ['status', 'paid_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('invoices', schema=None) as batch_op:
+        batch_op.drop_index('ix_invoices_status_paid_at')
+
+    with op.batch_alter_table('usage_logs', schema=None) as batch_op:
+        batch_op.drop_index('ix_usage_logs_org_created')
+        batch_op.drop_index('ix_usage_logs_org_recorded')
+
+    with op.batch_alter_table('employee_roles', schema=None) as batch_op:
+        batch_op.drop_index('ix_employee_roles_role')
+
+    with op.batch_alter_table('employees', schema=None) as batch_op:
+        batch_op.drop_index('ix_employees_department_status')
+        batch_op.drop_index('ix_employees_org_status')
+
+    with op.batch_alter_table('payrolls', schema=None) as batch_op:
+        batch_op.drop_index('ix_payrolls_period')
+        batch_op.drop_index('ix_payrolls_employee_period')
+
+    with op.batch_alter_table('leaves', schema=None) as batch_op:
+        batch_op.drop_index('ix_leaves_status_created')
+        batch_op.drop_index('ix_leaves_employee_created')
+
+    with op.batch_alter_table('attendances', schema=None) as batch_op:
+        batch_op.drop_index('ix_attendances_date')
+        batch_op.drop_constraint('uq_attendance_employee_date', type_='unique')
@@ -0,0 +1,39 @@
+"""Add organization counters
+
+Revision ID: e3a7c5d1f804
+Revises: d91f3b7a5c28
+Create Date: 2025-10-10 09:12:37.418522
+
+Materialized per-organization dashboard counters. Rows are created on
+first use; run `flask counters reconcile` after upgrading to backfill
+every organization at once.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a7c5d1f804'
+down_revision = 'd91f3b7a5c28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('organization_counters',
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('active_employees', sa.Integer(), nullable=False),
+    sa.Column('departments', sa.Integer(), nullable=False),
+    sa.Column('pending_leaves', sa.Integer(), nullable=False),
+    sa.Column('present_today', sa.Integer(), nullable=False),
+    sa.Column('present_date', sa.Date(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('reconciled_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('organization_id')
+    )
+
+
+def downgrade():
+    op.drop_table('organization_counters')
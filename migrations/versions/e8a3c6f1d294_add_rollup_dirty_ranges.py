@@ -0,0 +1,34 @@
+"""Add rollup dirty ranges
+
+Revision ID: e8a3c6f1d294
+Revises: d2f6b9c4e815
+Create Date: 2025-10-15 16:42:08.117390
+
+Backdated writes record the first stale day per organization in
+rollup_dirty_ranges instead of rewinding the shared rollup watermark for
+every organization.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8a3c6f1d294'
+down_revision = 'd2f6b9c4e815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('rollup_dirty_ranges',
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('since', sa.Date(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('organization_id')
+    )
+
+
+def downgrade():
+    op.drop_table('rollup_dirty_ranges')
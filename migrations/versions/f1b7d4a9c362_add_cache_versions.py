@@ -0,0 +1,33 @@
+"""Add cache versions
+
+Revision ID: f1b7d4a9c362
+Revises: e8a3c6f1d294
+Create Date: 2025-10-16 09:13:52.640281
+
+Persisted version counters for process-local caches of global data. The
+permission matrix row is seeded so role changes only ever update it.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b7d4a9c362'
+down_revision = 'e8a3c6f1d294'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    cache_versions = op.create_table('cache_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(cache_versions, [{'name': 'permission_matrix', 'version': 0}])
+
+
+def downgrade():
+    op.drop_table('cache_versions')
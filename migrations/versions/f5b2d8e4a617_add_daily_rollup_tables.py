@@ -0,0 +1,77 @@
+"""Add daily rollup tables
+
+Revision ID: f5b2d8e4a617
+Revises: e3a7c5d1f804
+Create Date: 2025-10-11 08:27:14.902311
+
+Fact tables for the analytics rollup job. They start empty; run
+`flask rollups run` after upgrading to backfill ROLLUP_BACKFILL_DAYS.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5b2d8e4a617'
+down_revision = 'e3a7c5d1f804'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_workforce_facts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('department_id', sa.Integer(), nullable=True),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('headcount', sa.Integer(), nullable=False),
+    sa.Column('attendance_records', sa.Integer(), nullable=False),
+    sa.Column('present', sa.Integer(), nullable=False),
+    sa.Column('late', sa.Integer(), nullable=False),
+    sa.Column('half_day', sa.Integer(), nullable=False),
+    sa.Column('absent', sa.Integer(), nullable=False),
+    sa.Column('payroll_total', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['department_id'], ['departments.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('daily_workforce_facts', schema=None) as batch_op:
+        batch_op.create_index('ix_daily_workforce_facts_org_day', ['organization_id', 'day'], unique=False)
+        batch_op.create_index('ix_daily_workforce_facts_day', ['day'], unique=False)
+
+    op.create_table('daily_leave_facts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('department_id', sa.Integer(), nullable=True),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('leave_type', sa.String(length=50), nullable=False),
+    sa.Column('leave_days', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['department_id'], ['departments.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('daily_leave_facts', schema=None) as batch_op:
+        batch_op.create_index('ix_daily_leave_facts_org_day', ['organization_id', 'day'], unique=False)
+        batch_op.create_index('ix_daily_leave_facts_day', ['day'], unique=False)
+
+    op.create_table('rollup_watermarks',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('watermark', sa.Date(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('rollup_watermarks')
+    with op.batch_alter_table('daily_leave_facts', schema=None) as batch_op:
+        batch_op.drop_index('ix_daily_leave_facts_day')
+        batch_op.drop_index('ix_daily_leave_facts_org_day')
+
+    op.drop_table('daily_leave_facts')
+    with op.batch_alter_table('daily_workforce_facts', schema=None) as batch_op:
+        batch_op.drop_index('ix_daily_workforce_facts_day')
+        batch_op.drop_index('ix_daily_workforce_facts_org_day')
+
+    op.drop_table('daily_workforce_facts')
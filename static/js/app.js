@@ -1,4 +1,8 @@
 // HR Management System Frontend
+
+// Upper bound on employees offered in a select; larger organizations narrow it with search
+const EMPLOYEE_OPTIONS_LIMIT = 200;
+
 class HRApp {
     constructor() {
         this.baseURL = 'http://127.0.0.1:5000';
@@ -172,24 +176,62 @@ class HRApp {
         return fetch(`${this.baseURL}${endpoint}`, config);
     }
 
+    // List endpoints return one keyset page at a time; X-Next-Cursor points at the next page
+    async fetchPage(endpoint, cursor = null) {
+        const separator = endpoint.includes('?') ? '&' : '?';
+        const url = cursor ? `${endpoint}${separator}cursor=${encodeURIComponent(cursor)}` : endpoint;
+        const response = await this.apiCall(url);
+        if (!response.ok) {
+            throw new Error(`Request to ${endpoint} failed with status ${response.status}`);
+        }
+        return { items: await response.json(), nextCursor: response.headers.get('X-Next-Cursor') };
+    }
+
+    // Render the first page of a list; a "Load more" button under the table fetches the next one
+    async loadPagedList(endpoint, tbodyId, render) {
+        const button = this.loadMoreButton(tbodyId);
+        let items = [];
+        let cursor = null;
+        const loadNext = async () => {
+            button.disabled = true;
+            try {
+                const page = await this.fetchPage(endpoint, cursor);
+                items = items.concat(page.items);
+                cursor = page.nextCursor;
+                render(items);
+            } finally {
+                button.disabled = false;
+                button.style.display = cursor ? '' : 'none';
+            }
+        };
+        button.onclick = () => loadNext().catch(error => console.error(`Error loading ${endpoint}:`, error));
+        await loadNext();
+    }
+
+    loadMoreButton(tbodyId) {
+        const table = document.getElementById(tbodyId).closest('table');
+        let button = table.parentNode.querySelector('.load-more');
+        if (!button) {
+            button = document.createElement('button');
+            button.className = 'action-btn btn-secondary load-more';
+            button.innerHTML = '<i class="fas fa-chevron-down"></i> Load more';
+            table.after(button);
+        }
+        return button;
+    }
+
     // Data Loading Methods
     async loadDashboardData() {
         try {
-            // Load dashboard statistics
-            const employeesResponse = await this.apiCall('/api/employees');
-            const leavesResponse = await this.apiCall('/api/leaves');
+            // Counts come from the organization's maintained counters, not from listing rows
+            const statsResponse = await this.apiCall('/api/employees/dashboard-stats');
             const jobsResponse = await this.apiCall('/api/recruitment/jobs');
-            const attendanceResponse = await this.apiCall('/api/attendance');
-
-            if (employeesResponse.ok) {
-                const employees = await employeesResponse.json();
-                document.getElementById('totalEmployees').textContent = employees.length;
-            }
 
-            if (leavesResponse.ok) {
-                const leaves = await leavesResponse.json();
-                const pendingLeaves = leaves.filter(leave => leave.status === 'pending');
-                document.getElementById('pendingLeaves').textContent = pendingLeaves.length;
+            if (statsResponse.ok) {
+                const stats = await statsResponse.json();
+                document.getElementById('totalEmployees').textContent = stats.employee_count;
+                document.getElementById('pendingLeaves').textContent = stats.pending_leaves;
+                document.getElementById('presentToday').textContent = stats.attendance_today;
             }
 
             if (jobsResponse.ok) {
@@ -197,12 +239,6 @@ class HRApp {
                 const openJobs = jobs.filter(job => job.status === 'open');
                 document.getElementById('openJobs').textContent = openJobs.length;
             }
-
-            if (attendanceResponse.ok) {
-                const attendance = await attendanceResponse.json();
-                // Calculate present today (this would need more logic for real implementation)
-                document.getElementById('presentToday').textContent = attendance.length;
-            }
         } catch (error) {
             console.error('Error loading dashboard data:', error);
         }
@@ -499,13 +535,8 @@ class HRApp {
 
     async loadEmployees() {
         try {
-            const response = await this.apiCall('/api/employees');
-            if (response.ok) {
-                const employees = await response.json();
-                this.renderEmployeesTable(employees);
-            } else {
-                console.error('Failed to load employees');
-            }
+            await this.loadPagedList('/api/employees', 'employeesTableBody',
+                employees => this.renderEmployeesTable(employees));
         } catch (error) {
             console.error('Error loading employees:', error);
         }
@@ -513,11 +544,8 @@ class HRApp {
 
     async loadAttendance() {
         try {
-            const response = await this.apiCall('/api/attendance');
-            if (response.ok) {
-                const attendance = await response.json();
-                this.renderAttendanceTable(attendance);
-            }
+            await this.loadPagedList('/api/attendance', 'attendanceTableBody',
+                attendance => this.renderAttendanceTable(attendance));
         } catch (error) {
             console.error('Error loading attendance:', error);
         }
@@ -525,11 +553,8 @@ class HRApp {
 
     async loadLeaves() {
         try {
-            const response = await this.apiCall('/api/leaves');
-            if (response.ok) {
-                const leaves = await response.json();
-                this.renderLeavesTable(leaves);
-            }
+            await this.loadPagedList('/api/leaves', 'leavesTableBody',
+                leaves => this.renderLeavesTable(leaves));
         } catch (error) {
             console.error('Error loading leaves:', error);
         }
@@ -537,11 +562,8 @@ class HRApp {
 
     async loadPayroll() {
         try {
-            const response = await this.apiCall('/api/payroll');
-            if (response.ok) {
-                const payroll = await response.json();
-                this.renderPayrollTable(payroll);
-            }
+            await this.loadPagedList('/api/payroll', 'payrollTableBody',
+                payroll => this.renderPayrollTable(payroll));
         } catch (error) {
             console.error('Error loading payroll:', error);
         }
@@ -555,11 +577,8 @@ class HRApp {
                 this.renderJobsTable(jobs);
             }
             
-            const applicantsResponse = await this.apiCall('/api/recruitment/applicants');
-            if (applicantsResponse.ok) {
-                const applicants = await applicantsResponse.json();
-                this.renderApplicantsTable(applicants);
-            }
+            await this.loadPagedList('/api/recruitment/applicants', 'applicantsTableBody',
+                applicants => this.renderApplicantsTable(applicants));
         } catch (error) {
             console.error('Error loading recruitment data:', error);
         }
@@ -567,11 +586,8 @@ class HRApp {
 
     async loadPerformance() {
         try {
-            const response = await this.apiCall('/api/performance');
-            if (response.ok) {
-                const reviews = await response.json();
-                this.renderPerformanceTable(reviews);
-            }
+            await this.loadPagedList('/api/performance', 'performanceTableBody',
+                reviews => this.renderPerformanceTable(reviews));
         } catch (error) {
             console.error('Error loading performance data:', error);
         }
@@ -894,9 +910,16 @@ class HRApp {
     }
 
     // Utility Methods
-    async loadEmployeeOptionsForSelect(selectId) {
+    // Options are one bounded page of active employees; pass search to narrow a large organization
+    async loadEmployeeOptionsForSelect(selectId, search = '') {
         try {
-            const response = await fetch(`${this.baseURL}/api/employees`, {
+            const params = new URLSearchParams({
+                status: 'active', fields: 'id,first_name,last_name', limit: EMPLOYEE_OPTIONS_LIMIT
+            });
+            if (search) {
+                params.append('search', search);
+            }
+            const response = await fetch(`${this.baseURL}/api/employees?${params}`, {
                 headers: this.getHeaders()
             });
             
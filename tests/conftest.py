@@ -67,3 +67,72 @@ def auth_headers(client, sample_employee):
     })
     data = response.get_json()
     return {'Authorization': f"Bearer {data['access_token']}"}
+
+@pytest.fixture
+def organization(app):
+    """Create a sample organization"""
+    from app.models import Organization
+    with app.app_context():
+        org = Organization(name='Acme', slug='acme', email='admin@acme.com',
+                           subscription_status='active')
+        db.session.add(org)
+        db.session.commit()
+        org_id = org.id
+    return org_id
+
+@pytest.fixture
+def org_employee(app, organization):
+    """Create an active employee that belongs to the sample organization"""
+    with app.app_context():
+        dept = Department(name='Engineering', organization_id=organization)
+        db.session.add(dept)
+        db.session.flush()
+        employee = Employee(
+            organization_id=organization,
+            employee_id='ACME001',
+            email='jane@acme.com',
+            first_name='Jane',
+            last_name='Roe',
+            hire_date=date.today(),
+            position='Engineer',
+            department_id=dept.id,
+            salary=60000,
+            role='admin',
+            status='active'
+        )
+        employee.set_password('password123')
+        db.session.add(employee)
+        db.session.commit()
+        emp_id = employee.id
+    return emp_id
+
+@pytest.fixture
+def org_auth_headers(client, org_employee):
+    """Authentication headers for the organization employee"""
+    response = client.post('/api/auth/login', json={
+        'email': 'jane@acme.com',
+        'password': 'password123'
+    })
+    data = response.get_json()
+    return {'Authorization': f"Bearer {data['access_token']}"}
+
+@pytest.fixture
+def grant_role(app, organization):
+    """Assign one of the organization's default roles to an employee"""
+    from app.models.rbac import Role
+    from app.utils.permissions import assign_role_to_employee, initialize_default_permissions, initialize_default_roles
+    with app.app_context():
+        initialize_default_permissions()
+        initialize_default_roles(organization)
+    
+    def grant(employee_id, name):
+        with app.app_context():
+            role = Role.query.filter_by(organization_id=organization, name=name).one()
+            assign_role_to_employee(employee_id, role.id)
+    return grant
+
+@pytest.fixture
+def org_admin(org_employee, grant_role):
+    """Grant the organization employee the default admin role"""
+    grant_role(org_employee, 'admin')
+    return org_employee
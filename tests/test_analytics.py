@@ -0,0 +1,123 @@
+import pytest
+from datetime import date, datetime, timedelta
+
+def test_analytics_computed_from_tenant_data(client, app, organization, org_employee, org_auth_headers):
+    """Analytics aggregate the caller's organization and refresh after backdated writes"""
+    today = date.today()
+    last_month = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+    
+    assert client.post('/api/attendance/check-in', headers=org_auth_headers).status_code == 201
+    assert client.post('/api/payroll', headers=org_auth_headers, json={
+        'employee_id': org_employee, 'month': today.month, 'year': today.year,
+        'basic_salary': 5000, 'net_salary': 4500
+    }).status_code == 201
+    
+    data = client.get('/api/analytics/dashboard', headers=org_auth_headers).get_json()
+    assert data['employee_metrics']['total_employees'] == 1
+    assert data['employee_metrics']['active_employees'] == 1
+    assert data['employee_metrics']['new_hires_this_month'] == 1
+    assert data['attendance_metrics']['attendance_rate'] == 100.0
+    assert data['financial_metrics']['total_payroll'] == 4500.0
+    assert data['financial_metrics']['avg_salary'] == 60000.0
+    
+    departments = client.get('/api/analytics/departments', headers=org_auth_headers).get_json()
+    assert departments['departments']['Engineering']['count'] == 1
+    
+    trends = client.get('/api/analytics/trends?period=3m', headers=org_auth_headers).get_json()
+    assert len(trends['months']) == 3
+    assert trends['employee_growth'][-1] == 1
+    assert trends['attendance_rates'][-2] == 0.0
+    
+    # A backdated absence bumps the persisted version every worker stamps its entries with
+    from app.utils.analytics import get_analytics_version, analytics_versions
+    with app.app_context():
+        before = get_analytics_version(organization)
+    assert client.post('/api/attendance', headers=org_auth_headers, json={
+        'employee_id': org_employee, 'date': last_month.isoformat(), 'status': 'absent'
+    }).status_code == 201
+    with app.app_context():
+        analytics_versions.clear()  # as another worker would after ANALYTICS_VERSION_TTL
+        assert get_analytics_version(organization) == before + 1
+    response = client.get(f"/api/analytics/dashboard?period={last_month.strftime('%Y-%m')}",
+                          headers=org_auth_headers)
+    assert response.get_json()['attendance_metrics']['attendance_rate'] == 0.0
+    
+    assert client.get('/api/analytics/dashboard?period=2025-13',
+                      headers=org_auth_headers).status_code == 400
+
+def test_daily_rollups_build_incrementally_from_watermark(client, app, organization, org_employee, org_auth_headers):
+    """Rollups cover closed days only, resume from the watermark and rebuild organizations with backdated writes"""
+    from app.models import DailyWorkforceFact, DailyLeaveFact
+    from app.utils.rollups import run_rollups, get_watermark, fresh_through, daily_attendance, leave_days_by_type
+    
+    today = date.today()
+    two_days_ago = today - timedelta(days=2)
+    for day, status in ((two_days_ago, 'late'), (today - timedelta(days=1), 'present')):
+        assert client.post('/api/attendance', headers=org_auth_headers, json={
+            'employee_id': org_employee, 'date': day.isoformat(), 'status': status
+        }).status_code == 201
+    leave = client.post('/api/leaves', headers=org_auth_headers, json={
+        'leave_type': 'sick', 'start_date': two_days_ago.isoformat(),
+        'end_date': two_days_ago.isoformat(), 'days': 1
+    }).get_json()
+    assert client.post(f"/api/leaves/{leave['id']}/approve", headers=org_auth_headers).status_code == 200
+    
+    with app.app_context():
+        days, _ = run_rollups(until=today - timedelta(days=1), backfill_days=5)
+        assert days == 5
+        assert get_watermark() == today - timedelta(days=1)
+        facts = {fact.day: fact for fact in DailyWorkforceFact.query.all()}
+        assert today not in facts
+        # Jane was hired today, so earlier days carry attendance but no head count
+        assert facts[two_days_ago].late == 1 and facts[two_days_ago].headcount == 0
+        assert DailyLeaveFact.query.one().leave_days == 1
+        
+        # Nothing new to roll up
+        assert run_rollups(until=today - timedelta(days=1)) == (0, 0)
+    
+    assert client.post('/api/attendance/check-in', headers=org_auth_headers).status_code == 201
+    with app.app_context():
+        totals = daily_attendance(organization, two_days_ago, today)
+        assert totals[two_days_ago] == (1, 1, 0, 1)
+        assert totals[today] == (1, 1, 1, 0)
+        assert leave_days_by_type(organization, two_days_ago, today) == {'sick': 1}
+    
+    # Editing a rolled-up day marks only this organization stale from that day
+    attendance_id = client.get('/api/attendance?all=true', headers=org_auth_headers).get_json()[-1]['id']
+    assert client.put(f'/api/attendance/{attendance_id}', headers=org_auth_headers,
+                      json={'status': 'absent'}).status_code == 200
+    with app.app_context():
+        assert get_watermark() == today - timedelta(days=1)
+        assert fresh_through(organization) == two_days_ago - timedelta(days=1)
+        assert daily_attendance(organization, two_days_ago, two_days_ago)[two_days_ago] == (1, 0, 0, 0)
+        assert run_rollups(until=today - timedelta(days=1))[0] == 2
+        assert fresh_through(organization) == today - timedelta(days=1)
+        assert DailyWorkforceFact.query.filter_by(day=two_days_ago).one().absent == 1
+
+def test_turnover_counts_exits_by_terminated_at(client, app, organization, org_employee, org_auth_headers):
+    """Terminating stamps terminated_at once; later edits do not move the exit month"""
+    from app import db
+    from app.models import Employee
+    from app.utils.analytics import employee_metrics
+    last_month = (date.today().replace(day=1) - timedelta(days=1)).replace(day=1)
+    with app.app_context():
+        leaver = Employee(organization_id=organization, employee_id='ACME002', email='joe@acme.com',
+                          first_name='Joe', last_name='Doe', hire_date=last_month - timedelta(days=90),
+                          position='Engineer', salary=50000, status='active')
+        db.session.add(leaver)
+        db.session.commit()
+        leaver_id = leaver.id
+    
+    assert client.put(f'/api/employees/{leaver_id}', headers=org_auth_headers,
+                      json={'status': 'terminated'}).status_code == 200
+    with app.app_context():
+        leaver = db.session.get(Employee, leaver_id)
+        assert leaver.terminated_at is not None
+        leaver.terminated_at = datetime.combine(last_month, datetime.min.time())
+        db.session.commit()
+    
+    assert client.put(f'/api/employees/{leaver_id}', headers=org_auth_headers,
+                      json={'phone': '555-0100'}).status_code == 200
+    with app.app_context():
+        assert db.session.get(Employee, leaver_id).terminated_at.date() == last_month
+        assert employee_metrics(organization, last_month.strftime('%Y-%m'))['turnover_rate'] == 50.0
@@ -0,0 +1,139 @@
+import pytest
+
+def test_check_in_once_per_day(client, org_auth_headers):
+    """The unique (employee_id, date) index rejects a second check-in"""
+    response = client.post('/api/attendance/check-in', headers=org_auth_headers)
+    assert response.status_code == 201
+    
+    response = client.post('/api/attendance/check-in', headers=org_auth_headers)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Already checked in for today'
+
+def test_attendance_list_is_keyset_paginated(client, app, org_employee, org_auth_headers):
+    """List endpoints return a bounded page plus a cursor header for the next one"""
+    from datetime import date, timedelta
+    from app import db
+    from app.models.attendance import Attendance
+    with app.app_context():
+        db.session.add_all([
+            Attendance(employee_id=org_employee, date=date(2024, 1, 1) + timedelta(days=i))
+            for i in range(3)
+        ])
+        db.session.commit()
+    
+    response = client.get('/api/attendance?limit=2', headers=org_auth_headers)
+    assert [row['date'] for row in response.get_json()] == ['2024-01-03', '2024-01-02']
+    cursor = response.headers['X-Next-Cursor']
+    assert 'rel="next"' in response.headers['Link']
+    
+    response = client.get(f'/api/attendance?limit=2&cursor={cursor}', headers=org_auth_headers)
+    assert [row['date'] for row in response.get_json()] == ['2024-01-01']
+    assert 'X-Next-Cursor' not in response.headers
+    
+    response = client.get('/api/attendance?all=true', headers=org_auth_headers)
+    assert len(response.get_json()) == 3
+
+def test_keyset_pages_walk_past_null_sort_keys(client, app, org_employee, org_auth_headers):
+    """Rows whose sort key is NULL are neither skipped nor repeated"""
+    from datetime import date
+    from app import db
+    from app.models.leave import Leave
+    with app.app_context():
+        leaves = [Leave(employee_id=org_employee, leave_type='sick', start_date=date(2024, 1, 1),
+                        end_date=date(2024, 1, 1), days=1) for _ in range(4)]
+        db.session.add_all(leaves)
+        db.session.flush()
+        Leave.query.filter(Leave.id.in_([leaves[1].id, leaves[2].id])).update(
+            {Leave.created_at: None}, synchronize_session=False
+        )
+        db.session.commit()
+        expected = sorted(leave.id for leave in leaves)
+    
+    seen = []
+    url = '/api/leaves?limit=1'
+    while url:
+        response = client.get(url, headers=org_auth_headers)
+        assert response.status_code == 200
+        seen += [row['id'] for row in response.get_json()]
+        cursor = response.headers.get('X-Next-Cursor')
+        url = f'/api/leaves?limit=1&cursor={cursor}' if cursor else None
+    assert sorted(seen) == expected and len(seen) == len(expected)
+
+def test_clock_retries_with_idempotency_key_are_replayed(client, app, organization, org_auth_headers):
+    """A resent clock request with the same Idempotency-Key returns the original record"""
+    from app.utils.counters import get_dashboard_counters
+    headers = dict(org_auth_headers, **{'Idempotency-Key': 'in-1'})
+    first = client.post('/api/attendance/check-in', headers=headers)
+    retry = client.post('/api/attendance/check-in', headers=headers)
+    assert first.status_code == retry.status_code == 201
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert retry.get_json() == first.get_json()
+    
+    other = client.post('/api/attendance/check-in', headers=dict(org_auth_headers, **{'Idempotency-Key': 'in-2'}))
+    assert other.status_code == 400
+    with app.app_context():
+        assert get_dashboard_counters(organization)['attendance_today'] == 1
+    
+    headers = dict(org_auth_headers, **{'Idempotency-Key': 'out-1'})
+    checked_out = client.post('/api/attendance/check-out', headers=headers)
+    assert checked_out.status_code == 200 and checked_out.get_json()['check_out']
+    assert client.post('/api/attendance/check-out', headers=headers).get_json() == checked_out.get_json()
+    response = client.post('/api/attendance/check-out', headers=org_auth_headers)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Already checked out for today'
+
+def test_clock_journal_group_commits_and_replays(client, app, organization, org_employee, org_auth_headers, tmp_path):
+    """Journaled clock events are acknowledged first, applied once, and orphaned journals are replayed at startup"""
+    import json
+    from datetime import date, datetime, timedelta
+    from app.models.attendance import Attendance
+    from app.utils.clock_journal import clock_journal, replay_orphaned_journals
+    from app.utils.counters import get_dashboard_counters
+    app.config.update(CLOCK_JOURNAL_ENABLED=True, CLOCK_JOURNAL_DIR=str(tmp_path),
+                      CLOCK_JOURNAL_FLUSH_INTERVAL_MS=3600000)
+    clock_journal.init_app(app)
+    try:
+        headers = dict(org_auth_headers, **{'Idempotency-Key': 'in-1'})
+        for _ in range(2):
+            assert client.post('/api/attendance/check-in', headers=headers).status_code == 202
+        assert client.post('/api/attendance/check-out', headers=org_auth_headers).status_code == 202
+        with app.app_context():
+            assert Attendance.query.count() == 0
+            assert clock_journal.flush() == 3
+            attendance = Attendance.query.one()
+            assert attendance.check_in_key == 'in-1' and attendance.check_out is not None
+            assert get_dashboard_counters(organization)['attendance_today'] == 1
+        assert (tmp_path / 'clock-0.journal').stat().st_size == 0
+        
+        # Acknowledged events that cannot apply are dead-lettered rather than dropped
+        assert client.post('/api/attendance/check-in', headers=org_auth_headers).status_code == 202
+        with app.app_context():
+            assert clock_journal.flush() == 1
+        rejected = [json.loads(line) for line in (tmp_path / 'clock-0.rejected').read_text().splitlines()]
+        assert [entry['reason'] for entry in rejected] == ['Already checked in for today']
+        
+        # A poisoned batch is applied event by event; the bad ones are quarantined and the offset moves on
+        assert client.post('/api/attendance/check-out', headers=org_auth_headers).status_code == 202
+        with open(tmp_path / 'clock-0.journal', 'ab') as handle:
+            handle.write(b'{"action":"out","employee_id":1}\nnot json\n')
+            clock_journal._end += len(b'{"action":"out","employee_id":1}\nnot json\n')
+            clock_journal._synced = clock_journal._end
+        with app.app_context():
+            assert clock_journal.flush() == 3
+            assert clock_journal.flush() == 0
+        reasons = [json.loads(line)['reason'] for line in (tmp_path / 'clock-0.rejected').read_text().splitlines()]
+        assert reasons[1:] == ['Malformed journal line', 'Already checked out for today', "Could not apply: 'at'"]
+        
+        # A journal left behind by a stopped process, ending in a torn write
+        yesterday = date.today() - timedelta(days=1)
+        event = {'action': 'in', 'employee_id': org_employee, 'organization_id': organization,
+                 'date': yesterday.isoformat(), 'at': datetime.utcnow().isoformat(), 'key': None}
+        (tmp_path / 'clock-5.journal').write_bytes((json.dumps(event) + '\n').encode() + b'{"action":')
+        clock_journal.init_app(app)
+        clock_journal._replayer.join()
+        with app.app_context():
+            assert replay_orphaned_journals(str(tmp_path)) == 0
+            assert Attendance.query.filter_by(date=yesterday).count() == 1
+    finally:
+        app.config['CLOCK_JOURNAL_ENABLED'] = False
+        clock_journal.init_app(app)
@@ -0,0 +1,71 @@
+import pytest
+from datetime import datetime, timedelta
+from app import db
+from app.models.employee import Employee
+from app.models.rbac import AuditLog
+from app.utils.audit import audit_writer, archive_audit_logs, query_audit_logs
+from app.utils.permissions import log_audit_action
+
+def test_audit_sync_mode_writes_inline(app, org_employee):
+    """Testing config writes audit events synchronously"""
+    with app.app_context():
+        log_audit_action(employee_id=org_employee, action='login', resource_type='session')
+        log = AuditLog.query.one()
+        assert log.organization_id is not None
+        assert log.user_id == org_employee
+
+def test_audit_async_mode_batches_events(app, org_employee):
+    """Async mode queues events and writes them in one batch on flush"""
+    app.config['AUDIT_ASYNC'] = True
+    audit_writer.init_app(app)
+    try:
+        with app.app_context():
+            for i in range(3):
+                log_audit_action(employee_id=org_employee, action='update_setting',
+                                 resource_type='organization_setting', resource_id=i)
+            audit_writer.shutdown()
+            assert AuditLog.query.count() == 3
+    finally:
+        app.config['AUDIT_ASYNC'] = False
+        audit_writer.init_app(app)
+
+def test_audit_log_keyset_pagination(client, app, org_employee, org_admin, org_auth_headers):
+    """Audit log pages follow the cursor without overlap, and archived rows move out"""
+    with app.app_context():
+        org_id = db.session.get(Employee, org_employee).organization_id
+        base = datetime(2024, 1, 1)
+        db.session.add_all([
+            AuditLog(organization_id=org_id, user_id=org_employee, action='update',
+                     resource_type='employee', resource_id=i, timestamp=base + timedelta(minutes=i))
+            for i in range(5)
+        ])
+        db.session.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        url = '/api/employees/security/audit-log?limit=2' + (f'&cursor={cursor}' if cursor else '')
+        response = client.get(url, headers=org_auth_headers)
+        assert response.status_code == 200
+        data = response.get_json()
+        seen.extend(log['resource_id'] for log in data['audit_log'] if log['resource_type'] == 'employee')
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+    assert seen == [4, 3, 2, 1, 0]
+
+    response = client.get('/api/employees/security/audit-log?cursor=not-a-cursor', headers=org_auth_headers)
+    assert response.status_code == 400
+    
+    response = client.get('/api/rbac/audit-logs?limit=3&resource_type=employee', headers=org_auth_headers)
+    assert [log['resource_id'] for log in response.get_json()['audit_logs']] == [4, 3, 2]
+    cursor = response.headers['X-Next-Cursor']
+    response = client.get(f'/api/rbac/audit-logs?limit=3&resource_type=employee&cursor={cursor}',
+                          headers=org_auth_headers)
+    assert [log['resource_id'] for log in response.get_json()['audit_logs']] == [1, 0]
+    assert 'X-Next-Cursor' not in response.headers
+
+    with app.app_context():
+        assert archive_audit_logs(base + timedelta(minutes=3), batch_size=2) == 3
+        logs, _ = query_audit_logs(org_id, archived=True)
+        assert [log.resource_id for log in logs] == [2, 1, 0]
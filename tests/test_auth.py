@@ -58,3 +58,33 @@ def test_change_password_invalid_old(client, auth_headers):
                               'new_password': 'newpassword123'
                           })
     assert response.status_code == 401
+
+def test_register_organization_provisions_roles(client, app):
+    """Registration picks a free slug and creates the default roles"""
+    from app import db
+    from app.models import Organization
+    from app.models.organization import SubscriptionPlan
+    from app.models.rbac import Role, Permission
+    with app.app_context():
+        db.session.add(SubscriptionPlan(name='Free', slug='free'))
+        db.session.add(Permission(name='view_employees', display_name='View Employees',
+                                  module='employees', action='read'))
+        db.session.add(Organization(name='Globex', slug='globex', email='ops@globex.com'))
+        db.session.commit()
+    
+    response = client.post('/api/auth/register-organization', json={
+        'organization_name': 'Globex',
+        'admin_email': 'hank@globex.com',
+        'admin_password': 'password123',
+        'admin_first_name': 'Hank',
+        'admin_last_name': 'Scorpio'
+    })
+    assert response.status_code == 201
+    org = response.get_json()['organization']
+    assert org['slug'] == 'globex1'
+    
+    with app.app_context():
+        roles = Role.query.filter_by(organization_id=org['id']).all()
+        assert {role.name for role in roles} == {'admin', 'manager', 'hr', 'employee'}
+        hr_role = next(role for role in roles if role.name == 'hr')
+        assert [perm.name for perm in hr_role.permissions] == ['view_employees']
@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import text
+from app import create_app, db
+from app.utils.database import resolve_profile_name
+
+def test_sqlite_wal_profile_applies_pragmas(tmp_path, monkeypatch):
+    """The WAL profile sizes the pool and sets pragmas on every connection"""
+    from config.config import TestingConfig
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'hr.db'}")
+    app = create_app('testing', db_profile='sqlite-wal-single-node')
+    
+    with app.app_context():
+        assert app.config['DB_PROFILE'] == 'sqlite-wal-single-node'
+        assert db.engine.pool.size() == app.config['SQLALCHEMY_ENGINE_OPTIONS']['pool_size']
+        with db.engine.connect() as conn:
+            assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+            assert conn.execute(text('PRAGMA synchronous')).scalar() == 1  # NORMAL
+            assert conn.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+        db.engine.dispose()
+
+def test_unknown_profile_is_rejected(app):
+    with pytest.raises(ValueError):
+        resolve_profile_name(app, 'mysql-sharded')
+
+def test_read_requests_route_to_replica(tmp_path, monkeypatch):
+    """GET reads use a replica, writes and lagging replicas fall back to the primary"""
+    from config.config import TestingConfig
+    from app.models import Department
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_REPLICA_URIS', [f"sqlite:///{tmp_path / 'replica.db'}"])
+    app = create_app('testing')
+    replica = app.extensions['db_replicas'].engines['replica_0']
+    
+    with app.test_request_context('/api/employees', method='GET'):
+        assert db.session.get_bind(clause=db.select(Department)) is replica
+        db.session.remove()
+    
+    with app.test_request_context('/api/employees', method='POST'):
+        assert db.session.get_bind(clause=db.select(Department)) is db.engine
+        db.session.remove()
+    
+    with app.test_request_context('/api/employees', method='GET'):
+        app.extensions['db_replicas'].mark_unhealthy('replica_0')
+        assert db.session.get_bind(clause=db.select(Department)) is db.engine
+        db.session.remove()
+    app.extensions['db_replicas'].dispose()
+
+def test_primary_reads_skip_replicas(tmp_path, monkeypatch):
+    """use_primary views and PRIMARY statements stay on the primary during a GET"""
+    from config.config import TestingConfig
+    from app.models import Department
+    from app.utils.database import PRIMARY
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_REPLICA_URIS', [f"sqlite:///{tmp_path / 'replica.db'}"])
+    app = create_app('testing')
+    
+    with app.test_request_context('/api/employees/dashboard-stats', method='GET'):
+        assert db.session.get_bind(clause=db.select(Department)) is db.engine
+        db.session.remove()
+    
+    with app.test_request_context('/api/employees', method='GET'):
+        assert db.session.get_bind(clause=db.select(Department), **PRIMARY) is db.engine
+        db.session.remove()
+    app.extensions['db_replicas'].dispose()
@@ -87,3 +87,72 @@ def test_create_department(client, auth_headers):
     assert response.status_code == 201
     data = response.get_json()
     assert data['name'] == 'HR'
+
+def test_department_listing_stats_and_invalidation(client, app, org_employee, org_auth_headers):
+    """Department stats come from one grouped query and refresh after writes"""
+    from app import db
+    from app.models import Department
+    with app.app_context():
+        dept = Department.query.filter_by(name='Engineering').one()
+        dept.manager_id = org_employee
+        db.session.commit()
+        dept_id = dept.id
+    
+    response = client.get('/api/employees/departments', headers=org_auth_headers)
+    data = response.get_json()
+    assert data[0]['manager_name'] == 'Jane Roe'
+    assert (data[0]['employee_count'], data[0]['active_employee_count'], data[0]['recent_hires']) == (1, 1, 1)
+    
+    response = client.post('/api/employees', headers=org_auth_headers, json={
+        'employee_id': 'ACME002', 'email': 'max@acme.com', 'first_name': 'Max',
+        'last_name': 'Poe', 'hire_date': '2020-01-01', 'position': 'Engineer',
+        'department_id': dept_id, 'status': 'inactive'
+    })
+    assert response.status_code == 201
+    
+    data = client.get('/api/employees/departments', headers=org_auth_headers).get_json()
+    assert (data[0]['employee_count'], data[0]['active_employee_count'], data[0]['recent_hires']) == (2, 1, 1)
+
+def test_dashboard_counters_track_writes_and_reconcile(client, app, org_employee, org_auth_headers):
+    """Dashboard counters follow the write paths and reconcile corrects drift"""
+    from app import db
+    from app.models import OrganizationCounter
+    from app.utils.counters import reconcile_counters
+    
+    stats = client.get('/api/employees/dashboard-stats', headers=org_auth_headers).get_json()
+    assert stats == {'employee_count': 1, 'department_count': 1, 'attendance_today': 0, 'pending_leaves': 0}
+    
+    assert client.post('/api/attendance/check-in', headers=org_auth_headers).status_code == 201
+    leave = client.post('/api/leaves', headers=org_auth_headers, json={
+        'leave_type': 'annual', 'start_date': '2030-01-01', 'end_date': '2030-01-02', 'days': 2
+    })
+    assert leave.status_code == 201
+    assert client.post('/api/employees/departments', headers=org_auth_headers,
+                       json={'name': 'Sales'}).status_code == 201
+    response = client.post('/api/employees', headers=org_auth_headers, json={
+        'employee_id': 'ACME002', 'email': 'max@acme.com', 'first_name': 'Max',
+        'last_name': 'Poe', 'hire_date': '2020-01-01', 'position': 'Engineer'
+    })
+    new_id = response.get_json()['id']
+    assert client.post(f'/api/employees/{new_id}/security/lock-account',
+                       headers=org_auth_headers).status_code == 200
+    
+    stats = client.get('/api/employees/dashboard-stats', headers=org_auth_headers).get_json()
+    assert stats == {'employee_count': 1, 'department_count': 2, 'attendance_today': 1, 'pending_leaves': 1}
+    
+    with app.app_context():
+        counters = OrganizationCounter.query.one()
+        counters.active_employees = 42
+        db.session.commit()
+        assert reconcile_counters() == 1
+        assert reconcile_counters() == 0
+    
+    stats = client.get('/api/employees/dashboard-stats', headers=org_auth_headers).get_json()
+    assert stats['employee_count'] == 1
+    
+    # Only the decision that moves the leave out of pending adjusts the counter
+    leave_id = leave.get_json()['id']
+    assert client.post(f'/api/leaves/{leave_id}/reject', headers=org_auth_headers).get_json()['status'] == 'rejected'
+    assert client.post(f'/api/leaves/{leave_id}/approve', headers=org_auth_headers).status_code == 400
+    stats = client.get('/api/employees/dashboard-stats', headers=org_auth_headers).get_json()
+    assert stats['pending_leaves'] == 0
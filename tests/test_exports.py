@@ -0,0 +1,47 @@
+import csv
+import io
+import json
+import pytest
+from datetime import date
+
+@pytest.fixture
+def payrolls(app, org_employee):
+    from app import db
+    from app.models.payroll import Payroll
+    with app.app_context():
+        db.session.add_all([
+            Payroll(employee_id=org_employee, year=2024, month=month, basic_salary=5000,
+                    net_salary=4500, payment_date=date(2024, month, 28), status='paid')
+            for month in range(1, 4)
+        ])
+        db.session.commit()
+
+def test_export_payroll_ndjson(client, org_admin, org_auth_headers, payrolls):
+    """Exports stream one JSON object per line"""
+    response = client.get('/api/exports/payroll?year=2024', headers=org_auth_headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row['month'] for row in rows] == [1, 2, 3]
+    assert rows[0]['payment_date'] == '2024-01-28'
+
+def test_export_payroll_csv(client, org_admin, org_auth_headers, payrolls):
+    response = client.get('/api/exports/payroll?format=csv&start_date=2024-02-01', headers=org_auth_headers)
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [row['month'] for row in rows] == ['2', '3']
+    assert 'attachment' in response.headers['Content-Disposition']
+
+def test_export_unknown_dataset(client, org_auth_headers):
+    assert client.get('/api/exports/salaries', headers=org_auth_headers).status_code == 404
+
+def test_export_requires_dataset_permission(client, org_employee, grant_role, org_auth_headers, payrolls):
+    """Exports check the dataset's RBAC permission; salaries need payroll access"""
+    assert client.get('/api/exports/employees', headers=org_auth_headers).status_code == 403
+    
+    grant_role(org_employee, 'hr')
+    assert client.get('/api/exports/payroll', headers=org_auth_headers).status_code == 403
+    response = client.get('/api/exports/employees', headers=org_auth_headers)
+    assert response.status_code == 200
+    row = json.loads(response.get_data(as_text=True).splitlines()[0])
+    assert row['email'] == 'jane@acme.com' and 'salary' not in row
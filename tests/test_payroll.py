@@ -0,0 +1,134 @@
+import pytest
+import calendar
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from app import db
+from app.models import Employee, Leave, EmployeeBenefit, Payroll, PayrollRun
+from app.utils.payroll_runs import compute_pay, compute_pay_parallel, run_shard_size, shard_inputs
+
+def test_payroll_run_requires_payroll_permission(client, org_employee, org_auth_headers):
+    """Running and reading payroll runs is gated on payroll permissions, not the role column"""
+    response = client.post('/api/payroll/runs', headers=org_auth_headers, json={'month': 1, 'year': 2025})
+    assert response.status_code == 403
+    assert client.get('/api/payroll/runs/1', headers=org_auth_headers).status_code == 403
+
+def test_payroll_run_computes_and_skips_existing(client, app, org_employee, org_admin, org_auth_headers):
+    """A run pays every active employee once, net of unpaid leave and benefit contributions"""
+    first = (date.today().replace(day=1) + timedelta(days=32)).replace(day=1)
+    days_in_month = calendar.monthrange(first.year, first.month)[1]
+    with app.app_context():
+        db.session.add(Leave(employee_id=org_employee, leave_type='unpaid', start_date=first + timedelta(days=4),
+                             end_date=first + timedelta(days=6), days=3, status='approved'))
+        db.session.add(EmployeeBenefit(employee_id=org_employee, benefit_type='health', benefit_name='Health plan',
+                                       start_date=first - timedelta(days=90), employee_contribution=100))
+        db.session.commit()
+    
+    period = {'month': first.month, 'year': first.year}
+    response = client.post('/api/payroll/runs', headers=org_auth_headers, json=period)
+    assert response.status_code == 201
+    result = response.get_json()
+    assert (result['employees'], result['created'], result['skipped']) == (1, 1, 0)
+    
+    deductions = round(5000 / days_in_month * 3 + 100, 2)
+    with app.app_context():
+        payroll = Payroll.query.filter_by(employee_id=org_employee, **period).one()
+        assert payroll.basic_salary == 5000.0
+        assert payroll.deductions == deductions
+        assert payroll.net_salary == round(5000 - deductions, 2)
+    
+    # Re-running the period and posting a duplicate record leave the payroll alone
+    rerun = client.post('/api/payroll/runs', headers=org_auth_headers, json=period).get_json()
+    assert (rerun['created'], rerun['skipped']) == (0, 1)
+    duplicate = client.post('/api/payroll', headers=org_auth_headers, json=dict(
+        period, employee_id=org_employee, basic_salary=1, net_salary=1
+    ))
+    assert duplicate.status_code == 400
+    assert client.post('/api/payroll', headers=org_auth_headers, json=dict(
+        period, month=13, employee_id=org_employee, basic_salary=1, net_salary=1
+    )).status_code == 400
+    
+    assert client.post('/api/payroll/runs', headers=org_auth_headers,
+                       json={'month': 13, 'year': first.year}).status_code == 400
+
+def test_parallel_pay_matches_in_process():
+    """Sharded computation returns the in-process results in input order"""
+    count = 50
+    inputs = {
+        'employee_ids': list(range(count)),
+        'organization_ids': [i // 20 for i in range(count)],
+        'department_ids': [i // 7 for i in range(count)],
+        'salary': [40000.0 + i * 1234.5 for i in range(count)],
+        'paid_days': [30 - i % 5 for i in range(count)],
+        'unpaid_days': [i % 3 for i in range(count)],
+        'contributions': [float(i % 4) * 25 for i in range(count)],
+        'days_in_month': 30
+    }
+    shards = shard_inputs(inputs, 8)
+    assert sum(len(shard['salary']) for shard in shards) == count
+    assert all(len(shard['salary']) <= 8 for shard in shards)
+    assert compute_pay_parallel(inputs, 0.1, workers=3, shard_size=8) == compute_pay(inputs, 0.1)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        for _ in range(2):
+            assert compute_pay_parallel(inputs, 0.1, workers=2, shard_size=8, executor=executor) == \
+                compute_pay(inputs, 0.1)
+    # Chunks smaller than the configured shard size still fan out to every worker
+    assert run_shard_size(2000, 4, shard_size=5000) == 500
+    assert run_shard_size(50000, 4, shard_size=5000) == 5000
+
+def test_payroll_run_resumes_after_failed_chunk(client, app, organization, org_employee, org_admin,
+                                                org_auth_headers, monkeypatch):
+    """A run that fails mid-way resumes after its last committed chunk without double-paying"""
+    from app.utils import payroll_runs
+    first = (date.today().replace(day=1) + timedelta(days=32)).replace(day=1)
+    with app.app_context():
+        for i in range(2):
+            db.session.add(Employee(organization_id=organization, employee_id=f'ACME10{i}', email=f'e{i}@acme.com',
+                                    first_name='E', last_name=str(i), hire_date=date.today(), position='Engineer',
+                                    salary=48000, role='employee', status='active'))
+        db.session.commit()
+    
+    insert_payrolls = payroll_runs.insert_payrolls
+    calls = []
+    def crash_on_second_chunk(rows, batch_size=None):
+        calls.append(len(rows))
+        if len(calls) == 2:
+            raise RuntimeError('worker restarted')
+        return insert_payrolls(rows, batch_size)
+    monkeypatch.setattr(payroll_runs, 'insert_payrolls', crash_on_second_chunk)
+    
+    period = {'month': first.month, 'year': first.year, 'chunk_size': 1}
+    failed = client.post('/api/payroll/runs', headers=org_auth_headers, json=period)
+    assert failed.status_code == 500
+    with app.app_context():
+        run = PayrollRun.query.one()
+        assert (run.status, run.chunks_completed, run.last_employee_id) == ('failed', 1, org_employee)
+        assert Payroll.query.count() == 1
+    
+    resumed = client.post('/api/payroll/runs', headers=org_auth_headers, json=period).get_json()
+    assert (resumed['status'], resumed['attempts']) == ('completed', 2)
+    assert (resumed['chunks_completed'], resumed['created'], resumed['skipped']) == (3, 3, 0)
+    assert calls == [1, 1, 1, 1]
+    with app.app_context():
+        assert Payroll.query.count() == 3
+    assert client.get(f"/api/payroll/runs/{resumed['run_id']}",
+                      headers=org_auth_headers).get_json()['status'] == 'completed'
+
+def test_running_run_is_leased(app, organization, org_employee):
+    """A running run is only taken over once its lease expires; the all-organization run is unique too"""
+    from datetime import datetime
+    from sqlalchemy.exc import IntegrityError
+    from app.utils.payroll_runs import PayrollRunConflict, start_run
+    with app.app_context():
+        run = start_run(organization, 2024, 1)
+        assert run.status == 'running' and run.lease_expires_at > datetime.utcnow()
+        with pytest.raises(PayrollRunConflict):
+            start_run(organization, 2024, 1)
+        
+        run.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        assert start_run(organization, 2024, 1).attempts == 2
+        
+        start_run(None, 2024, 1)
+        db.session.add(PayrollRun(organization_id=None, year=2024, month=1, chunk_size=10))
+        with pytest.raises(IntegrityError):
+            db.session.commit()
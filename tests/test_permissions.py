@@ -0,0 +1,157 @@
+import pytest
+from app import db
+from app.models.employee import Employee
+from app.models.rbac import Role, Permission, RolePermission
+from app.utils.permissions import (
+    check_user_permission, assign_role_to_employee, remove_role_from_employee,
+    permission_cache
+)
+
+@pytest.fixture
+def viewer_role(app, organization):
+    """Create a role granting view_employees"""
+    with app.app_context():
+        permission = Permission(name='view_employees', display_name='View Employees',
+                                module='employees', action='read')
+        role = Role(organization_id=organization, name='viewer', display_name='Viewer')
+        db.session.add_all([permission, role])
+        db.session.flush()
+        db.session.add(RolePermission(role_id=role.id, permission_id=permission.id))
+        db.session.commit()
+        role_id = role.id
+    return role_id
+
+def test_permission_check_is_cached(app, org_employee, viewer_role):
+    """Repeated checks are served from the compiled permission cache"""
+    with app.app_context():
+        employee = Employee.query.get(org_employee)
+        assert not check_user_permission(employee, 'view_employees')
+        
+        assign_role_to_employee(org_employee, viewer_role)
+        assert check_user_permission(employee, 'view_employees')
+        
+        misses = permission_cache.misses
+        assert check_user_permission(employee, 'view_employees')
+        assert permission_cache.misses == misses
+
+def test_role_removal_invalidates_cache(app, org_employee, viewer_role):
+    """Removing a role is reflected immediately"""
+    with app.app_context():
+        employee = Employee.query.get(org_employee)
+        assign_role_to_employee(org_employee, viewer_role)
+        assert check_user_permission(employee, 'view_employees')
+        
+        remove_role_from_employee(org_employee, viewer_role)
+        assert not check_user_permission(employee, 'view_employees')
+
+def test_batch_permission_check(app, org_employee, viewer_role, organization):
+    """The permission matrix resolves many employees with one query"""
+    from datetime import date
+    from app.utils.permissions import get_employees_with_permission
+    with app.app_context():
+        other = Employee(organization_id=organization, employee_id='ACME002',
+                         email='sam@acme.com', first_name='Sam', last_name='Lee',
+                         hire_date=date.today(), position='Analyst')
+        db.session.add(other)
+        db.session.commit()
+        assign_role_to_employee(org_employee, viewer_role)
+        
+        granted = get_employees_with_permission(
+            'view_employees', employee_ids=[org_employee, other.id]
+        )
+        assert granted == {org_employee}
+        assert get_employees_with_permission('unknown.permission', organization_id=organization) == set()
+
+def test_claims_token_skips_lookup_until_stale(app, client, org_employee, viewer_role):
+    """Embedded claims are trusted until the permission version changes"""
+    from flask_jwt_extended import decode_token
+    app.config['JWT_EMBED_CLAIMS'] = True
+    response = client.post('/api/auth/login', json={
+        'email': 'jane@acme.com',
+        'password': 'password123'
+    })
+    token = response.get_json()['access_token']
+    claims = decode_token(token)
+    assert claims['role'] == 'admin'
+    assert claims['role_ids'] == []
+    
+    headers = {'Authorization': f'Bearer {token}'}
+    url = f'/api/rbac/employees/{org_employee}/roles'
+    assert client.get(url, headers=headers).status_code == 403
+    
+    with app.app_context():
+        assign_role_to_employee(org_employee, viewer_role)
+    
+    # The stamp is now stale, so the principal is re-resolved from the database
+    assert client.get(url, headers=headers).status_code == 200
+    assert client.get('/api/employees/dashboard-stats', headers=headers).status_code == 200
+
+def test_bulk_role_assignment(app, org_employee, viewer_role, organization):
+    """Bulk assignment skips existing pairs and sets the primary role in one pass"""
+    from datetime import date
+    from app.models.rbac import EmployeeRole
+    from app.utils.permissions import assign_roles_to_employees
+    with app.app_context():
+        others = [Employee(organization_id=organization, employee_id=f'ACME1{i:02d}',
+                           email=f'user{i}@acme.com', first_name='User', last_name=str(i),
+                           hire_date=date.today(), position='Analyst') for i in range(3)]
+        db.session.add_all(others)
+        db.session.commit()
+        employee_ids = [org_employee] + [e.id for e in others]
+        assign_role_to_employee(org_employee, viewer_role)
+        
+        success, _, stats = assign_roles_to_employees(
+            employee_ids, [viewer_role], organization_id=organization,
+            assigned_by_id=org_employee, primary_role_id=viewer_role
+        )
+        assert success
+        assert stats['assigned'] == 3 and stats['skipped'] == 1
+        assert EmployeeRole.query.filter_by(role_id=viewer_role, is_primary=True).count() == 4
+        assert check_user_permission(db.session.get(Employee, others[0].id), 'view_employees')
+
+def test_orgless_principal_gets_no_trusted_claims(app):
+    """Super admins have no persisted permission version, so their tokens are never trusted as-is"""
+    from app.utils.permissions import build_principal_claims
+    app.config['JWT_EMBED_CLAIMS'] = True
+    with app.test_request_context():
+        admin = Employee(id=999, organization_id=None, role='super_admin')
+        assert build_principal_claims(admin) == {}
+
+def test_permission_matrix_follows_persisted_version(app, organization, viewer_role):
+    """A grant change committed elsewhere rebuilds only that organization's matrix once its stamp is re-read"""
+    from app.models import Organization
+    from app.models.rbac import CacheVersion
+    from app.utils.permissions import (
+        MATRIX_VERSION, get_permission_matrix, invalidate_permission_matrix, version_cache
+    )
+    with app.app_context():
+        other = Organization(name='Globex', slug='globex', email='admin@globex.com',
+                             subscription_status='active')
+        db.session.add(other)
+        db.session.commit()
+        other_id = other.id
+        
+        matrix = get_permission_matrix(organization)
+        other_matrix = get_permission_matrix(other_id)
+        assert get_permission_matrix(organization) is matrix
+        assert matrix.role_masks and not other_matrix.role_masks
+        assert permission_cache.get(MATRIX_VERSION) is None
+        
+        invalidate_permission_matrix(organization)
+        db.session.commit()
+        rebuilt = get_permission_matrix(organization)
+        assert rebuilt is not matrix
+        assert get_permission_matrix(other_id) is other_matrix
+        
+        # Another process bumps the row; this one notices after its version stamp expires
+        name = f'{MATRIX_VERSION}:{organization}'
+        CacheVersion.query.filter_by(name=name).update({CacheVersion.version: CacheVersion.version + 1})
+        db.session.commit()
+        assert get_permission_matrix(organization) is rebuilt
+        version_cache.delete(name)
+        assert get_permission_matrix(organization) is not rebuilt
+        
+        # Catalogue and system role changes rebuild every organization
+        invalidate_permission_matrix()
+        db.session.commit()
+        assert get_permission_matrix(other_id) is not other_matrix
@@ -0,0 +1,59 @@
+import json
+import pytest
+from app.models.employee import Employee
+from app.utils import serializers
+from app.utils.serializers import EMPLOYEE_SERIALIZER
+
+def test_columnar_serializer_matches_to_dict(app, org_employee):
+    """The columnar path emits exactly what to_dict() does"""
+    with app.app_context():
+        employee = Employee.query.get(org_employee)
+        rows = EMPLOYEE_SERIALIZER.select(Employee.query.filter_by(id=org_employee)).all()
+        assert EMPLOYEE_SERIALIZER.dump(rows) == [employee.to_dict()]
+
+def test_json_provider_round_trip(app):
+    payload = {'b': [1, 2.5, None], 'a': 'ü'}
+    encoded = app.json.dumps(payload)
+    assert list(json.loads(encoded)) == ['a', 'b']
+    assert app.json.loads(encoded) == payload
+
+def test_jsonify_encodes_with_orjson(client, org_auth_headers, org_employee, monkeypatch):
+    """jsonify's separators/indent arguments must not push responses onto the stdlib encoder"""
+    orjson = pytest.importorskip('orjson')
+    calls = []
+    
+    class CountingOrjson:
+        def __getattr__(self, name):
+            return getattr(orjson, name)
+        
+        def dumps(self, *args, **kwargs):
+            calls.append(kwargs.get('option'))
+            return orjson.dumps(*args, **kwargs)
+    
+    monkeypatch.setattr(serializers, 'orjson', CountingOrjson())
+    response = client.get('/api/employees', headers=org_auth_headers)
+    assert response.status_code == 200
+    assert [row['id'] for row in response.get_json()] == [org_employee]
+    assert calls
+    
+    client.application.json.compact = False
+    response = client.get('/api/employees', headers=org_auth_headers)
+    assert response.get_data(as_text=True).startswith('[\n  {')
+    assert calls[-1] & orjson.OPT_INDENT_2
+
+def test_fields_parameter_projects_columns(client, org_auth_headers, org_employee):
+    """fields= limits both the selected columns and the payload"""
+    response = client.get('/api/employees?fields=id,first_name,last_name', headers=org_auth_headers)
+    assert response.status_code == 200
+    rows = response.get_json()
+    assert [row['id'] for row in rows] == [org_employee]
+    assert set(rows[0]) == {'id', 'first_name', 'last_name'}
+    
+    response = client.get('/api/attendance?fields=status', headers=org_auth_headers)
+    assert response.status_code == 200
+    
+    response = client.get('/api/employees?fields=id,password_hash', headers=org_auth_headers)
+    assert response.status_code == 400
+    
+    sql = str(EMPLOYEE_SERIALIZER.project('id,first_name').select(Employee.query))
+    assert 'address' not in sql and 'first_name' in sql
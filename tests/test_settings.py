@@ -0,0 +1,22 @@
+import pytest
+from app.utils.permissions import (
+    get_organization_setting, set_organization_setting, settings_cache
+)
+
+def test_settings_snapshot_cached_and_invalidated(app, organization, org_employee):
+    """Settings are decoded once per snapshot and refreshed after a write"""
+    with app.app_context():
+        set_organization_setting(organization, 'late_grace_minutes', 10,
+                                 category='attendance', data_type='integer')
+        set_organization_setting(organization, 'password_policy', {'min_length': 8},
+                                 category='security', data_type='json')
+        
+        assert get_organization_setting(organization, 'late_grace_minutes') == 10
+        misses = settings_cache.misses
+        assert get_organization_setting(organization, 'password_policy') == {'min_length': 8}
+        assert get_organization_setting(organization, 'missing', 'fallback') == 'fallback'
+        assert settings_cache.misses == misses
+        
+        set_organization_setting(organization, 'late_grace_minutes', 15,
+                                 category='attendance', data_type='integer')
+        assert get_organization_setting(organization, 'late_grace_minutes') == 15
@@ -0,0 +1,52 @@
+import pytest
+from collections import namedtuple
+from datetime import date, datetime
+from app.utils import workforce
+
+Row = namedtuple('Row', 'salary hire_date position status terminated_at department_name')
+
+ROWS = [
+    Row(50000, date(2024, 1, 1), 'Engineer', 'active', None, 'Engineering'),
+    Row(70000, date(2023, 1, 1), 'Engineer', 'active', None, 'Engineering'),
+    Row(54000, date(2022, 1, 1), 'Engineer', 'active', None, 'Support'),
+    Row(130000, date(2020, 1, 1), 'Director', 'active', None, 'Engineering'),
+    Row(None, date(2025, 1, 1), 'Engineer', 'active', None, None),
+    Row(60000, date(2021, 1, 1), 'Engineer', 'terminated', datetime(2025, 6, 15), 'Support'),
+]
+
+def _report():
+    data = workforce.WorkforceData(ROWS, as_of=date(2025, 7, 1))
+    return {
+        'bands': workforce.salary_bands(data),
+        'departments': workforce.department_summary(data),
+        'percentiles': workforce.percentiles(data.salary, (50,)),
+        'tenure': workforce.tenure_summary(data),
+        'turnover': workforce.turnover_rate(data, date(2025, 6, 1), date(2025, 6, 30)),
+        'equity': workforce.pay_equity(data),
+    }
+
+def test_workforce_metrics(monkeypatch):
+    """Vectorized metrics match hand-computed values, with and without NumPy"""
+    report = _report()
+    
+    assert report['bands']['entry_level'] == {'range': '40-60k', 'count': 2, 'percentage': 50.0, 'avg_salary': 52000.0}
+    assert report['bands']['executive']['count'] == 1
+    assert report['bands']['below_entry']['count'] == 0
+    low = workforce.WorkforceData([Row(32000, date(2024, 1, 1), 'Clerk', 'active', None, None)], as_of=date(2025, 7, 1))
+    assert workforce.salary_bands(low)['below_entry'] == {'range': '<40k', 'count': 1, 'percentage': 100.0, 'avg_salary': 32000.0}
+    assert report['departments']['Engineering'] == {
+        'count': 3, 'avg_salary': 83333.33, 'median_salary': 70000.0, 'min': 50000.0, 'max': 130000.0
+    }
+    assert report['percentiles'] == {50: 62000.0}
+    assert report['turnover'] == 16.7
+    assert report['tenure']['median_tenure_months'] == pytest.approx(30.0, abs=0.5)
+    
+    # Engineers: Engineering averages 60k, Support 54k
+    assert report['equity']['positions'] == [{
+        'position': 'Engineer', 'ratio': 0.9, 'department_count': 2,
+        'employee_count': 3, 'status': 'review'
+    }]
+    
+    if workforce.np is not None:
+        monkeypatch.setattr(workforce, 'np', None)
+        assert _report() == report